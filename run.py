@@ -1,40 +1,41 @@
 import asyncio
-import json
 import logging
 import uuid
+from collections import Counter, defaultdict
+from contextlib import aclosing, asynccontextmanager
+from dataclasses import dataclass
 from datetime import date, datetime
-from types import SimpleNamespace
-from typing import Dict, Any
+from operator import attrgetter
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Mapping, Optional
 
 from dotenv import load_dotenv
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
 
-from src.agents.accommodation_agent import accommodation_agent, accommodation_apply_agent
+from src.agents.accommodation_agent import (
+    get_accommodation_agent,
+)
 from src.agents.accommodation_search_agent import (
-    accommodation_search_tool_agent,
-    accommodation_search_agent,
+    get_accommodation_search_tool_agent,
+    get_accommodation_search_batch_tool_agent,
+    get_accommodation_search_agent,
 )
 from src.agents.activity_agent import (
-    activity_agent,
-    activity_search_agent,
-    activity_result_writer_agent,
-    activity_apply_agent,
-    day_itinerary_search_agent,
-    activity_itinerary_agent,
-)
-from src.agents.dispatcher_agent import dispatcher_agent
-from src.agents.flight_agent import flight_agent
-from src.agents.flight_search_agent import (
-    flight_search_tool_agent,
-    flight_search_agent,
-    flight_result_writer_agent,
+    get_activity_agent,
+    get_activity_search_agent,
+    get_activity_result_writer_agent,
+    get_day_itinerary_search_agent,
 )
-from src.agents.parallel_planner_agent import parallel_planner_agent
-from src.agents.search_agent import search_agent, visa_result_writer_agent
-from src.agents.visa_agent import visa_agent
-from src.agents.summary_agent import trip_summary_agent
+from src.agents.dispatcher_agent import dispatcher_agent, warmup_dispatcher
+from src.agents.flight_agent import get_flight_agent
+from src.agents.flight_search_agent import get_flight_search_agent, get_flight_search_tool_agent
+from src.agents.search_agent import get_search_agent, get_visa_result_writer_agent
+from src.agents.visa_agent import get_visa_agent
+from src.agents.summary_agent import TripSummaryOutput, get_trip_summary_agent
 from src.state.accommodation_state import (
     AccommodationState,
     AccommodationSearchTask,
@@ -42,8 +43,13 @@ from src.state.accommodation_state import (
     AccommodationOption,
     TravelerAccommodationChoice,
 )
-from src.state.activity_state import ActivityState, ActivityOption, DayItineraryItem
-from src.state.flight_state import FlightState, FlightSearchTask, FlightSearchResult, FlightOption
+from src.state.activity_state import (
+    ActivityState,
+    ActivityOption,
+    ActivitySearchTask,
+    DayItineraryItem,
+)
+from src.state.flight_state import FlightState, FlightSearchTask, FlightSearchResult
 from src.state.planner_state import (
     PlannerState,
     TripDetails,
@@ -52,8 +58,28 @@ from src.state.planner_state import (
     Traveler,
 )
 from src.state.visa_state import VisaState
-from src.tools.tools import _build_canonical_accommodation_options
+from src.tools.cache import trip_summary_cache, visa_search_cache
+from src.tools.tools import (
+    CURRENT_TASK_KEY,
+    _build_canonical_accommodation_options,
+    apply_accommodation_search_results,
+    apply_flight_search_results,
+    parse_accommodation_options,
+    parse_flight_options,
+    searchapi_google_flights,
+    update_trip_plan,
+)
+from src.utils.costs import chosen_accommodation_option
+from src.utils.intake import INTAKE_COUNTERS, INTAKE_SIMPLE, classify_intake_complexity, extract_date_range
+from src.utils.llm import (
+    build_gemini,
+    prompt_cache_hit_rate,
+    record_prompt_cache_usage,
+    warm_up_models,
+)
+from src.utils.loaders import get_agent_config
 from pydantic import BaseModel
+from pydantic_core import from_json, to_json
 
 
 # logging.basicConfig(
@@ -64,6 +90,113 @@ from pydantic import BaseModel
 load_dotenv()
 
 
+# Runners keyed by (agent, session service, app name). A Runner holds strong
+# references to both objects, so their ids stay valid for the cache lifetime.
+_RUNNERS: Dict[tuple[int, int, str], Runner] = {}
+
+
+def _get_runner(
+    session_service: InMemorySessionService,
+    app_name: str,
+    agent: BaseAgent,
+) -> Runner:
+    """
+    Return a Runner for ``agent`` on ``session_service``, reusing the one
+    built by an earlier pipeline call when available.
+    """
+    key = (id(agent), id(session_service), app_name)
+    runner = _RUNNERS.get(key)
+    if runner is None:
+        runner = Runner(
+            session_service=session_service,
+            app_name=app_name,
+            agent=agent,
+        )
+        _RUNNERS[key] = runner
+    return runner
+
+
+# Upper bound on activity suggestions sent with each itinerary chunk.
+MAX_ACTIVITY_SUGGESTIONS = 40
+
+# Upper bound on grounded searches in flight at once, to stay inside API rate limits.
+MAX_CONCURRENT_SEARCHES = 8
+
+# agents.yaml sections whose Gemini clients the planning pipelines use once
+# intake completes; warmed at startup alongside the dispatcher.
+PLANNING_MODEL_SECTIONS = ("visa", "flight", "search")
+
+# Shared read-only fallback for missing or empty state sections so lookups on
+# the hot paths do not allocate a fresh dict each time.
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+
+
+def _norm(value: Optional[str]) -> str:
+    return value.strip().lower() if value else ""
+
+
+def _dedup_keys(
+    url: Optional[str], name: Optional[str], city: Optional[str]
+) -> tuple[Optional[str], int]:
+    """
+    Return the itinerary dedup keys for an activity: its URL (or None) and a
+    hash of the normalized (name, city) pair.
+    """
+    return url or None, hash((_norm(name), _norm(city)))
+
+
+# Generic meal labels that may legitimately repeat across days.
+_MEAL_TOKENS = frozenset(("breakfast", "lunch", "dinner"))
+
+
+def _state_section(state: Optional[Mapping[str, Any]], key: str) -> Mapping[str, Any]:
+    """
+    Return the raw dict stored under ``key`` in session state, or a shared
+    empty mapping when the section is missing or empty.
+    """
+    section = state.get(key) if state else None
+    if not section:
+        return _EMPTY_DICT
+    return section
+
+
+def _strip_code_fences(text: str) -> str:
+    """
+    Some model responses wrap JSON in Markdown code fences; drop a leading
+    ```/```json line and a trailing ``` before parsing.
+    """
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        first_nl = cleaned.find("\n")
+        if first_nl != -1:
+            cleaned = cleaned[first_nl + 1 :]
+        if cleaned.rstrip().endswith("```"):
+            cleaned = cleaned.rstrip()[:-3]
+        cleaned = cleaned.strip()
+    return cleaned
+
+
+def _without_none(options: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """
+    Drop unset (None) keys from option dicts before they go into a prompt;
+    most hint/price/notes fields are empty and only cost tokens.
+    """
+    return [{k: v for k, v in opt.items() if v is not None} for opt in options]
+
+
+class VisaSearchAgentOutput(BaseModel):
+    """
+    Structured output expected from search_agent for a single VisaSearchTask.
+    """
+
+    task_id: str
+    summary: str
+    processing_time_hint: str | None = None
+    fee_hint: str | None = None
+    notes: str | None = None
+    sources: list[str] = []
+
+
 class ActivitySearchAgentOutput(BaseModel):
     """
     Structured output expected from activity_search_agent when it summarizes
@@ -88,6 +221,38 @@ class DaySliceItineraryOutput(BaseModel):
     items: list[Dict[str, Any]]
 
 
+_TRIP_SUMMARY_SECTIONS = (
+    ("Trip Overview", "overview"),
+    ("Visa & Timing", "visa_timing"),
+    ("Flights / Getting There", "flights"),
+    ("Where You’re Staying", "accommodation"),
+    ("Itinerary Highlights", "itinerary_highlights"),
+    ("Next Steps / Things To Double‑Check", "next_steps"),
+)
+
+
+def _render_trip_summary(text: str) -> str:
+    """
+    Render the schema-constrained summary JSON as Markdown sections. Text
+    that does not parse (e.g. an older cached summary) is returned as is.
+    """
+    try:
+        summary = TripSummaryOutput.model_validate_json(_strip_code_fences(text))
+    except ValueError:
+        return text
+
+    blocks: list[str] = []
+    for heading, field in _TRIP_SUMMARY_SECTIONS:
+        value = getattr(summary, field)
+        if isinstance(value, list):
+            body = "\n".join(f"- {item}" for item in value)
+        else:
+            body = value.strip()
+        if body:
+            blocks.append(f"**{heading}**\n{body}")
+    return "\n\n".join(blocks)
+
+
 async def run_trip_summary(
     session_service: InMemorySessionService,
     app_name: str,
@@ -107,13 +272,13 @@ async def run_trip_summary(
     state_obj = session.state or {}
 
     planner_state = PlannerState(**state_obj)
-    visa_raw = state_obj.get("visa") or {}
+    visa_raw = _state_section(state_obj, "visa")
     visa_state = VisaState(**visa_raw)
-    flights_raw = state_obj.get("flights") or {}
+    flights_raw = _state_section(state_obj, "flights")
     flight_state = FlightState(**flights_raw)
-    accommodation_raw = state_obj.get("accommodation") or {}
+    accommodation_raw = _state_section(state_obj, "accommodation")
     accommodation_state = AccommodationState(**accommodation_raw)
-    activities_raw = state_obj.get("activities") or {}
+    activities_raw = _state_section(state_obj, "activities")
     activity_state = ActivityState(**activities_raw)
 
     # Build a richer planner payload so the summary agent can reflect nuances
@@ -329,14 +494,7 @@ async def run_trip_summary(
     total_accom_high = 0.0
     accom_currency: str | None = None
     for res in accommodation_state.search_results or []:
-        chosen_type = res.chosen_option_type
-        chosen_option = None
-        for opt in res.options or []:
-            if chosen_type and opt.option_type == chosen_type:
-                chosen_option = opt
-                break
-        if chosen_option is None and res.options:
-            chosen_option = res.options[0]
+        chosen_option = chosen_accommodation_option(res)
         if not chosen_option:
             continue
         if chosen_option.currency and not accom_currency:
@@ -371,42 +529,58 @@ async def run_trip_summary(
         "cost_state": cost_payload,
     }
 
-    runner = Runner(
-        session_service=session_service,
-        app_name=app_name,
-        agent=trip_summary_agent,
-    )
+    # The summary is a function of the payload, so an unchanged plan (e.g. a
+    # re-summary later in the same planning session) reuses the last answer.
+    final_summary_text: str | None = trip_summary_cache.get(summary_payload)
+    if final_summary_text:
+        print("[SUMMARY] Cache hit; skipping trip_summary_agent.")
+    else:
+        summary_agent = get_trip_summary_agent()
+        runner = _get_runner(
+            session_service=session_service,
+            app_name=app_name,
+            agent=summary_agent,
+        )
 
-    print("[SUMMARY] Generating trip summary...")
-    final_summary_text: str | None = None
-    async for event in runner.run_async(
-        user_id=user_id,
-        session_id=session_id,
-        new_message=genai_types.Content(
-            role="user",
-            parts=[
-                genai_types.Part(
-                    text=(
-                        "Given the following JSON payload describing the current trip plan "
-                        "(planner, visa, flight, accommodation, and activity state), write a "
-                        "detailed, structured trip summary as instructed. Resolve any obvious "
-                        "inconsistencies between planner dates, visa timing, and flights by "
-                        "explaining them clearly to the user.\n"
-                        f"{json.dumps(summary_payload)}"
+        print("[SUMMARY] Generating trip summary...")
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=genai_types.Content(
+                role="user",
+                parts=[
+                    genai_types.Part(
+                        text=(
+                            "Given the following JSON payload describing the current trip plan "
+                            "(planner, visa, flight, accommodation, and activity state), write a "
+                            "detailed, structured trip summary as instructed. Resolve any obvious "
+                            "inconsistencies between planner dates, visa timing, and flights by "
+                            "explaining them clearly to the user.\n"
+                            f"{to_json(summary_payload).decode()}"
+                        )
                     )
-                )
-            ],
-        ),
-    ):
-        if event.is_final_response and event.content and getattr(event.content, "parts", None):
-            part = event.content.parts[0]
-            text = getattr(part, "text", None)
-            if isinstance(text, str) and text.strip():
-                final_summary_text = text.strip()
+                ],
+            ),
+        ):
+            record_prompt_cache_usage(event)
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                part = parts[0]
+                text = part.text
+                if isinstance(text, str) and text.strip():
+                    final_summary_text = text.strip()
+
+        hit_rate = prompt_cache_hit_rate(summary_agent.name)
+        if hit_rate is not None:
+            print(f"[SUMMARY] Prompt cache hit rate so far: {hit_rate:.0%}")
+
+        if final_summary_text:
+            trip_summary_cache.set(summary_payload, final_summary_text)
 
     if final_summary_text:
         print("[SUMMARY] Trip summary:")
-        print(final_summary_text)
+        print(_render_trip_summary(final_summary_text))
 
         # Deterministic accommodation highlight based on the chosen option in
         # ActivityState so that a selected property is surfaced even when the
@@ -596,6 +770,239 @@ def _build_trip_calendar_for_itinerary(
 
     return days
 
+@asynccontextmanager
+async def _scratch_session(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    semaphore: asyncio.Semaphore,
+) -> AsyncIterator[str]:
+    """
+    Hold a search slot and a short-lived session for one isolated agent run.
+
+    Concurrent searches must not interleave their turns in the trip session's
+    history, so each gets its own session. Search agents only read the payload
+    they are sent; their results are written back by the caller, one pipeline
+    at a time.
+    """
+    scratch_id = str(uuid.uuid4())
+    async with semaphore:
+        await session_service.create_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=scratch_id,
+        )
+        try:
+            yield scratch_id
+        finally:
+            await session_service.delete_session(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=scratch_id,
+            )
+
+
+async def _run_isolated_search(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    agent: BaseAgent,
+    text: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[str]:
+    """Run a search agent once in a scratch session and return its final text."""
+    runner = _get_runner(session_service=session_service, app_name=app_name, agent=agent)
+    async with _scratch_session(session_service, app_name, user_id, semaphore) as scratch_id:
+        final_text = None
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=scratch_id,
+            new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+        ):
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                # Grounded replies can lead with non-text parts; take the first text.
+                final_text = next(
+                    (part.text.strip() for part in parts if part.text and part.text.strip()),
+                    final_text,
+                )
+        return final_text
+
+
+async def _run_isolated_tool_call(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    agent: BaseAgent,
+    text: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Dict[str, Any]]:
+    """
+    Run a tool-calling search agent once in a scratch session and return the
+    first tool response, or None when the agent did not call a tool.
+    """
+    runner = _get_runner(session_service=session_service, app_name=app_name, agent=agent)
+    async with _scratch_session(session_service, app_name, user_id, semaphore) as scratch_id:
+        async with aclosing(
+            runner.run_async(
+                user_id=user_id,
+                session_id=scratch_id,
+                new_message=genai_types.Content(role="user", parts=[genai_types.Part(text=text)]),
+            )
+        ) as events:
+            async for event in events:
+                content = event.content
+                parts = content.parts if content is not None else None
+                for part in parts or ():
+                    func_resp = part.function_response
+                    if func_resp and func_resp.response is not None:
+                        return func_resp.response
+    return None
+
+
+async def warm_up_clients() -> None:
+    """
+    Prime the dispatcher and every planning-pipeline model client in parallel
+    so credential lookup and connection setup happen off the user-visible path.
+    """
+    await asyncio.gather(
+        warmup_dispatcher(),
+        warm_up_models(
+            build_gemini(get_agent_config(section)) for section in PLANNING_MODEL_SECTIONS
+        ),
+    )
+
+
+async def _run_state_tool(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    tool: Callable[..., Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Call a deterministic state tool (one that only takes tool_context) without
+    an LLM in the loop, and persist the state sections it changed as a single
+    session event. Returns the tool's result dict.
+    """
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    state = session.state or {}
+    # State tools decode sections into fresh models and write whole sections
+    # back (see src.state.state_utils), so a shallow copy is enough to diff
+    # against; nested values are never mutated in place.
+    tool_context = SimpleNamespace(state=dict(state))
+    result = tool(tool_context=tool_context)
+    state_delta = {
+        key: value for key, value in tool_context.state.items() if state.get(key) != value
+    }
+    if state_delta:
+        await session_service.append_event(
+            session,
+            Event(author="user", actions=EventActions(state_delta=state_delta)),
+        )
+    return result
+
+
+async def _stage_current_task(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    payload: Dict[str, Any],
+) -> None:
+    """
+    Stage an already-validated payload in session state for a writer agent,
+    so it is not re-serialized into the prompt and re-emitted by the model.
+    """
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    await session_service.append_event(
+        session,
+        Event(author="user", actions=EventActions(state_delta={CURRENT_TASK_KEY: payload})),
+    )
+
+
+async def try_intake_shortcut(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    user_input: str,
+) -> Optional[str]:
+    """
+    Apply a SIMPLE intake turn (a plain date-range correction) without calling
+    the dispatcher LLM.
+
+    Only used while still in intake and when the trip already has a
+    destination and dates, so the update cannot change whether intake is
+    complete. Returns the reply text, or None when the dispatcher should
+    handle the turn.
+    """
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    if session is None:
+        return None
+    state = session.state or {}
+    trip_details = _state_section(state, "trip_details")
+    if (
+        state.get("status", "intake") != "intake"
+        or not trip_details.get("destination")
+        or not trip_details.get("start_date")
+        or not trip_details.get("end_date")
+    ):
+        return None
+
+    if classify_intake_complexity(user_input, trip_details.get("destination")) != INTAKE_SIMPLE:
+        return None
+    date_range = extract_date_range(user_input)
+    if date_range is None:
+        return None
+    start_date, end_date = date_range
+
+    tool_context = SimpleNamespace(state=dict(state))
+    update_trip_plan(tool_context=tool_context, start_date=start_date, end_date=end_date)
+    state_delta = {
+        key: tool_context.state[key]
+        for key in ("trip_details", "demographics", "preferences", "status")
+    }
+    reply = (
+        f"Got it. I've updated your {trip_details['destination']} trip dates to "
+        f"{start_date} through {end_date}. Anything else you'd like to change?"
+    )
+
+    # Record the exchange in the dispatcher's session as if it had handled the
+    # turn itself, so later dispatcher turns still see what the user said.
+    await session_service.append_event(
+        session,
+        Event(
+            author="user",
+            content=genai_types.Content(role="user", parts=[genai_types.Part(text=user_input)]),
+            actions=EventActions(state_delta=state_delta),
+        ),
+    )
+    await session_service.append_event(
+        session,
+        Event(
+            author=dispatcher_agent.name,
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=reply)]),
+        ),
+    )
+
+    INTAKE_COUNTERS["pre_llm_shortcut"] += 1
+    return reply
+
+
 # TODO: Can we save context by remove items after certain steps?
 
 async def main():
@@ -606,7 +1013,7 @@ async def main():
     user_id = "user-1"
 
     # Initialize the runner (The Engine)
-    runner = Runner(
+    runner = _get_runner(
         session_service=session_service,
         app_name=app_name,
         agent=dispatcher_agent,
@@ -621,6 +1028,9 @@ async def main():
         session_id=session_id,
     )
 
+    # Hide the model clients' cold-start cost behind the user's think time.
+    warmup_task = asyncio.create_task(warm_up_clients())
+
     print(f"Session created with ID: {session_id}")
     print("-----")
     print("-----")
@@ -636,11 +1046,28 @@ async def main():
 
     # Main interaction loop
     while True:
-        user_input = input("You: ")
+        user_input = await asyncio.to_thread(input, "You: ")
         if user_input.lower() in ["exit", "quit"]:
             print("Exiting Globe Tripper. Safe travels!")
+            warmup_task.cancel()
             break
 
+        INTAKE_COUNTERS["turns"] += 1
+        shortcut_reply = await try_intake_shortcut(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            user_input=user_input,
+        )
+        if shortcut_reply is not None:
+            print(f"Globe Tripper: {shortcut_reply}")
+            print(
+                f"[INTAKE] pre_llm_shortcut={INTAKE_COUNTERS['pre_llm_shortcut']}/"
+                f"{INTAKE_COUNTERS['turns']} turns"
+            )
+            continue
+
         # ADK Async Run
         response_text = ""
         try:
@@ -653,11 +1080,11 @@ async def main():
                 ),
             ):
                 # Capture the final response text from the agent
-                if event.is_final_response and event.content and getattr(
-                    event.content, "parts", None
-                ):
-                    first_part = event.content.parts[0]
-                    if hasattr(first_part, "text") and first_part.text:
+                content = event.content
+                parts = content.parts if content is not None else None
+                if event.is_final_response() and parts:
+                    first_part = parts[0]
+                    if first_part.text:
                         response_text = first_part.text
         except ValueError as e:
             # Handle occasional model transport errors gracefully instead of crashing.
@@ -690,15 +1117,22 @@ async def main():
                 user_id=user_id,
                 session_id=session_id,
             )
-            visa_raw = (current_session.state or {}).get("visa") or {}
-            visa_state = VisaState(**visa_raw)
+            visa_state = VisaState(**_state_section(current_session.state, "visa"))
+            flights_raw = _state_section(current_session.state, "flights")
+
+            # Visa research rarely moves the travel dates, so flight searches for
+            # the requested dates start now and overlap the visa phase. Tasks whose
+            # dates the visa timeline shifts are re-searched; the rest reuse these.
+            speculative_flight_searches = None
+            if not FlightState(**flights_raw).search_tasks:
+                speculative_flight_searches = start_speculative_flight_searches(planner_state)
 
             if not visa_state.search_tasks and not visa_state.search_results:
                 # Phase 1: run visa_agent to derive VisaSearchTasks.
-                visa_runner = Runner(
+                visa_runner = _get_runner(
                     session_service=session_service,
                     app_name=app_name,
-                    agent=visa_agent,
+                    agent=get_visa_agent(),
                 )
 
                 print("[PLANNER] Running visa_agent to derive visa search prompts...")
@@ -717,9 +1151,12 @@ async def main():
                         ],
                     ),
                 ):
-                    if event.is_final_response and event.content and getattr(event.content, "parts", None):
+                    record_prompt_cache_usage(event)
+                    content = event.content
+                    parts = content.parts if content is not None else None
+                    if event.is_final_response() and parts:
                         print("[PLANNER] Final reply from visa_agent:")
-                        print(event.content.parts[0].text)
+                        print(parts[0].text)
 
                 # Phase 2–3: run the reusable visa search + apply pipeline.
                 await run_visa_search_pipeline(
@@ -732,27 +1169,30 @@ async def main():
             # After visa planning/search, derive and fetch flight options for this
             # session. The helper internally checks whether flight tasks/results
             # already exist so it will only run once.
-            await run_flight_pipeline(
-                session_service=session_service,
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id,
-            )
-
-            # After flights are planned, derive and fetch accommodation options
-            # for this session. run_accommodation_pipeline performs its own
-            # checks and will only derive/search/apply once per session.
-            await run_accommodation_pipeline(
-                session_service=session_service,
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id,
-            )
+            flight_pipeline_finished = False
+            try:
+                await run_flight_pipeline(
+                    session_service=session_service,
+                    app_name=app_name,
+                    user_id=user_id,
+                    session_id=session_id,
+                    speculative_searches=speculative_flight_searches,
+                )
+                flight_pipeline_finished = True
+            finally:
+                # Searches the pipeline used were removed from the dict; the
+                # rest either matched no task or were never reached.
+                discard_speculative_flight_searches(
+                    speculative_flight_searches,
+                    "no flight task matched their route and dates"
+                    if flight_pipeline_finished
+                    else "flight pipeline stopped before using them",
+                )
 
-            # After accommodation is planned, derive activities and build a
-            # day-by-day itinerary for this session. run_activity_pipeline
+            # After flights are planned, fetch accommodation and activity options
+            # concurrently, then build the day-by-day itinerary. Each pipeline
             # performs its own checks and will only run once per session.
-            await run_activity_pipeline(
+            await run_post_flight_pipelines(
                 session_service=session_service,
                 app_name=app_name,
                 user_id=user_id,
@@ -778,19 +1218,15 @@ async def run_visa_search_pipeline(
     """
     Run the visa search pipeline for an existing session:
     - Read VisaSearchTasks from VisaState.
-    - For each pending task, call search_agent and the writer agent.
+    - Run search_agent for all pending tasks concurrently, then record each
+      result with the writer agent.
     - Ask visa_agent to apply results back into VisaRequirements.
     """
     # --- Phase 2: Run the search agent over pending VisaSearchTasks ---
-    search_runner = Runner(
-        session_service=session_service,
-        app_name=app_name,
-        agent=search_agent,
-    )
-    writer_runner = Runner(
+    writer_runner = _get_runner(
         session_service=session_service,
         app_name=app_name,
-        agent=visa_result_writer_agent,
+        agent=get_visa_result_writer_agent(),
     )
 
     # Reload visa state to find pending tasks
@@ -799,7 +1235,7 @@ async def run_visa_search_pipeline(
         user_id=user_id,
         session_id=session_id,
     )
-    visa_raw_for_search = (session_for_search.state or {}).get("visa") or {}
+    visa_raw_for_search = _state_section(session_for_search.state, "visa")
     visa_state_for_search = VisaState(**visa_raw_for_search)
 
     existing_results_by_task = {r.task_id for r in visa_state_for_search.search_results or []}
@@ -809,67 +1245,84 @@ async def run_visa_search_pipeline(
 
     print(f"[SEARCH] Found {len(pending_tasks)} pending VisaSearchTask(s)")
 
-    for idx, task in enumerate(pending_tasks, start=1):
-        print(f"[SEARCH] Processing task {idx}/{len(pending_tasks)}: task_id={task.task_id}")
+    def _search_prompt(task) -> str:
+        return task.prompt or (
+            f"Visa requirements, documents, fees, and processing time for a "
+            f"{task.nationality or 'UNKNOWN NATIONALITY'} traveler going from "
+            f"{task.origin_country or 'UNKNOWN ORIGIN'} to "
+            f"{task.destination_country or 'UNKNOWN DESTINATION'} "
+            f"for {task.travel_purpose or 'tourism'}."
+        )
 
-        search_payload = {
-            "task_id": task.task_id,
-            "search_prompt": task.prompt
-            or (
-                f"Visa requirements, documents, fees, and processing time for a "
-                f"{task.nationality or 'UNKNOWN NATIONALITY'} traveler going from "
-                f"{task.origin_country or 'UNKNOWN ORIGIN'} to "
-                f"{task.destination_country or 'UNKNOWN DESTINATION'} "
-                f"for {task.travel_purpose or 'tourism'}."
-            ),
-        }
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+    async def _resolve(task) -> Optional[Dict[str, Any]]:
+        search_prompt = _search_prompt(task)
+
+        # Identical visa questions (same route and nationality wording) are
+        # answered from the response cache instead of a fresh grounded search.
+        cached_result = visa_search_cache.get(search_prompt)
+        if cached_result is not None:
+            print(f"[SEARCH] Cache hit for task_id={task.task_id}; skipping search_agent.")
+            return dict(cached_result, task_id=task.task_id)
 
         print(
             f"[SEARCH] Calling search_agent for task_id={task.task_id} "
             f"(nationality={task.nationality}, origin={task.origin_country}, "
             f"destination={task.destination_country})"
         )
-
-        final_search_text = None
-        async for event in search_runner.run_async(
+        search_payload = {"task_id": task.task_id, "search_prompt": search_prompt}
+        final_search_text = await _run_isolated_search(
+            session_service=session_service,
+            app_name=app_name,
             user_id=user_id,
-            session_id=session_id,
-            new_message=genai_types.Content(
-                role="user",
-                parts=[
-                    genai_types.Part(
-                        text=(
-                            "Use google_search based on the following JSON payload "
-                            "and respond with a JSON object as instructed:\n"
-                            f"{json.dumps(search_payload)}"
-                        )
-                    )
-                ],
+            agent=get_search_agent(),
+            text=(
+                "Use google_search based on the following JSON payload "
+                "and respond with a JSON object as instructed:\n"
+                f"{to_json(search_payload).decode()}"
             ),
-        ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                final_search_text = event.content.parts[0].text
+            semaphore=semaphore,
+        )
 
         if not final_search_text:
             print(f"[SEARCH] No final response from search_agent for task_id={task.task_id}, skipping.")
-            continue
+            return None
 
         try:
-            parsed = json.loads(final_search_text)
-        except json.JSONDecodeError as e:
+            parsed = VisaSearchAgentOutput.model_validate_json(
+                _strip_code_fences(final_search_text)
+            ).model_dump()
+        except Exception as e:
             print(
-                f"[SEARCH] Failed to parse JSON for task_id={task.task_id}: {e}. "
+                f"[SEARCH] Failed to parse VisaSearchAgentOutput for task_id={task.task_id}: {e}. "
                 f"Preview: {final_search_text[:200]}..."
             )
-            continue
+            return None
+        visa_search_cache.set(search_prompt, parsed)
+        return parsed
+
+    # Searches are independent, so they all run before any result is written;
+    # total search time is roughly the slowest task rather than the sum.
+    parsed_results = await asyncio.gather(*(_resolve(task) for task in pending_tasks))
 
+    # Writes share the trip session (the staged current task), so they stay sequential.
+    for idx, (task, parsed) in enumerate(zip(pending_tasks, parsed_results), start=1):
+        if parsed is None:
+            continue
         print(
-            f"[SEARCH] Parsed result for task_id={task.task_id}: "
+            f"[SEARCH] Parsed result {idx}/{len(pending_tasks)} for task_id={task.task_id}: "
             f"processing_time_hint={parsed.get('processing_time_hint')!r}, "
             f"fee_hint={parsed.get('fee_hint')!r}"
         )
 
-        writer_input = json.dumps(parsed)
+        await _stage_current_task(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            payload=parsed,
+        )
         print(f"[WRITE] Calling visa_result_writer_agent for task_id={task.task_id}")
 
         async for event in writer_runner.run_async(
@@ -877,13 +1330,19 @@ async def run_visa_search_pipeline(
             session_id=session_id,
             new_message=genai_types.Content(
                 role="user",
-                parts=[genai_types.Part(text=writer_input)],
+                parts=[
+                    genai_types.Part(
+                        text=f"Record the staged visa search result for task_id={task.task_id}."
+                    )
+                ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
                 print(
                     f"[WRITE] Writer agent completed for task_id={task.task_id}: "
-                    f"{event.content.parts[0].text}"
+                    f"{parts[0].text}"
                 )
 
     # Inspect VisaState again to see search_results populated
@@ -892,17 +1351,17 @@ async def run_visa_search_pipeline(
         user_id=user_id,
         session_id=session_id,
     )
-    visa_raw_after_search = (session_after_search.state or {}).get("visa") or {}
+    visa_raw_after_search = _state_section(session_after_search.state, "visa")
     visa_state_after_search = VisaState(**visa_raw_after_search)
 
     print("[STATE] VisaState after search phase (search_results populated):")
     print(visa_state_after_search.model_dump_json(indent=2))
 
     # --- Phase 3: Ask visa_agent to apply search results back to VisaRequirements ---
-    apply_runner = Runner(
+    apply_runner = _get_runner(
         session_service=session_service,
         app_name=app_name,
-        agent=visa_agent,
+        agent=get_visa_agent(),
     )
 
     print("[APPLY] Running visa_agent to apply search results into visa requirements...")
@@ -922,9 +1381,12 @@ async def run_visa_search_pipeline(
             ],
         ),
     ):
-        if event.is_final_response and event.content and getattr(event.content, "parts", None):
+        record_prompt_cache_usage(event)
+        content = event.content
+        parts = content.parts if content is not None else None
+        if event.is_final_response() and parts:
             print("[APPLY] visa_agent final reply:")
-            print(event.content.parts[0].text)
+            print(parts[0].text)
 
     # Final VisaState with requirements updated from search_results
     final_session = await session_service.get_session(
@@ -932,23 +1394,142 @@ async def run_visa_search_pipeline(
         user_id=user_id,
         session_id=session_id,
     )
-    final_visa_raw = (final_session.state or {}).get("visa") or {}
+    final_visa_raw = _state_section(final_session.state, "visa")
     final_visa_state = VisaState(**final_visa_raw)
 
     print("[STATE] Final VisaState after apply phase (requirements + search_results):")
     print(final_visa_state.model_dump_json(indent=2))
 
 
-async def run_flight_search_pipeline(
-    session_service: InMemorySessionService,
+@dataclass(frozen=True, slots=True)
+class _FlightCandidate:
+    """
+    Numeric view of one normalized searchapi_google_flights option, used to
+    pick the cheapest/fastest/balanced options without repeated dict lookups.
+    """
+
+    price: Optional[float]
+    duration_minutes: Optional[int]
+    is_best: bool
+    option: Mapping[str, Any]
+
+    @classmethod
+    def from_option(cls, opt: Mapping[str, Any]) -> "_FlightCandidate":
+        price = opt.get("price")
+        duration = opt.get("duration_minutes")
+        return cls(
+            price=float(price) if isinstance(price, (int, float)) else None,
+            duration_minutes=duration if isinstance(duration, int) else None,
+            is_best=opt.get("source") == "best",
+            option=opt,
+        )
+
+
+# (origin, destination, departure_date, return_date, adults, cabin)
+FlightSearchKey = tuple[Optional[str], Optional[str], Optional[str], Optional[str], int, str]
+
+
+def _flight_task_key(task: FlightSearchTask) -> FlightSearchKey:
+    """
+    The search a FlightSearchTask resolves to; tasks with equal keys would send
+    identical searchapi_google_flights requests.
+    """
+    return (
+        task.origin_city,
+        task.destination_city,
+        task.recommended_departure_date or task.original_departure_date,
+        task.recommended_return_date or task.original_return_date,
+        len(task.traveler_indexes or []),
+        task.cabin_preference or "economy",
+    )
+
+
+def start_speculative_flight_searches(
+    planner_state: PlannerState,
+) -> Dict[FlightSearchKey, "asyncio.Task[Dict[str, Any]]"]:
+    """
+    Start SearchAPI flight searches for the user's originally requested dates.
+
+    Runs while the visa pipeline is still working out whether dates must move.
+    Travelers are grouped by origin the same way derive_flight_search_tasks
+    groups them, so in the common case (no visa-driven date shift) every
+    FlightSearchTask finds its result already in flight here.
+    """
+    trip = planner_state.trip_details
+    travelers = planner_state.demographics.travelers or []
+    if not trip.destination_airport_code or not trip.start_date or not travelers:
+        return {}
+
+    origin_default = trip.origin_airport_code or trip.origin
+    cabin = "business" if planner_state.preferences.budget_mode == "luxury" else "economy"
+
+    adults_by_origin: Counter = Counter(
+        traveler.origin_airport_code or traveler.origin or origin_default
+        for traveler in travelers
+    )
+
+    searches: Dict[FlightSearchKey, asyncio.Task[Dict[str, Any]]] = {}
+    for origin, adults in adults_by_origin.items():
+        if not origin:
+            continue
+        key = (origin, trip.destination_airport_code, trip.start_date, trip.end_date, adults, cabin)
+        searches[key] = asyncio.create_task(
+            asyncio.to_thread(
+                searchapi_google_flights,
+                None,
+                departure_id=origin,
+                arrival_id=trip.destination_airport_code,
+                outbound_date=trip.start_date,
+                return_date=trip.end_date,
+                adults=adults,
+                travel_class=cabin,
+            )
+        )
+    print(f"[FLIGHT-SEARCH] Started {len(searches)} speculative flight search(es) on the requested dates")
+    return searches
+
+
+def _consume_speculative_result(task: "asyncio.Task[Dict[str, Any]]") -> None:
+    # Retrieve the outcome so an unused failed search is not reported as an
+    # unhandled task exception.
+    if not task.cancelled():
+        task.exception()
+
+
+def discard_speculative_flight_searches(
+    searches: Optional[Dict[FlightSearchKey, "asyncio.Task[Dict[str, Any]]"]],
+    reason: str,
+) -> None:
+    """
+    Stop tracking speculative searches that no FlightSearchTask used.
+
+    The SearchAPI requests run on worker threads and cannot be interrupted, so
+    they are left to finish rather than cancelled: searchapi_google_flights
+    stores each successful response in flight_search_cache (when the response
+    cache is enabled), where a later search for the same route and dates finds it.
+    """
+    if not searches:
+        return
+    for task in searches.values():
+        task.add_done_callback(_consume_speculative_result)
+    print(f"[FLIGHT-SEARCH] Discarded {len(searches)} speculative flight search(es): {reason}")
+    searches.clear()
+
+
+async def run_flight_search_pipeline(
+    session_service: InMemorySessionService,
     app_name: str,
     user_id: str,
     session_id: str,
+    speculative_searches: Optional[Dict[FlightSearchKey, "asyncio.Task[Dict[str, Any]]"]] = None,
 ) -> None:
     """
     Run the flight search pipeline for an existing session:
     - Read FlightSearchTasks from FlightState.
-    - For each pending task, call flight_search_agent and the writer agent.
+    - Run flight_search_tool_agent for all pending tasks concurrently, each in
+      a scratch session, then record each result with flight_search_agent.
+      Tasks whose dates match a speculative search reuse its response instead
+      of calling flight_search_tool_agent.
     - Optionally apply results back into FlightState via flight_agent.
     """
     # Keep canonical, numeric options per task so that if the LLM fails to
@@ -963,22 +1544,15 @@ async def run_flight_search_pipeline(
         if not options:
             return []
 
-        def _get_price(o: Dict[str, Any]) -> float | None:
-            val = o.get("price")
-            return float(val) if isinstance(val, (int, float)) else None
-
-        def _get_duration(o: Dict[str, Any]) -> int | None:
-            val = o.get("duration_minutes")
-            return int(val) if isinstance(val, int) else None
-
-        def _canonical_option(label: str, opt: Dict[str, Any]) -> Dict[str, Any]:
+        def _canonical_option(label: str, candidate: _FlightCandidate) -> Dict[str, Any]:
+            opt = candidate.option
             legs = opt.get("legs") or []
             first_leg = legs[0] if legs else {}
             last_leg = legs[-1] if legs else {}
             dep_time = first_leg.get("departure_time")
             arr_time = last_leg.get("arrival_time")
-            duration_min = _get_duration(opt)
-            price = _get_price(opt)
+            duration_min = candidate.duration_minutes
+            price = candidate.price
             num_travelers = len(task.traveler_indexes or [])
             total = None
             if price is not None:
@@ -1006,18 +1580,28 @@ async def run_flight_search_pipeline(
                 "notes": None,
             }
 
+        # Read price/duration once per option; the scans below only touch
+        # slotted attributes.
+        candidates = [_FlightCandidate.from_option(o) for o in options]
+
         # Cheapest by price.
-        priced = [o for o in options if _get_price(o) is not None]
-        cheapest = min(priced, key=_get_price) if priced else None
+        cheapest = min(
+            (c for c in candidates if c.price is not None),
+            key=attrgetter("price"),
+            default=None,
+        )
 
         # Fastest by duration.
-        durd = [o for o in options if _get_duration(o) is not None]
-        fastest = min(durd, key=_get_duration) if durd else None
+        fastest = min(
+            (c for c in candidates if c.duration_minutes is not None),
+            key=attrgetter("duration_minutes"),
+            default=None,
+        )
 
         # Balanced: prefer "best" source, fall back to cheapest, then first option.
-        balanced = next((o for o in options if o.get("source") == "best"), None)
+        balanced = next((c for c in candidates if c.is_best), None)
         if balanced is None:
-            balanced = cheapest or (options[0] if options else None)
+            balanced = cheapest or candidates[0]
 
         canonical: list[Dict[str, Any]] = []
         for label, opt in (("cheapest", cheapest), ("fastest", fastest), ("balanced", balanced)):
@@ -1030,11 +1614,6 @@ async def run_flight_search_pipeline(
         for opt in canonical:
             seen.setdefault(opt["option_type"], opt)
         return list(seen.values())
-    search_tool_runner = Runner(
-        session_service=session_service,
-        app_name=app_name,
-        agent=flight_search_tool_agent,
-    )
 
     session_for_search = await session_service.get_session(
         app_name=app_name,
@@ -1042,7 +1621,7 @@ async def run_flight_search_pipeline(
         session_id=session_id,
     )
     planner_state = PlannerState(**(session_for_search.state or {}))
-    flights_raw = (session_for_search.state or {}).get("flights") or {}
+    flights_raw = _state_section(session_for_search.state, "flights")
     flight_state = FlightState(**flights_raw)
 
     existing_results_by_task = {r.task_id for r in flight_state.search_results or []}
@@ -1052,11 +1631,27 @@ async def run_flight_search_pipeline(
 
     print(f"[FLIGHT-SEARCH] Found {len(pending_tasks)} pending FlightSearchTask(s)")
 
+    # Tasks that resolve to the same search (for example when task derivation ran
+    # twice) are searched once; the recorded result is copied to the rest below.
+    unique_tasks: Dict[FlightSearchKey, FlightSearchTask] = {}
+    duplicates_by_task_id: Dict[str, list[FlightSearchTask]] = defaultdict(list)
+    for task in pending_tasks:
+        primary = unique_tasks.setdefault(_flight_task_key(task), task)
+        if primary is not task:
+            duplicates_by_task_id[primary.task_id].append(task)
+    if duplicates_by_task_id:
+        pending_tasks = list(unique_tasks.values())
+        print(
+            f"[FLIGHT-SEARCH] Deduplicated to {len(pending_tasks)} unique search(es); "
+            f"{sum(map(len, duplicates_by_task_id.values()))} task(s) will reuse a result"
+        )
+
     # Track which tasks we successfully reached the summarization stage for, so
     # we can add deterministic fallback results later if the model fails to
     # call record_flight_search_result.
     summary_attempted_task_ids: list[str] = []
 
+    search_payloads: Dict[str, Dict[str, Any]] = {}
     for task in pending_tasks:
         # Early guard: skip obviously past departure dates before calling agents/tools.
         departure_str = task.recommended_departure_date or task.original_departure_date
@@ -1074,7 +1669,7 @@ async def run_flight_search_pipeline(
                 # If parsing fails, fall through and let downstream logic handle it.
                 pass
 
-        search_payload = {
+        search_payloads[task.task_id] = {
             "task_id": task.task_id,
             "origin": task.origin_city,
             "destination": task.destination_city,
@@ -1092,36 +1687,44 @@ async def run_flight_search_pipeline(
                 f"with cabin preference {task.cabin_preference or 'economy'}."
             ),
         }
+    searchable_tasks = [t for t in pending_tasks if t.task_id in search_payloads]
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    search_tool_agent = get_flight_search_tool_agent()
 
+    async def _search(task: FlightSearchTask) -> Optional[Dict[str, Any]]:
         # --- Stage 1: tool-only agent to call searchapi_google_flights ---
-        tool_result = None
-        async for event in search_tool_runner.run_async(
+        speculative = (speculative_searches or {}).pop(_flight_task_key(task), None)
+        if speculative is not None:
+            tool_result = None
+            try:
+                tool_result = await speculative
+            except Exception as e:
+                print(f"[FLIGHT-SEARCH] Speculative search for task_id={task.task_id} failed: {e}")
+            if tool_result and tool_result.get("status") == "success":
+                print(f"[FLIGHT-SEARCH] Reusing speculative search result for task_id={task.task_id}")
+                return tool_result
+
+        return await _run_isolated_tool_call(
+            session_service=session_service,
+            app_name=app_name,
             user_id=user_id,
-            session_id=session_id,
-            new_message=genai_types.Content(
-                role="user",
-                parts=[
-                    genai_types.Part(
-                        text=(
-                            "Use searchapi_google_flights exactly once based on the following JSON payload, "
-                            "then stop. Do not generate any natural language text; the caller will use the "
-                            "tool response directly.\n"
-                            f"{json.dumps(search_payload)}"
-                        )
-                    )
-                ],
+            agent=search_tool_agent,
+            text=(
+                "Use searchapi_google_flights exactly once based on the following JSON payload, "
+                "then stop. Do not generate any natural language text; the caller will use the "
+                "tool response directly.\n"
+                f"{to_json(search_payloads[task.task_id]).decode()}"
             ),
-        ):
-            parts = getattr(getattr(event, "content", None), "parts", None)
-            if not parts:
-                continue
-            for part in parts:
-                func_resp = getattr(part, "function_response", None)
-                if func_resp and getattr(func_resp, "name", None) == "searchapi_google_flights":
-                    tool_result = getattr(func_resp, "response", None)
-                    break
-            if tool_result is not None:
-                break
+            semaphore=semaphore,
+        )
+
+    # Searches run in scratch sessions, so they overlap; the summary turns
+    # below write the trip session and stay sequential.
+    tool_results = await asyncio.gather(*(_search(task) for task in searchable_tasks))
+
+    for task, tool_result in zip(searchable_tasks, tool_results):
+        search_payload = search_payloads[task.task_id]
 
         if not tool_result:
             print(
@@ -1160,17 +1763,16 @@ async def run_flight_search_pipeline(
         # FlightSearchResult to work with.
         summary_attempted_task_ids.append(task.task_id)
 
-        from src.agents.flight_search_agent import flight_search_agent  # local import to avoid cycles
-        summary_runner = Runner(
+        summary_runner = _get_runner(
             session_service=session_service,
             app_name=app_name,
-            agent=flight_search_agent,
+            agent=get_flight_search_agent(),
         )
 
         summary_payload = {
             "task_id": task.task_id,
             "search_context": search_payload,
-            "options": candidate_options,
+            "options": _without_none(candidate_options),
         }
 
         async for event in summary_runner.run_async(
@@ -1186,7 +1788,7 @@ async def run_flight_search_pipeline(
                             "as instructed and then call the `record_flight_search_result` tool exactly once "
                             "with your normalized findings. You may include a brief natural-language confirmation "
                             "mentioning the task_id in your final answer, but do NOT return a JSON blob.\n"
-                            f"{json.dumps(summary_payload)}"
+                            f"{to_json(summary_payload).decode()}"
                         )
                     )
                 ],
@@ -1208,7 +1810,7 @@ async def run_flight_search_pipeline(
             user_id=user_id,
             session_id=session_id,
         )
-        flights_raw_post = (session_post_summary.state or {}).get("flights") or {}
+        flights_raw_post = _state_section(session_post_summary.state, "flights")
         flight_state_post = FlightState(**flights_raw_post)
 
         existing_results_by_task = {r.task_id for r in flight_state_post.search_results or []}
@@ -1231,12 +1833,7 @@ async def run_flight_search_pipeline(
 
                 options_payload = canonical_flight_options_by_task.get(task_id) or []
 
-                option_models: list[FlightOption] = []
-                for opt in options_payload:
-                    try:
-                        option_models.append(FlightOption(**opt))
-                    except Exception:
-                        continue
+                option_models = parse_flight_options(options_payload, task.task_id)
 
                 fallback_summary = (
                     f"Fallback summary for flights from {task.origin_city or 'UNKNOWN ORIGIN'} "
@@ -1263,14 +1860,47 @@ async def run_flight_search_pipeline(
                 )
                 flight_state_post.search_results.append(fallback_result)
 
-            # Persist updated FlightState back into the session so that downstream
-            # pipelines (including budget calculation and summaries) see the
-            # stub FlightSearchResult entries for all origin groups. For the
-            # in-memory session service used here, mutating the session object
-            # is sufficient.
-            state_obj = session_post_summary.state or {}
-            state_obj["flights"] = flight_state_post.model_dump()
-            session_post_summary.state = state_obj
+            # Persist updated FlightState back into the session so that the
+            # duplicate fan-out below and downstream pipelines (including budget
+            # calculation and summaries) see the stub FlightSearchResult entries
+            # for all origin groups. get_session returns a copy, so the stubs
+            # must be written through a state_delta event.
+            await session_service.append_event(
+                session_post_summary,
+                Event(
+                    author="user",
+                    actions=EventActions(state_delta={"flights": flight_state_post.model_dump()}),
+                ),
+            )
+
+    # Fan each recorded result out to the duplicate tasks that shared its search.
+    if duplicates_by_task_id:
+        session_dedup = await session_service.get_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+        flight_state_dedup = FlightState(**_state_section(session_dedup.state, "flights"))
+        results_by_task = {r.task_id: r for r in flight_state_dedup.search_results or []}
+        copied = 0
+        for task_id, duplicates in duplicates_by_task_id.items():
+            result = results_by_task.get(task_id)
+            if result is None:
+                continue
+            for duplicate in duplicates:
+                flight_state_dedup.search_results.append(
+                    result.model_copy(update={"task_id": duplicate.task_id, "query": duplicate.prompt})
+                )
+                copied += 1
+        if copied:
+            await session_service.append_event(
+                session_dedup,
+                Event(
+                    author="user",
+                    actions=EventActions(state_delta={"flights": flight_state_dedup.model_dump()}),
+                ),
+            )
+            print(f"[FLIGHT-SEARCH] Copied {copied} result(s) to duplicate task(s)")
 
     # Reload FlightState to see search_results populated
     session_after_search = await session_service.get_session(
@@ -1278,103 +1908,33 @@ async def run_flight_search_pipeline(
         user_id=user_id,
         session_id=session_id,
     )
-    flights_raw_after = (session_after_search.state or {}).get("flights") or {}
+    flights_raw_after = _state_section(session_after_search.state, "flights")
     flight_state_after = FlightState(**flights_raw_after)
 
-    # Keep a snapshot of search_results immediately after the search phase so
-    # we can restore them if a downstream agent accidentally clears them.
-    pre_apply_search_results = list(flight_state_after.search_results or [])
-
     print("[STATE] FlightState after flight search phase (search_results populated):")
     print(flight_state_after.model_dump_json(indent=2))
 
-    # Apply flight search results to derive overall_summary and per-traveler choices.
-    # First, request that the LLM-backed agent calls the tool, so we preserve its
-    # natural-language summary behavior for debugging.
-    from src.agents.flight_agent import flight_apply_agent  # local import to avoid cycles
-    apply_runner = Runner(
+    # Apply flight search results to derive overall_summary and per-traveler
+    # choices. The tool is a deterministic state update, so it is called directly
+    # rather than through an LLM turn that would only emit the same call.
+    print("[FLIGHT-APPLY] Applying flight search results...")
+    apply_result = await _run_state_tool(
         session_service=session_service,
         app_name=app_name,
-        agent=flight_apply_agent,
-    )
-
-    print("[FLIGHT-APPLY] Running flight_apply_agent to apply flight search results...")
-    async for event in apply_runner.run_async(
         user_id=user_id,
         session_id=session_id,
-        new_message=genai_types.Content(
-            role="user",
-            parts=[
-                genai_types.Part(
-                    text=(
-                        "Flight search results are now populated. "
-                        "Call apply_flight_search_results exactly once to update the flight state summary "
-                        "and per-traveler flight choices."
-                    )
-                )
-            ],
-        ),
-    ):
-        if event.is_final_response and event.content and getattr(event.content, "parts", None):
-            print("[FLIGHT-APPLY] flight_apply_agent final reply:")
-            print(event.content.parts[0].text)
+        tool=apply_flight_search_results,
+    )
+    print(f"[FLIGHT-APPLY] apply_flight_search_results status={apply_result.get('status')!r}")
 
-    # Deterministic fallback: ensure apply_flight_search_results has actually run
-    # so that FlightState.overall_summary and traveler_flights are populated even
-    # if the model fails to invoke the tool.
     final_session = await session_service.get_session(
         app_name=app_name,
         user_id=user_id,
         session_id=session_id,
     )
-    final_flights_raw = (final_session.state or {}).get("flights") or {}
+    final_flights_raw = _state_section(final_session.state, "flights")
     final_flight_state = FlightState(**final_flights_raw)
 
-    # If an upstream agent accidentally dropped search_results, but we have a
-    # snapshot from immediately after the search phase, restore it so that
-    # cost calculations and traveler_flights can still be derived.
-    if not final_flight_state.search_results and pre_apply_search_results:
-        print(
-            "[FLIGHT-APPLY] search_results empty after flight_apply_agent; "
-            "restoring snapshot captured after search phase."
-        )
-        final_flight_state.search_results = pre_apply_search_results
-        state_after_apply = final_session.state or {}
-        state_after_apply["flights"] = final_flight_state.model_dump()
-
-    if final_flight_state.search_results and not final_flight_state.traveler_flights:
-        print(
-            "[FLIGHT-APPLY] traveler_flights still empty after flight_apply_agent; "
-            "invoking flight_apply_tool_agent as a deterministic fallback."
-        )
-        from src.agents.flight_agent import flight_apply_tool_agent
-
-        tool_runner = Runner(
-            session_service=session_service,
-            app_name=app_name,
-            agent=flight_apply_tool_agent,
-        )
-
-        async for _ in tool_runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=genai_types.Content(
-                role="user",
-                parts=[genai_types.Part(text="Apply flight search results now.")],
-            ),
-        ):
-            # The tool call updates state; no need to inspect events.
-            continue
-
-        # Reload FlightState to reflect the tool's changes.
-        final_session = await session_service.get_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id,
-        )
-        final_flights_raw = (final_session.state or {}).get("flights") or {}
-        final_flight_state = FlightState(**final_flights_raw)
-
     # Reload and print FlightState after applying results so we can inspect
     # overall_summary and traveler_flights.
     print("[STATE] FlightState after apply_flight_search_results:")
@@ -1386,6 +1946,7 @@ async def run_flight_pipeline(
     app_name: str,
     user_id: str,
     session_id: str,
+    speculative_searches: Optional[Dict[FlightSearchKey, "asyncio.Task[Dict[str, Any]]"]] = None,
 ) -> None:
     """
     End-to-end flight planning pipeline for an existing session:
@@ -1398,15 +1959,15 @@ async def run_flight_pipeline(
         user_id=user_id,
         session_id=session_id,
     )
-    flights_raw = (session.state or {}).get("flights") or {}
+    flights_raw = _state_section(session.state, "flights")
     flight_state = FlightState(**flights_raw)
 
     # Phase 1: derive FlightSearchTasks using visa-aware dates (only once).
     if not flight_state.search_tasks:
-        flight_runner = Runner(
+        flight_runner = _get_runner(
             session_service=session_service,
             app_name=app_name,
-            agent=flight_agent,
+            agent=get_flight_agent(),
         )
 
         print("[PLANNER] Running flight_agent to derive flight search tasks...")
@@ -1426,9 +1987,11 @@ async def run_flight_pipeline(
                 ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                part = event.content.parts[0]
-                text = getattr(part, "text", None)
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                part = parts[0]
+                text = part.text
                 if isinstance(text, str) and text.strip():
                     final_flight_agent_text = text.strip()
 
@@ -1442,7 +2005,7 @@ async def run_flight_pipeline(
             user_id=user_id,
             session_id=session_id,
         )
-        flights_raw = (session.state or {}).get("flights") or {}
+        flights_raw = _state_section(session.state, "flights")
         flight_state = FlightState(**flights_raw)
 
         print("[STATE] FlightState after planning (search_tasks derived):")
@@ -1456,34 +2019,42 @@ async def run_flight_pipeline(
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
+            speculative_searches=speculative_searches,
         )
 
 
-async def run_accommodation_pipeline(
+@dataclass(frozen=True, slots=True)
+class _AccommodationSearch:
+    """
+    Raw search responses for a session's pending AccommodationSearchTasks,
+    gathered in scratch sessions and not yet recorded in the trip session.
+    """
+
+    pending_tasks: list[AccommodationSearchTask]
+    search_contexts: Dict[str, Dict[str, Any]]
+    tool_results: Dict[str, Optional[Dict[str, Any]]]
+
+
+async def _derive_accommodation_tasks(
     session_service: InMemorySessionService,
     app_name: str,
     user_id: str,
     session_id: str,
 ) -> None:
-    """
-    End-to-end accommodation planning pipeline for an existing session:
-    - Derive AccommodationSearchTasks using accommodation_agent (once per session).
-    - Run the accommodation search pipeline to populate search_results and traveler_accommodations.
-    """
+    """Derive AccommodationSearchTasks using accommodation_agent (once per session)."""
     session = await session_service.get_session(
         app_name=app_name,
         user_id=user_id,
         session_id=session_id,
     )
-    accommodation_raw = (session.state or {}).get("accommodation") or {}
+    accommodation_raw = _state_section(session.state, "accommodation")
     accommodation_state = AccommodationState(**accommodation_raw)
 
-    # Phase 1: derive AccommodationSearchTasks (only once).
     if not accommodation_state.search_tasks:
-        accom_runner = Runner(
+        accom_runner = _get_runner(
             session_service=session_service,
             app_name=app_name,
-            agent=accommodation_agent,
+            agent=get_accommodation_agent(),
         )
 
         print("[PLANNER] Running accommodation_agent to derive accommodation search tasks...")
@@ -1503,9 +2074,11 @@ async def run_accommodation_pipeline(
                 ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                part = event.content.parts[0]
-                text = getattr(part, "text", None)
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                part = parts[0]
+                text = part.text
                 if isinstance(text, str) and text.strip():
                     final_accommodation_text = text.strip()
 
@@ -1519,422 +2092,300 @@ async def run_accommodation_pipeline(
             user_id=user_id,
             session_id=session_id,
         )
-        accommodation_raw = (session.state or {}).get("accommodation") or {}
+        accommodation_raw = _state_section(session.state, "accommodation")
         accommodation_state = AccommodationState(**accommodation_raw)
 
         print("[STATE] AccommodationState after planning (search_tasks derived):")
         print(accommodation_state.model_dump_json(indent=2))
 
-    # Phase 2–3: run the accommodation search + apply pipeline once per session.
-    if accommodation_state.search_tasks and not accommodation_state.search_results:
-        print("[PLANNER] Running accommodation search pipeline...")
 
-        search_tool_runner = Runner(
-            session_service=session_service,
-            app_name=app_name,
-            agent=accommodation_search_tool_agent,
-        )
+async def _search_accommodation(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[_AccommodationSearch]:
+    """
+    Fetch raw options for every pending AccommodationSearchTask in scratch
+    sessions, leaving the trip session untouched. Returns None when the search
+    phase has already run (or there is nothing to search) for this session.
+    """
+    session_for_search = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    state_dict = session_for_search.state or {}
+    accommodation_state = AccommodationState(**_state_section(state_dict, "accommodation"))
+    if not accommodation_state.search_tasks or accommodation_state.search_results:
+        return None
+
+    print("[PLANNER] Running accommodation search pipeline...")
+    planner_state = PlannerState(**state_dict)
+    pending_tasks = list(accommodation_state.search_tasks)
+
+    print(f"[ACCOM-SEARCH] Found {len(pending_tasks)} pending AccommodationSearchTask(s)")
+
+    # Build a compact search_context for every pending task up front so the
+    # external searches can be issued as one batched tool call.
+    search_contexts: Dict[str, Dict[str, Any]] = {}
+    for task in pending_tasks:
+        adults = sum(1 for idx in (task.traveler_indexes or []) if planner_state.demographics.travelers[idx].role == "adult") if planner_state.demographics.travelers else len(task.traveler_indexes or [])
+        children = sum(1 for idx in (task.traveler_indexes or []) if planner_state.demographics.travelers[idx].role == "child") if planner_state.demographics.travelers else 0
+
+        search_contexts[task.task_id] = {
+            "task_id": task.task_id,
+            "location": task.location,
+            "check_in_date": task.check_in_date,
+            "check_out_date": task.check_out_date,
+            "adults": adults,
+            "children": children,
+            "preferred_types": task.preferred_types,
+            "room_configuration": task.room_configuration,
+            "neighborhood_preferences": task.neighborhood_preferences,
+            "neighborhood_avoid": task.neighborhood_avoid,
+        }
 
-        session_for_search = await session_service.get_session(
+    # With several tasks, fetch all of them in a single agent turn. Any task
+    # missing from the batch response (or a failed batch) falls back to the
+    # single-task agent below, which keeps per-task error isolation.
+    tool_results: Dict[str, Optional[Dict[str, Any]]] = {}
+    if len(pending_tasks) > 1:
+        batch_payload = {
+            "tasks": [
+                {"task_id": task_id, "search_context": context}
+                for task_id, context in search_contexts.items()
+            ]
+        }
+        batch_result = await _run_isolated_tool_call(
+            session_service=session_service,
             app_name=app_name,
             user_id=user_id,
-            session_id=session_id,
+            agent=get_accommodation_search_batch_tool_agent(),
+            text=(
+                "Call searchapi_accommodation_batch exactly once for all tasks in the following "
+                "JSON payload, then stop.\n"
+                f"{to_json(batch_payload).decode()}"
+            ),
+            semaphore=semaphore,
+        )
+        for task_id, result in ((batch_result or {}).get("results") or {}).items():
+            if isinstance(result, dict) and result.get("status") == "success":
+                tool_results[task_id] = result
+        print(
+            f"[ACCOM-SEARCH] Batched search returned results for "
+            f"{len(tool_results)}/{len(pending_tasks)} task(s)"
         )
-        state_dict = session_for_search.state or {}
-        planner_state = PlannerState(**state_dict)
-        accommodation_raw = state_dict.get("accommodation") or {}
-        accommodation_state = AccommodationState(**accommodation_raw)
-
-        existing_results_by_task = {r.task_id for r in accommodation_state.search_results or []}
-        pending_tasks = [
-            t for t in accommodation_state.search_tasks or [] if t.task_id not in existing_results_by_task
-        ]
-        summary_attempted_task_ids: list[str] = []
-        canonical_options_by_task: Dict[str, list[Dict[str, Any]]] = {}
-
-        print(f"[ACCOM-SEARCH] Found {len(pending_tasks)} pending AccommodationSearchTask(s)")
-
-        for task in pending_tasks:
-            # Build a compact search_context for this task.
-            adults = sum(1 for idx in (task.traveler_indexes or []) if planner_state.demographics.travelers[idx].role == "adult") if planner_state.demographics.travelers else len(task.traveler_indexes or [])
-            children = sum(1 for idx in (task.traveler_indexes or []) if planner_state.demographics.travelers[idx].role == "child") if planner_state.demographics.travelers else 0
-
-            search_context = {
-                "task_id": task.task_id,
-                "location": task.location,
-                "check_in_date": task.check_in_date,
-                "check_out_date": task.check_out_date,
-                "adults": adults,
-                "children": children,
-                "preferred_types": task.preferred_types,
-                "room_configuration": task.room_configuration,
-                "neighborhood_preferences": task.neighborhood_preferences,
-                "neighborhood_avoid": task.neighborhood_avoid,
-            }
 
-            tool_result = None
-            async for event in search_tool_runner.run_async(
+    search_tool_agent = get_accommodation_search_tool_agent()
+    missing_task_ids = [t.task_id for t in pending_tasks if t.task_id not in tool_results]
+    single_results = await asyncio.gather(
+        *(
+            _run_isolated_tool_call(
+                session_service=session_service,
+                app_name=app_name,
                 user_id=user_id,
-                session_id=session_id,
-                new_message=genai_types.Content(
-                    role="user",
-                    parts=[
-                        genai_types.Part(
-                            text=(
-                                "Use exactly one of the accommodation search tools based on the following JSON payload, "
-                                "then stop. Do not generate any natural language text; the caller will use the "
-                                "tool response directly.\n"
-                                f"{json.dumps(search_context)}"
-                            )
-                        )
-                    ],
+                agent=search_tool_agent,
+                text=(
+                    "Use exactly one of the accommodation search tools based on the following JSON payload, "
+                    "then stop. Do not generate any natural language text; the caller will use the "
+                    "tool response directly.\n"
+                    f"{to_json(search_contexts[task_id]).decode()}"
                 ),
-            ):
-                parts = getattr(getattr(event, "content", None), "parts", None)
-                if not parts:
-                    continue
-                for part in parts:
-                    func_resp = getattr(part, "function_response", None)
-                    if func_resp and getattr(func_resp, "response", None) is not None:
-                        tool_result = getattr(func_resp, "response", None)
-                        break
-                if tool_result is not None:
-                    break
-
-            if not tool_result:
-                print(
-                    f"[ACCOM-SEARCH] No tool result from accommodation_search_tool_agent for "
-                    f"task_id={task.task_id}, skipping."
-                )
-                continue
+                semaphore=semaphore,
+            )
+            for task_id in missing_task_ids
+        )
+    )
+    tool_results.update(zip(missing_task_ids, single_results))
 
-            options = (tool_result or {}).get("options") or []
-            if not options:
-                print(
-                    f"[ACCOM-SEARCH] Tool result for task_id={task.task_id} had no usable options."
-                )
-                # We still want downstream logic to know that a search was attempted,
-                # so record the task_id; stub results will be created later.
-                summary_attempted_task_ids.append(task.task_id)
-                canonical_options_by_task[task.task_id] = []
-                continue
-            # Filter out options that clearly cannot accommodate the traveling party
-            # based on max_guests, when that metadata is available.
-            num_people = adults + children if (adults or children) else len(task.traveler_indexes or [])
-            if num_people and isinstance(num_people, int):
-                filtered_options: list[Dict[str, Any]] = []
-                for opt in options:
-                    if not isinstance(opt, dict):
-                        continue
-                    max_guests = opt.get("max_guests")
-                    if isinstance(max_guests, (int, float)) and max_guests < num_people:
-                        continue
-                    filtered_options.append(opt)
-                if not filtered_options:
-                    print(
-                        f"[ACCOM-SEARCH] All options for task_id={task.task_id} "
-                        f"were filtered out as under-capacity for {num_people} traveler(s)."
-                    )
-                    summary_attempted_task_ids.append(task.task_id)
-                    canonical_options_by_task[task.task_id] = []
-                    continue
-                options = filtered_options
-            # Build canonical options that the summarization agent + tool call will use.
-            canonical_options = _build_canonical_accommodation_options(options)
+    return _AccommodationSearch(
+        pending_tasks=pending_tasks,
+        search_contexts=search_contexts,
+        tool_results=tool_results,
+    )
+
+
+async def _record_accommodation_results(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    search: _AccommodationSearch,
+) -> None:
+    """
+    Summarize and record each fetched result in the trip session, then apply
+    the results to traveler_accommodations. Every turn here writes the trip
+    session, so callers run this step on its own.
+    """
+    summary_runner = _get_runner(
+        session_service=session_service,
+        app_name=app_name,
+        agent=get_accommodation_search_agent(),
+    )
+    summary_attempted_task_ids: list[str] = []
+    canonical_options_by_task: Dict[str, list[Dict[str, Any]]] = {}
 
-            if not canonical_options:
+    for task in search.pending_tasks:
+        search_context = search.search_contexts[task.task_id]
+        adults = search_context["adults"]
+        children = search_context["children"]
+
+        tool_result = search.tool_results.get(task.task_id)
+        if not tool_result:
+            print(
+                f"[ACCOM-SEARCH] No tool result from accommodation_search_tool_agent for "
+                f"task_id={task.task_id}, skipping."
+            )
+            continue
+
+        options = (tool_result or {}).get("options") or []
+        if not options:
+            print(
+                f"[ACCOM-SEARCH] Tool result for task_id={task.task_id} had no usable options."
+            )
+            # We still want downstream logic to know that a search was attempted,
+            # so record the task_id; stub results will be created later.
+            summary_attempted_task_ids.append(task.task_id)
+            canonical_options_by_task[task.task_id] = []
+            continue
+        # Filter out options that clearly cannot accommodate the traveling party
+        # based on max_guests, when that metadata is available.
+        num_people = adults + children if (adults or children) else len(task.traveler_indexes or [])
+        if num_people and isinstance(num_people, int):
+            filtered_options: list[Dict[str, Any]] = []
+            for opt in options:
+                if not isinstance(opt, dict):
+                    continue
+                max_guests = opt.get("max_guests")
+                if isinstance(max_guests, (int, float)) and max_guests < num_people:
+                    continue
+                filtered_options.append(opt)
+            if not filtered_options:
                 print(
-                    f"[ACCOM-SEARCH] No canonical options could be derived for task_id={task.task_id}."
+                    f"[ACCOM-SEARCH] All options for task_id={task.task_id} "
+                    f"were filtered out as under-capacity for {num_people} traveler(s)."
                 )
                 summary_attempted_task_ids.append(task.task_id)
                 canonical_options_by_task[task.task_id] = []
                 continue
+            options = filtered_options
+        # Build canonical options that the summarization agent + tool call will use.
+        canonical_options = _build_canonical_accommodation_options(options)
 
-            # --- Stage 2: LLM summarization + tool call over canonical options ---
-            canonical_options_by_task[task.task_id] = canonical_options
+        if not canonical_options:
+            print(
+                f"[ACCOM-SEARCH] No canonical options could be derived for task_id={task.task_id}."
+            )
             summary_attempted_task_ids.append(task.task_id)
+            canonical_options_by_task[task.task_id] = []
+            continue
 
-            summary_runner = Runner(
-                session_service=session_service,
-                app_name=app_name,
-                agent=accommodation_search_agent,
-            )
+        # --- Stage 2: LLM summarization + tool call over canonical options ---
+        canonical_options_by_task[task.task_id] = canonical_options
+        summary_attempted_task_ids.append(task.task_id)
 
-            summary_payload = {
-                "task_id": task.task_id,
-                "search_context": search_context,
-                "options": canonical_options,
-            }
+        summary_payload = {
+            "task_id": task.task_id,
+            "search_context": search_context,
+            "options": _without_none(canonical_options),
+        }
 
-            async for _event in summary_runner.run_async(
-                user_id=user_id,
-                session_id=session_id,
-                new_message=genai_types.Content(
-                    role="user",
-                    parts=[
-                        genai_types.Part(
-                            text=(
-                                "Given the following JSON payload (task_id, search_context, and a list of canonical "
-                                "accommodation options), choose and summarize the best options AND call "
-                                "`record_accommodation_search_result` exactly once with your normalized findings. "
-                                "Do not return a JSON blob yourself; rely on the tool call.\n"
-                                f"{json.dumps(summary_payload)}"
-                            )
-                        )
-                    ],
-                ),
-            ):
-                # Tool call is the primary output; we don't need to inspect text here.
-                continue
-
-        # Persist updated AccommodationState back into the session so that
-        # subsequent reads (and the apply step) see the recorded search results.
-        if summary_attempted_task_ids:
-            session_post_summary = await session_service.get_session(
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id,
-            )
-            accommodation_raw_post = (session_post_summary.state or {}).get(
-                "accommodation"
-            ) or {}
-            accommodation_state_post = AccommodationState(**accommodation_raw_post)
-
-            # Repair any AccommodationSearchResult entries that are missing structured
-            # options by filling them from the canonical options we derived earlier.
-            # This ensures downstream cost calculations and traveler_accommodations
-            # selection logic have concrete AccommodationOption objects to work with,
-            # even if the summarization agent omitted them from its tool call.
-            if canonical_options_by_task:
-                for result in accommodation_state_post.search_results or []:
-                    if result.options:
-                        continue
-                    options_payload = canonical_options_by_task.get(result.task_id) or []
-                    if not options_payload:
-                        continue
-                    option_models: list[AccommodationOption] = []
-                    for opt in options_payload:
-                        try:
-                            option_models.append(AccommodationOption(**opt))
-                        except Exception:
-                            continue
-                    if not option_models:
-                        continue
-                    result.options = option_models
-                    # If the summarizer did not specify a chosen_option_type, default to
-                    # "balanced" when available, otherwise fall back to the first option's type.
-                    if not result.chosen_option_type:
-                        balanced_opt = next(
-                            (o for o in option_models if o.option_type == "balanced"),
-                            None,
-                        )
-                        if balanced_opt is not None:
-                            result.chosen_option_type = "balanced"
-                        else:
-                            result.chosen_option_type = option_models[0].option_type
-
-            existing_results_by_task = {
-                r.task_id for r in accommodation_state_post.search_results or []
-            }
-            # Any tasks that still lack a recorded AccommodationSearchResult (for example
-            # when external APIs return errors or no options) should get a lightweight
-            # fallback result so downstream agents and summaries can explain the
-            # situation instead of silently omitting accommodation.
-            missing_task_ids = [
-                t.task_id
-                for t in (accommodation_state.search_tasks or [])
-                if t.task_id not in existing_results_by_task
-            ]
-
-            if missing_task_ids:
-                print(
-                    "[ACCOM-SEARCH] No AccommodationSearchResult recorded after summarization for "
-                    f"task_id(s)={missing_task_ids}; creating stub result(s)."
-                )
-
-                tasks_by_id = {t.task_id: t for t in (accommodation_state.search_tasks or [])}
-                for task_id in missing_task_ids:
-                    task = tasks_by_id.get(task_id)
-                    options_payload = canonical_options_by_task.get(task_id) or []
-
-                    option_models: list[AccommodationOption] = []
-                    for opt in options_payload:
-                        try:
-                            option_models.append(AccommodationOption(**opt))
-                        except Exception:
-                            continue
-
-                    fallback_summary = (
-                        f"Fallback summary for accommodation in {task.location if task else 'UNKNOWN LOCATION'} "
-                        f"for travelers {task.traveler_indexes if task else 'UNKNOWN'}: "
-                        "live accommodation options could not be fetched. You should still book a family‑friendly "
-                        "property in a quiet, well‑connected neighbourhood that matches your room configuration "
-                        "and budget."
-                    )
-
-                    best_price_hint = None
-                    recommended_option_label = None
-                    if options_payload:
-                        cheapest = next(
-                            (o for o in options_payload if o.get("option_type") == "cheapest"),
-                            options_payload[0],
-                        )
-                        total = cheapest.get("total_price_low") or cheapest.get("total_price_high")
-                        nightly = cheapest.get("nightly_price_low") or cheapest.get("nightly_price_high")
-                        if total:
-                            best_price_hint = f"Approximate total price for the stay: {total}"
-                        elif nightly:
-                            best_price_hint = f"Typical nightly rate from {nightly}"
-
-                        balanced = next(
-                            (o for o in options_payload if o.get("option_type") == "balanced"),
-                            None,
-                        ) or cheapest
-                        if balanced.get("name"):
-                            recommended_option_label = balanced["name"]
-
-                    accommodation_state_post.search_results.append(
-                        AccommodationSearchResult(
-                            task_id=task_id,
-                            query=task.prompt if task else None,
-                            options=option_models,
-                            summary=fallback_summary,
-                            best_price_hint=best_price_hint,
-                            best_location_hint=None,
-                            family_friendly_hint=None,
-                            neighborhood_hint=None,
-                            recommended_option_label=recommended_option_label,
-                            notes=None,
-                            chosen_option_type="balanced" if options_payload else None,
-                            selection_reason=(
-                                "Balanced choice based on price, location, and rating."
-                                if options_payload
-                                else None
-                            ),
-                        )
-                    )
-
-            # Persist updated AccommodationState back into the session after any
-            # repairs or stub creations so the apply step sees consistent,
-            # option-bearing search_results.
-            state_obj = session_post_summary.state or {}
-            state_obj["accommodation"] = accommodation_state_post.model_dump()
-
-        # Reload AccommodationState to see search_results populated.
-        session_after_search = await session_service.get_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id,
-        )
-        accommodation_raw_after = (session_after_search.state or {}).get("accommodation") or {}
-        accommodation_state_after = AccommodationState(**accommodation_raw_after)
-
-        print(
-            "[STATE] AccommodationState after accommodation search phase (search_results populated):"
-        )
-        print(accommodation_state_after.model_dump_json(indent=2))
-
-        # Apply accommodation search results to derive overall_summary and per-traveler choices.
-        apply_runner = Runner(
-            session_service=session_service,
-            app_name=app_name,
-            agent=accommodation_apply_agent,
-        )
-
-        print(
-            "[ACCOM-APPLY] Running accommodation_apply_agent to apply accommodation search results..."
-        )
-        async for event in apply_runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=genai_types.Content(
-                role="user",
-                parts=[
-                    genai_types.Part(
-                        text=(
-                            "Accommodation search results are now populated. "
-                            "Call apply_accommodation_search_results exactly once to update the accommodation "
-                            "state summary and per-traveler accommodation choices."
+        async for _event in summary_runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=genai_types.Content(
+                role="user",
+                parts=[
+                    genai_types.Part(
+                        text=(
+                            "Given the following JSON payload (task_id, search_context, and a list of canonical "
+                            "accommodation options), choose and summarize the best options AND call "
+                            "`record_accommodation_search_result` exactly once with your normalized findings. "
+                            "Do not return a JSON blob yourself; rely on the tool call.\n"
+                            f"{to_json(summary_payload).decode()}"
                         )
                     )
                 ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                print("[ACCOM-APPLY] accommodation_apply_agent final reply:")
-                print(event.content.parts[0].text)
+            # Tool call is the primary output; we don't need to inspect text here.
+            continue
 
-        # Reload AccommodationState after applying results so we can inspect it.
-        final_session = await session_service.get_session(
+    # Persist updated AccommodationState back into the session so that
+    # subsequent reads (and the apply step) see the recorded search results.
+    if summary_attempted_task_ids:
+        session_post_summary = await session_service.get_session(
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
         )
-        final_accommodation_raw = (final_session.state or {}).get("accommodation") or {}
-        final_accommodation_state = AccommodationState(**final_accommodation_raw)
-
-        if final_accommodation_state.search_results and not final_accommodation_state.traveler_accommodations:
-            print(
-                "[ACCOM-APPLY] traveler_accommodations still empty after accommodation_apply_agent; "
-                "invoking accommodation_apply_tool_agent as a deterministic fallback."
-            )
-            from src.agents.accommodation_agent import accommodation_apply_tool_agent  # local import to avoid cycles
+        accommodation_raw_post = _state_section(session_post_summary.state, "accommodation")
+        accommodation_state_post = AccommodationState(**accommodation_raw_post)
+
+        # Repair any AccommodationSearchResult entries that are missing structured
+        # options by filling them from the canonical options we derived earlier.
+        # This ensures downstream cost calculations and traveler_accommodations
+        # selection logic have concrete AccommodationOption objects to work with,
+        # even if the summarization agent omitted them from its tool call.
+        if canonical_options_by_task:
+            for result in accommodation_state_post.search_results or []:
+                if result.options:
+                    continue
+                options_payload = canonical_options_by_task.get(result.task_id) or []
+                if not options_payload:
+                    continue
+                option_models = parse_accommodation_options(
+                    options_payload, result.task_id
+                )
+                if not option_models:
+                    continue
+                result.options = option_models
+                # If the summarizer did not specify a chosen_option_type, default to
+                # "balanced" when available, otherwise fall back to the first option's type.
+                if not result.chosen_option_type:
+                    balanced_opt = next(
+                        (o for o in option_models if o.option_type == "balanced"),
+                        None,
+                    )
+                    if balanced_opt is not None:
+                        result.chosen_option_type = "balanced"
+                    else:
+                        result.chosen_option_type = option_models[0].option_type
 
-            apply_tool_runner = Runner(
-                session_service=session_service,
-                app_name=app_name,
-                agent=accommodation_apply_tool_agent,
-            )
-            async for _ in apply_tool_runner.run_async(
-                user_id=user_id,
-                session_id=session_id,
-                new_message=genai_types.Content(
-                    role="user",
-                    parts=[genai_types.Part(text="Call apply_accommodation_search_results now.")],
-                ),
-            ):
-                continue
+        existing_results_by_task = {
+            r.task_id for r in accommodation_state_post.search_results or []
+        }
+        # Any tasks that still lack a recorded AccommodationSearchResult (for example
+        # when external APIs return errors or no options) should get a lightweight
+        # fallback result so downstream agents and summaries can explain the
+        # situation instead of silently omitting accommodation.
+        missing_task_ids = [
+            t.task_id
+            for t in (accommodation_state_post.search_tasks or [])
+            if t.task_id not in existing_results_by_task
+        ]
 
-            final_session = await session_service.get_session(
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id,
-            )
-            final_accommodation_raw = (final_session.state or {}).get("accommodation") or {}
-            final_accommodation_state = AccommodationState(**final_accommodation_raw)
-
-        # Deterministic fallback: if search_results is still empty here but we
-        # have canonical options from the search step, construct minimal
-        # AccommodationSearchResult and traveler_accommodations directly so
-        # downstream views have something to work with.
-        if not final_accommodation_state.search_results and canonical_options_by_task:
+        if missing_task_ids:
             print(
-                "[ACCOM-APPLY] No AccommodationSearchResult present after apply; "
-                "building fallback results from canonical options."
+                "[ACCOM-SEARCH] No AccommodationSearchResult recorded after summarization for "
+                f"task_id(s)={missing_task_ids}; creating stub result(s)."
             )
 
-            tasks_by_id = {t.task_id: t for t in (final_accommodation_state.search_tasks or [])}
-            fallback_results: list[AccommodationSearchResult] = []
-
-            for task_id, options_payload in canonical_options_by_task.items():
+            tasks_by_id = {t.task_id: t for t in (accommodation_state_post.search_tasks or [])}
+            for task_id in missing_task_ids:
                 task = tasks_by_id.get(task_id)
-                if not task:
-                    continue
+                options_payload = canonical_options_by_task.get(task_id) or []
 
-                option_models: list[AccommodationOption] = []
-                for opt in options_payload:
-                    try:
-                        option_models.append(AccommodationOption(**opt))
-                    except Exception:
-                        continue
-
-                if not option_models:
-                    continue
+                option_models = parse_accommodation_options(options_payload, task_id)
 
                 fallback_summary = (
                     f"Fallback summary for accommodation in {task.location if task else 'UNKNOWN LOCATION'} "
-                    f"for travelers {task.traveler_indexes if task else 'UNKNOWN'}: canonical accommodation "
-                    "options were fetched, but no normalized result was recorded."
+                    f"for travelers {task.traveler_indexes if task else 'UNKNOWN'}: "
+                    "live accommodation options could not be fetched. You should still book a family‑friendly "
+                    "property in a quiet, well‑connected neighbourhood that matches your room configuration "
+                    "and budget."
                 )
 
                 best_price_hint = None
@@ -1958,7 +2409,7 @@ async def run_accommodation_pipeline(
                     if balanced.get("name"):
                         recommended_option_label = balanced["name"]
 
-                fallback_results.append(
+                accommodation_state_post.search_results.append(
                     AccommodationSearchResult(
                         task_id=task_id,
                         query=task.prompt if task else None,
@@ -1979,88 +2430,256 @@ async def run_accommodation_pipeline(
                     )
                 )
 
-            if fallback_results:
-                final_accommodation_state.search_results = fallback_results
-
-                # Build overall_summary and traveler_accommodations mirroring
-                # apply_accommodation_search_results logic.
-                lines: list[str] = []
-                for result in final_accommodation_state.search_results:
-                    parts: list[str] = []
-                    if result.summary:
-                        parts.append(result.summary.strip())
-                    if result.best_price_hint:
-                        parts.append(f"Price hint: {result.best_price_hint}")
-                    if result.best_location_hint:
-                        parts.append(f"Location hint: {result.best_location_hint}")
-                    if result.recommended_option_label:
-                        parts.append(f"Recommended: {result.recommended_option_label}")
-                    line = " ".join(parts)
-                    if line:
-                        lines.append(f"- Task {result.task_id}: {line}")
-
-                if lines:
-                    final_accommodation_state.overall_summary = "\n".join(lines)
-
-                planner_state_after = PlannerState(**(final_session.state or {}))
-                travelers = planner_state_after.demographics.travelers or []
-                results_by_task: Dict[str, AccommodationSearchResult] = {
-                    r.task_id: r for r in final_accommodation_state.search_results or []
-                }
+        # Persist updated AccommodationState back into the session after any
+        # repairs or stub creations so the apply step sees consistent,
+        # option-bearing search_results. get_session returns a copy, so the
+        # update goes through a state_delta event.
+        await session_service.append_event(
+            session_post_summary,
+            Event(
+                author="user",
+                actions=EventActions(
+                    state_delta={"accommodation": accommodation_state_post.model_dump()}
+                ),
+            ),
+        )
 
-                traveler_accommodations: list[TravelerAccommodationChoice] = []
-                for traveler_index in range(len(travelers)):
-                    for task in final_accommodation_state.search_tasks or []:
-                        if traveler_index not in (task.traveler_indexes or []):
-                            continue
+    # Reload AccommodationState to see search_results populated.
+    session_after_search = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    accommodation_raw_after = _state_section(session_after_search.state, "accommodation")
+    accommodation_state_after = AccommodationState(**accommodation_raw_after)
 
-                        result = results_by_task.get(task.task_id)
-                        if result is None:
-                            continue
+    print(
+        "[STATE] AccommodationState after accommodation search phase (search_results populated):"
+    )
+    print(accommodation_state_after.model_dump_json(indent=2))
 
-                        chosen_option = None
-                        other_options: list[AccommodationOption] = []
-
-                        chosen_type = result.chosen_option_type
-                        for opt in result.options or []:
-                            if (
-                                chosen_type
-                                and opt.option_type == chosen_type
-                                and chosen_option is None
-                            ):
-                                chosen_option = opt
-                            else:
-                                other_options.append(opt)
-
-                        if chosen_option is None and result.options:
-                            chosen_option = result.options[0]
-                            other_options = list(result.options[1:])
-
-                        traveler_accommodations.append(
-                            TravelerAccommodationChoice(
-                                traveler_index=traveler_index,
-                                task_id=task.task_id,
-                                summary=result.summary,
-                                best_price_hint=result.best_price_hint,
-                                best_location_hint=result.best_location_hint,
-                                family_friendly_hint=result.family_friendly_hint,
-                                neighborhood_hint=result.neighborhood_hint,
-                                recommended_option_label=result.recommended_option_label,
-                                notes=result.notes,
-                                chosen_option_type=result.chosen_option_type,
-                                selection_reason=result.selection_reason,
-                                chosen_option=chosen_option,
-                                other_options=other_options,
-                            )
+    # Apply accommodation search results to derive overall_summary and
+    # per-traveler choices directly; no LLM turn is needed for this call.
+    print("[ACCOM-APPLY] Applying accommodation search results...")
+    await _run_state_tool(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        tool=apply_accommodation_search_results,
+    )
+
+    final_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    final_accommodation_raw = _state_section(final_session.state, "accommodation")
+    final_accommodation_state = AccommodationState(**final_accommodation_raw)
+
+    print(
+        "[ACCOM-APPLY] Applied accommodation search results: "
+        f"num_results={len(final_accommodation_state.search_results or [])}, "
+        f"num_traveler_choices={len(final_accommodation_state.traveler_accommodations or [])}"
+    )
+
+    # Deterministic fallback: if search_results is still empty here but we
+    # have canonical options from the search step, construct minimal
+    # AccommodationSearchResult and traveler_accommodations directly so
+    # downstream views have something to work with.
+    if not final_accommodation_state.search_results and canonical_options_by_task:
+        print(
+            "[ACCOM-APPLY] No AccommodationSearchResult present after apply; "
+            "building fallback results from canonical options."
+        )
+
+        tasks_by_id = {t.task_id: t for t in (final_accommodation_state.search_tasks or [])}
+        fallback_results: list[AccommodationSearchResult] = []
+
+        for task_id, options_payload in canonical_options_by_task.items():
+            task = tasks_by_id.get(task_id)
+            if not task:
+                continue
+
+            option_models = parse_accommodation_options(options_payload, task_id)
+
+            if not option_models:
+                continue
+
+            fallback_summary = (
+                f"Fallback summary for accommodation in {task.location if task else 'UNKNOWN LOCATION'} "
+                f"for travelers {task.traveler_indexes if task else 'UNKNOWN'}: canonical accommodation "
+                "options were fetched, but no normalized result was recorded."
+            )
+
+            best_price_hint = None
+            recommended_option_label = None
+            if options_payload:
+                cheapest = next(
+                    (o for o in options_payload if o.get("option_type") == "cheapest"),
+                    options_payload[0],
+                )
+                total = cheapest.get("total_price_low") or cheapest.get("total_price_high")
+                nightly = cheapest.get("nightly_price_low") or cheapest.get("nightly_price_high")
+                if total:
+                    best_price_hint = f"Approximate total price for the stay: {total}"
+                elif nightly:
+                    best_price_hint = f"Typical nightly rate from {nightly}"
+
+                balanced = next(
+                    (o for o in options_payload if o.get("option_type") == "balanced"),
+                    None,
+                ) or cheapest
+                if balanced.get("name"):
+                    recommended_option_label = balanced["name"]
+
+            fallback_results.append(
+                AccommodationSearchResult(
+                    task_id=task_id,
+                    query=task.prompt if task else None,
+                    options=option_models,
+                    summary=fallback_summary,
+                    best_price_hint=best_price_hint,
+                    best_location_hint=None,
+                    family_friendly_hint=None,
+                    neighborhood_hint=None,
+                    recommended_option_label=recommended_option_label,
+                    notes=None,
+                    chosen_option_type="balanced" if options_payload else None,
+                    selection_reason=(
+                        "Balanced choice based on price, location, and rating."
+                        if options_payload
+                        else None
+                    ),
+                )
+            )
+
+        if fallback_results:
+            final_accommodation_state.search_results = fallback_results
+
+            # Build overall_summary and traveler_accommodations mirroring
+            # apply_accommodation_search_results logic.
+            lines: list[str] = []
+            for result in final_accommodation_state.search_results:
+                summary_parts: list[str] = []
+                if result.summary:
+                    summary_parts.append(result.summary.strip())
+                if result.best_price_hint:
+                    summary_parts.append(f"Price hint: {result.best_price_hint}")
+                if result.best_location_hint:
+                    summary_parts.append(f"Location hint: {result.best_location_hint}")
+                if result.recommended_option_label:
+                    summary_parts.append(f"Recommended: {result.recommended_option_label}")
+                line = " ".join(summary_parts)
+                if line:
+                    lines.append(f"- Task {result.task_id}: {line}")
+
+            if lines:
+                final_accommodation_state.overall_summary = "\n".join(lines)
+
+            planner_state_after = PlannerState(**(final_session.state or {}))
+            travelers = planner_state_after.demographics.travelers or []
+            results_by_task: Dict[str, AccommodationSearchResult] = {
+                r.task_id: r for r in final_accommodation_state.search_results or []
+            }
+
+            traveler_accommodations: list[TravelerAccommodationChoice] = []
+            for traveler_index in range(len(travelers)):
+                for task in final_accommodation_state.search_tasks or []:
+                    if traveler_index not in (task.traveler_indexes or []):
+                        continue
+
+                    result = results_by_task.get(task.task_id)
+                    if result is None:
+                        continue
+
+                    chosen_option = None
+                    other_options: list[AccommodationOption] = []
+
+                    chosen_type = result.chosen_option_type
+                    for opt in result.options or []:
+                        if (
+                            chosen_type
+                            and opt.option_type == chosen_type
+                            and chosen_option is None
+                        ):
+                            chosen_option = opt
+                        else:
+                            other_options.append(opt)
+
+                    if chosen_option is None and result.options:
+                        chosen_option = result.options[0]
+                        other_options = list(result.options[1:])
+
+                    # Copied from already-validated results; skip re-validation.
+                    traveler_accommodations.append(
+                        TravelerAccommodationChoice.model_construct(
+                            traveler_index=traveler_index,
+                            task_id=task.task_id,
+                            summary=result.summary,
+                            best_price_hint=result.best_price_hint,
+                            best_location_hint=result.best_location_hint,
+                            family_friendly_hint=result.family_friendly_hint,
+                            neighborhood_hint=result.neighborhood_hint,
+                            recommended_option_label=result.recommended_option_label,
+                            notes=result.notes,
+                            chosen_option_type=result.chosen_option_type,
+                            selection_reason=result.selection_reason,
+                            chosen_option=chosen_option,
+                            other_options=other_options,
                         )
+                    )
 
-                final_accommodation_state.traveler_accommodations = traveler_accommodations
+            final_accommodation_state.traveler_accommodations = traveler_accommodations
 
-                state_obj_final = final_session.state or {}
-                state_obj_final["accommodation"] = final_accommodation_state.model_dump()
+            await session_service.append_event(
+                final_session,
+                Event(
+                    author="user",
+                    actions=EventActions(
+                        state_delta={"accommodation": final_accommodation_state.model_dump()}
+                    ),
+                ),
+            )
+
+    print("[STATE] AccommodationState after apply_accommodation_search_results:")
+    print(final_accommodation_state.model_dump_json(indent=2))
 
-        print("[STATE] AccommodationState after apply_accommodation_search_results:")
-        print(final_accommodation_state.model_dump_json(indent=2))
+
+
+
+async def run_accommodation_pipeline(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> None:
+    """
+    End-to-end accommodation planning pipeline for an existing session:
+    - Derive AccommodationSearchTasks using accommodation_agent (once per session).
+    - Run the accommodation search pipeline to populate search_results and traveler_accommodations.
+    """
+    await _derive_accommodation_tasks(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    accommodation_search = await _search_accommodation(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        semaphore=asyncio.Semaphore(MAX_CONCURRENT_SEARCHES),
+    )
+    if accommodation_search is not None:
+        await _record_accommodation_results(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            search=accommodation_search,
+        )
 
 
 async def run_activity_pipeline(
@@ -2075,20 +2694,40 @@ async def run_activity_pipeline(
     - Run the activity search pipeline to populate ActivityState.search_results.
     - Apply activity search results to build a coarse day-by-day itinerary.
     """
+    if await run_activity_search_pipeline(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    ):
+        await run_activity_itinerary_pipeline(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+
+async def _derive_activity_tasks(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> None:
+    """Derive ActivitySearchTasks using activity_agent (once per session)."""
     session = await session_service.get_session(
         app_name=app_name,
         user_id=user_id,
         session_id=session_id,
     )
-    activities_raw = (session.state or {}).get("activities") or {}
+    activities_raw = _state_section(session.state, "activities")
     activity_state = ActivityState(**activities_raw)
 
-    # Phase 1: derive ActivitySearchTasks (only once).
     if not activity_state.search_tasks:
-        act_runner = Runner(
+        act_runner = _get_runner(
             session_service=session_service,
             app_name=app_name,
-            agent=activity_agent,
+            agent=get_activity_agent(),
         )
 
         print("[PLANNER] Running activity_agent to derive activity search tasks...")
@@ -2108,9 +2747,11 @@ async def run_activity_pipeline(
                 ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                part = event.content.parts[0]
-                text = getattr(part, "text", None)
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                part = parts[0]
+                text = part.text
                 if isinstance(text, str) and text.strip():
                     final_activity_text = text.strip()
 
@@ -2124,54 +2765,354 @@ async def run_activity_pipeline(
             user_id=user_id,
             session_id=session_id,
         )
-        activities_raw = (session.state or {}).get("activities") or {}
+        activities_raw = _state_section(session.state, "activities")
         activity_state = ActivityState(**activities_raw)
 
         print("[STATE] ActivityState after planning (search_tasks derived):")
         print(activity_state.model_dump_json(indent=2))
 
-    # Phase 2: run the activity search pipeline once per session.
-    if activity_state.search_tasks and not activity_state.search_results:
-        print("[PLANNER] Running activity search pipeline...")
 
-        search_runner = Runner(
-            session_service=session_service,
-            app_name=app_name,
-            agent=activity_search_agent,
-        )
-        writer_runner = Runner(
+async def _search_activities(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[list[tuple[ActivitySearchTask, Optional[ActivitySearchAgentOutput]]]]:
+    """
+    Run activity_search_agent for every pending ActivitySearchTask in scratch
+    sessions and parse each reply, leaving the trip session untouched. Returns
+    None when the search phase has already run (or there is nothing to search)
+    for this session.
+    """
+    session_for_search = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    activity_state = ActivityState(**_state_section(session_for_search.state, "activities"))
+    if not activity_state.search_tasks or activity_state.search_results:
+        return None
+
+    print("[PLANNER] Running activity search pipeline...")
+    pending_tasks = list(activity_state.search_tasks)
+
+    print(f"[ACTIVITY-SEARCH] Found {len(pending_tasks)} pending ActivitySearchTask(s)")
+
+    search_agent = get_activity_search_agent()
+
+    async def _resolve(task: ActivitySearchTask) -> Optional[ActivitySearchAgentOutput]:
+        # Use google_search via activity_search_agent to build a JSON result.
+        search_payload = {
+            "task_id": task.task_id,
+            "search_context": task.model_dump(exclude_none=True),
+        }
+        final_search_text = await _run_isolated_search(
             session_service=session_service,
             app_name=app_name,
-            agent=activity_result_writer_agent,
+            user_id=user_id,
+            agent=search_agent,
+            text=(
+                "Given the following JSON payload (task_id and search_context), use google_search "
+                "to discover suitable activities and respond with a SINGLE JSON object as instructed.\n"
+                f"{to_json(search_payload).decode()}"
+            ),
+            semaphore=semaphore,
         )
 
-        session_for_search = await session_service.get_session(
+        if not final_search_text:
+            print(
+                f"[ACTIVITY-SEARCH] No final response from activity_search_agent for "
+                f"task_id={task.task_id}, skipping."
+            )
+            return None
+
+        cleaned_search_text = _strip_code_fences(final_search_text)
+
+        try:
+            return ActivitySearchAgentOutput.model_validate_json(cleaned_search_text)
+        except Exception as e:
+            # Fallback: some responses are a single-element JSON array.
+            # If so, treat the first item as the payload. pydantic_core's
+            # parser is considerably faster than stdlib json on these
+            # multi-KB search outputs.
+            try:
+                raw = from_json(cleaned_search_text)
+                if isinstance(raw, list) and raw:
+                    return ActivitySearchAgentOutput.model_validate(raw[0])
+            except Exception:
+                pass
+
+            print(
+                f"[ACTIVITY-SEARCH] Failed to parse JSON into ActivitySearchAgentOutput "
+                f"for task_id={task.task_id}: {e}. "
+                f"Preview: {cleaned_search_text[:1000]}..."
+            )
+            return None
+
+    parsed_results = await asyncio.gather(*(_resolve(task) for task in pending_tasks))
+    return list(zip(pending_tasks, parsed_results))
+
+
+async def _record_activity_results(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    searched: list[tuple[ActivitySearchTask, Optional[ActivitySearchAgentOutput]]],
+) -> None:
+    """
+    Record each parsed activity search result with the writer agent. Writes
+    share the trip session (the staged current task), so they stay sequential.
+    """
+    writer_runner = _get_runner(
+        session_service=session_service,
+        app_name=app_name,
+        agent=get_activity_result_writer_agent(),
+    )
+
+    for task, parsed in searched:
+        if parsed is None:
+            continue
+
+        await _stage_current_task(
+            session_service=session_service,
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
+            payload=parsed.model_dump(mode="json"),
         )
-        state_dict = session_for_search.state or {}
-        activities_raw = state_dict.get("activities") or {}
-        activity_state = ActivityState(**activities_raw)
+        async for event in writer_runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=genai_types.Content(
+                role="user",
+                parts=[
+                    genai_types.Part(
+                        text=f"Record the staged activity search result for task_id={task.task_id}."
+                    )
+                ],
+            ),
+        ):
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
+                print(
+                    f"[ACTIVITY-SEARCH] Writer agent completed for task_id={task.task_id}"
+                )
+
+    # Reload ActivityState after search so we can see recorded results.
+    session_after_search = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    activities_raw_after = _state_section(session_after_search.state, "activities")
+    activity_state_after = ActivityState(**activities_raw_after)
+
+    print(
+        "[STATE] ActivityState after activity search phase: "
+        f"num_tasks={len(activity_state_after.search_tasks)}, "
+        f"num_results={len(activity_state_after.search_results)}"
+    )
+
+
+async def run_activity_search_pipeline(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> bool:
+    """
+    Derive ActivitySearchTasks (once per session) and run the activity search
+    pipeline to populate ActivityState.search_results. Returns True when the
+    search phase ran in this call, i.e. when an itinerary should be built.
+    """
+    await _derive_activity_tasks(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    activity_search = await _search_activities(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        semaphore=asyncio.Semaphore(MAX_CONCURRENT_SEARCHES),
+    )
+    if activity_search is None:
+        return False
+
+    await _record_activity_results(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        searched=activity_search,
+    )
+    return True
+
+
+async def run_activity_itinerary_pipeline(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> None:
+    """
+    Build a coarse day-by-day itinerary from the recorded activity search
+    results, flight arrival/departure times, and the chosen accommodation.
+    """
+    # Build an itinerary using a chunked, LLM-native itinerary pipeline. We plan
+    # a few days at a time so that prompts stay compact: one agent uses
+    # google_search to propose items, and a second agent writes those items
+    # into ActivityState via record_day_itinerary.
+    combined_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    combined_state = combined_session.state or {}
+    planner_state = PlannerState(**combined_state)
+    flight_state = FlightState(**_state_section(combined_state, "flights"))
+    accommodation_state = AccommodationState(**_state_section(combined_state, "accommodation"))
+    activity_state_for_itinerary = ActivityState(**_state_section(combined_state, "activities"))
+
+    # Build a simple per-day calendar, using flight arrival/departure times
+    # where available to tag arrival/departure days.
+    trip_calendar = _build_trip_calendar_for_itinerary(planner_state, flight_state)
+    if not trip_calendar:
+        print("[ACTIVITY-ITINERARY] Trip calendar could not be derived; skipping itinerary planning.")
+    else:
+        # Derive a base neighborhood hint from chosen accommodation, if available.
+        base_neighborhood = None
+        if accommodation_state.traveler_accommodations:
+            first_choice = accommodation_state.traveler_accommodations[0]
+            if first_choice.chosen_option and first_choice.chosen_option.neighborhood:
+                base_neighborhood = first_choice.chosen_option.neighborhood
 
-        existing_results_by_task = {r.task_id for r in activity_state.search_results or []}
-        pending_tasks = [
-            t for t in activity_state.search_tasks or [] if t.task_id not in existing_results_by_task
+        travelers = planner_state.demographics.travelers or []
+        travelers_payload = [
+            {
+                "index": idx,
+                "role": t.role,
+                "age": t.age,
+                "nationality": t.nationality,
+            }
+            for idx, t in enumerate(travelers)
         ]
 
-        print(f"[ACTIVITY-SEARCH] Found {len(pending_tasks)} pending ActivitySearchTask(s)")
+        preferences_payload = {
+            "daily_rhythm": planner_state.preferences.daily_rhythm,
+            "pace": planner_state.preferences.pace,
+            "budget_mode": planner_state.preferences.budget_mode,
+        }
+
+        # Collapse ActivitySearchResult options into a small list of suggestions
+        # that the itinerary agent can treat as anchors.
+        # Overlapping search tasks often surface the same attraction, so drop
+        # repeats by (name, city, url) and keep only the strongest anchors:
+        # the list is resent with every chunk, so its size drives prompt cost.
+        activity_suggestions: list[Dict[str, Any]] = []
+        seen_suggestions: set[tuple[str, str, str]] = set()
+        for result in activity_state_for_itinerary.search_results or []:
+            for idx, opt in enumerate(result.options or []):
+                suggestion_key = (
+                    (opt.name or "").strip().lower(),
+                    (opt.city or "").strip().lower(),
+                    opt.url or "",
+                )
+                if suggestion_key in seen_suggestions:
+                    continue
+                seen_suggestions.add(suggestion_key)
+                activity_suggestions.append(
+                    {
+                        "source_task_id": result.task_id,
+                        "option_index": idx,
+                        "name": opt.name,
+                        "neighborhood": opt.neighborhood,
+                        "city": opt.city,
+                        "url": opt.url,
+                        "notes": opt.notes,
+                    }
+                )
 
-        for task in pending_tasks:
-            search_context = task.model_dump()
+        base_neighborhood_norm = (base_neighborhood or "").strip().lower()
 
-            # Phase 1: use google_search via activity_search_agent to build a JSON result.
-            search_payload = {
-                "task_id": task.task_id,
-                "search_context": search_context,
+        def _suggestion_score(suggestion: Dict[str, Any]) -> int:
+            score = 2 if suggestion["url"] else 0
+            if (
+                base_neighborhood_norm
+                and (suggestion["neighborhood"] or "").strip().lower() == base_neighborhood_norm
+            ):
+                score += 1
+            return score
+
+        # sorted() is stable, so equally scored suggestions keep search order.
+        activity_suggestions = sorted(
+            activity_suggestions, key=_suggestion_score, reverse=True
+        )[:MAX_ACTIVITY_SUGGESTIONS]
+
+        # Everything except "days" is invariant across chunks; serialize it
+        # once and append each chunk's days after it, so the per-chunk part
+        # stays at the end of the prompt.
+        invariant_payload_json = to_json(
+            {
+                "base_city": planner_state.trip_details.destination,
+                "base_neighborhood": base_neighborhood,
+                "travelers": travelers_payload,
+                "preferences": preferences_payload,
+                "activity_suggestions": activity_suggestions,
             }
+        ).decode()[1:-1]
 
-            final_search_text: str | None = None
-            async for event in search_runner.run_async(
+        # Plan the trip in small chunks to keep the prompt size manageable.
+        chunk_size = 3
+        day_search_runner = _get_runner(
+            session_service=session_service,
+            app_name=app_name,
+            agent=get_day_itinerary_search_agent(),
+        )
+
+        # Accumulate all DayItineraryItem entries locally; we will write them
+        # back into ActivityState in one shot at the end. Track which major
+        # activities have already been scheduled so we avoid repeating the
+        # same attraction across multiple days.
+        accumulated_itinerary_items: list[DayItineraryItem] = list(activity_state_for_itinerary.day_plan or [])
+        # URLs are kept verbatim; (name, city) pairs are normalized once and
+        # stored as integer hashes so membership checks stay cheap.
+        seen_urls: set[str] = set()
+        seen_name_city: set[int] = set()
+        # Seed the seen sets with anything that may already exist.
+        for existing in accumulated_itinerary_items:
+            url, name_city_key = _dedup_keys(
+                existing.activity.url, existing.activity.name, existing.activity.city
+            )
+            if url:
+                seen_urls.add(url)
+            if existing.activity.name:
+                seen_name_city.add(name_city_key)
+
+        # Track how many distinct neighborhoods we visit per day so we keep
+        # travel reasonable (avoid bouncing across many far-flung areas).
+        neighborhoods_by_date: Dict[str, set[str]] = {}
+
+        for i in range(0, len(trip_calendar), chunk_size):
+            chunk = trip_calendar[i : i + chunk_size]
+            day_itinerary_payload_json = (
+                f'{{{invariant_payload_json}, "days": {to_json(chunk).decode()}}}'
+            )
+
+            print(
+                "[ACTIVITY-ITINERARY] Running activity_itinerary_agent to plan "
+                f"{len(chunk)} day(s) starting {chunk[0]['date']}..."
+            )
+
+            # Phase 1: use day_itinerary_search_agent (with google_search) to propose
+            # concrete itinerary items for this slice.
+            final_day_text: str | None = None
+            async for event in day_search_runner.run_async(
                 user_id=user_id,
                 session_id=session_id,
                 new_message=genai_types.Content(
@@ -2179,400 +3120,258 @@ async def run_activity_pipeline(
                     parts=[
                         genai_types.Part(
                             text=(
-                                "Given the following JSON payload (task_id and search_context), use google_search "
-                                "to discover suitable activities and respond with a SINGLE JSON object as instructed.\n"
-                                f"{json.dumps(search_payload)}"
+                                "Given the following JSON payload describing a small slice of the trip "
+                                "(base_city, base_neighborhood, travelers, preferences, "
+                                "activity_suggestions, and days), use google_search as needed and respond with a "
+                                "SINGLE JSON object of the form {\"items\": [...]} as instructed.\n"
+                                f"{day_itinerary_payload_json}"
                             )
                         )
                     ],
                 ),
             ):
-                if event.is_final_response and event.content and getattr(
-                    event.content, "parts", None
-                ):
-                    # Some responses include function_call parts; scan all parts
-                    # for the first non-empty text segment.
-                    for part in event.content.parts:
-                        text = getattr(part, "text", None)
+                content = event.content
+                parts = content.parts if content is not None else None
+                if event.is_final_response() and parts:
+                    for part in parts:
+                        text = part.text
                         if isinstance(text, str) and text.strip():
-                            final_search_text = text.strip()
+                            final_day_text = text.strip()
                             break
 
-            if not final_search_text:
+            if not final_day_text:
                 print(
-                    f"[ACTIVITY-SEARCH] No final response from activity_search_agent for "
-                    f"task_id={task.task_id}, skipping."
+                    "[ACTIVITY-ITINERARY] No final response from day_itinerary_search_agent "
+                    f"for days starting {chunk[0]['date']}; skipping this slice."
                 )
                 continue
 
-            # Some model responses may include JSON inside Markdown code fences.
-            # Strip any leading/trailing ``` blocks before attempting to parse.
-            cleaned_search_text = final_search_text.strip()
-            if cleaned_search_text.startswith("```"):
-                first_nl = cleaned_search_text.find("\n")
-                if first_nl != -1:
-                    cleaned_search_text = cleaned_search_text[first_nl + 1 :]
-                if cleaned_search_text.rstrip().endswith("```"):
-                    cleaned_search_text = cleaned_search_text.rstrip()[:-3]
-                cleaned_search_text = cleaned_search_text.strip()
+            cleaned_day_text = _strip_code_fences(final_day_text)
 
             try:
-                parsed = ActivitySearchAgentOutput.model_validate_json(cleaned_search_text)
+                parsed_day = DaySliceItineraryOutput.model_validate_json(cleaned_day_text)
             except Exception as e:
-                # Fallback: some responses are a single-element JSON array.
-                # If so, treat the first item as the payload.
-                parsed = None
+                # Fallback: some responses return a raw list of items
+                # instead of an object of the form {"items": [...]}. If
+                # so, wrap the list into the expected shape.
+                parsed_day = None
                 try:
-                    raw = json.loads(cleaned_search_text)
-                    if isinstance(raw, list) and raw:
-                        parsed = ActivitySearchAgentOutput.model_validate(raw[0])
+                    raw_payload = from_json(cleaned_day_text)
+                    if isinstance(raw_payload, list):
+                        parsed_day = DaySliceItineraryOutput(items=raw_payload)
                 except Exception:
-                    parsed = None
+                    parsed_day = None
 
-                if parsed is None:
+                if parsed_day is None:
                     print(
-                        f"[ACTIVITY-SEARCH] Failed to parse JSON into ActivitySearchAgentOutput "
-                        f"for task_id={task.task_id}: {e}. "
-                        f"Preview: {cleaned_search_text[:1000]}..."
+                        "[ACTIVITY-ITINERARY] Failed to parse JSON from day_itinerary_search_agent "
+                        f"for days starting {chunk[0]['date']}: {e}. "
+                        f"Preview: {cleaned_day_text[:1000]}..."
                     )
                     continue
 
-            writer_input = parsed.model_dump_json()
-            async for event in writer_runner.run_async(
-                user_id=user_id,
-                session_id=session_id,
-                new_message=genai_types.Content(
-                    role="user",
-                    parts=[genai_types.Part(text=writer_input)],
-                ),
-            ):
-                if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                    print(
-                        f"[ACTIVITY-SEARCH] Writer agent completed for task_id={task.task_id}"
-                    )
+            print(
+                "[ACTIVITY-ITINERARY] day_itinerary_search_agent produced "
+                f"{len(parsed_day.items)} item(s) for days starting {chunk[0]['date']}"
+            )
+            # Phase 2: deterministically turn the JSON items into DayItineraryItem
+            # entries, applying simple deduping and neighborhood caps, then append
+            # them to our accumulated itinerary.
+            for raw in parsed_day.items or []:
+                if not isinstance(raw, dict):
+                    continue
+                try:
+                    date_str = raw.get("date")
+                    slot_raw = raw.get("slot")
+                    name = raw.get("name") or raw.get("title") or raw.get("label")
 
-        # Reload ActivityState after search so we can see recorded results.
-        session_after_search = await session_service.get_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id,
-        )
-        activities_raw_after = (session_after_search.state or {}).get("activities") or {}
-        activity_state_after = ActivityState(**activities_raw_after)
+                    if not isinstance(date_str, str) or not isinstance(slot_raw, str):
+                        continue
+                    if not isinstance(name, str) or not name.strip():
+                        continue
 
-        print(
-            "[STATE] ActivityState after activity search phase: "
-            f"num_tasks={len(activity_state_after.search_tasks)}, "
-            f"num_results={len(activity_state_after.search_results)}"
-        )
+                    slot_normalized = slot_raw.strip().lower()
+                    if slot_normalized not in ("morning", "afternoon", "evening"):
+                        continue
 
-        # Build an itinerary using a chunked, LLM-native itinerary pipeline. We plan
-        # a few days at a time so that prompts stay compact: one agent uses
-        # google_search to propose items, and a second agent writes those items
-        # into ActivityState via record_day_itinerary.
-        combined_session = await session_service.get_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id,
-        )
-        combined_state = combined_session.state or {}
-        planner_state = PlannerState(**combined_state)
-        flights_raw_for_itinerary = combined_state.get("flights") or {}
-        accommodation_raw_for_itinerary = combined_state.get("accommodation") or {}
-        activities_raw_for_itinerary = combined_state.get("activities") or {}
-
-        flight_state = FlightState(**flights_raw_for_itinerary)
-        accommodation_state = AccommodationState(**accommodation_raw_for_itinerary)
-        activity_state_for_itinerary = ActivityState(**activities_raw_for_itinerary)
-
-        # Build a simple per-day calendar, using flight arrival/departure times
-        # where available to tag arrival/departure days.
-        trip_calendar = _build_trip_calendar_for_itinerary(planner_state, flight_state)
-        if not trip_calendar:
-            print("[ACTIVITY-ITINERARY] Trip calendar could not be derived; skipping itinerary planning.")
-        else:
-            # Derive a base neighborhood hint from chosen accommodation, if available.
-            base_neighborhood = None
-            if accommodation_state.traveler_accommodations:
-                first_choice = accommodation_state.traveler_accommodations[0]
-                if first_choice.chosen_option and first_choice.chosen_option.neighborhood:
-                    base_neighborhood = first_choice.chosen_option.neighborhood
-
-            travelers = planner_state.demographics.travelers or []
-            travelers_payload = [
-                {
-                    "index": idx,
-                    "role": t.role,
-                    "age": t.age,
-                    "nationality": t.nationality,
-                }
-                for idx, t in enumerate(travelers)
-            ]
+                    task_id = raw.get("task_id") or "*"
 
-            preferences_payload = {
-                "daily_rhythm": planner_state.preferences.daily_rhythm,
-                "pace": planner_state.preferences.pace,
-                "budget_mode": planner_state.preferences.budget_mode,
-            }
+                    traveler_indexes_raw = raw.get("traveler_indexes")
+                    if traveler_indexes_raw:
+                        traveler_indexes = list(traveler_indexes_raw)
+                    else:
+                        traveler_indexes = list(range(len(travelers)))
 
-            # Collapse ActivitySearchResult options into a small list of suggestions
-            # that the itinerary agent can treat as anchors.
-            activity_suggestions: list[Dict[str, Any]] = []
-            for result in activity_state_for_itinerary.search_results or []:
-                for idx, opt in enumerate(result.options or []):
-                    activity_suggestions.append(
-                        {
-                            "source_task_id": result.task_id,
-                            "option_index": idx,
-                            "name": opt.name,
-                            "neighborhood": opt.neighborhood,
-                            "city": opt.city,
-                            "url": opt.url,
-                            "notes": opt.notes,
-                        }
-                    )
+                    # Deduping: skip exact repeats of the same major attraction
+                    # across the whole trip. We treat items with a URL or a
+                    # non-generic name as candidates for deduping and allow
+                    # generic meal labels like "Hotel breakfast" on multiple days.
+                    name_norm = _norm(name)
+                    url, name_city_key = _dedup_keys(raw.get("url"), name, raw.get("city"))
 
-            # Plan the trip in small chunks to keep the prompt size manageable.
-            chunk_size = 3
-            day_search_runner = Runner(
-                session_service=session_service,
-                app_name=app_name,
-                agent=day_itinerary_search_agent,
-            )
+                    is_meal = any(token in name_norm for token in _MEAL_TOKENS)
 
-            # Accumulate all DayItineraryItem entries locally; we will write them
-            # back into ActivityState in one shot at the end. Track which major
-            # activities have already been scheduled so we avoid repeating the
-            # same attraction across multiple days.
-            accumulated_itinerary_items: list[DayItineraryItem] = list(activity_state_for_itinerary.day_plan or [])
-            seen_keys: Dict[str, set[str]] = {
-                "by_url": set(),
-                "by_name_city": set(),
-            }
-            # Seed the seen sets with anything that may already exist.
-            for existing in accumulated_itinerary_items:
-                url = existing.activity.url
-                name = (existing.activity.name or "").strip().lower()
-                city = (existing.activity.city or "").strip().lower()
-                if url:
-                    seen_keys["by_url"].add(url)
-                if name:
-                    seen_keys["by_name_city"].add(f"{name}::{city}")
-
-            # Track how many distinct neighborhoods we visit per day so we keep
-            # travel reasonable (avoid bouncing across many far-flung areas).
-            neighborhoods_by_date: Dict[str, set[str]] = {}
-
-            for i in range(0, len(trip_calendar), chunk_size):
-                chunk = trip_calendar[i : i + chunk_size]
-                day_itinerary_payload = {
-                    "days": chunk,
-                    "base_city": planner_state.trip_details.destination,
-                    "base_neighborhood": base_neighborhood,
-                    "travelers": travelers_payload,
-                    "preferences": preferences_payload,
-                    "activity_suggestions": activity_suggestions,
-                }
+                    if url:
+                        if url in seen_urls:
+                            continue
+                    elif not is_meal:
+                        if name_city_key in seen_name_city:
+                            continue
 
-                print(
-                    "[ACTIVITY-ITINERARY] Running activity_itinerary_agent to plan "
-                    f"{len(chunk)} day(s) starting {chunk[0]['date']}..."
-                )
+                    # Simple neighborhood cap per day: avoid visiting more
+                    # than two distinct neighborhoods on the same date so
+                    # the day feels geographically coherent.
+                    neighborhood = (raw.get("neighborhood") or "").strip()
+                    if neighborhood:
+                        used_neighborhoods = neighborhoods_by_date.setdefault(date_str, set())
+                        if neighborhood not in used_neighborhoods and len(used_neighborhoods) >= 2:
+                            continue
 
-                # Phase 1: use day_itinerary_search_agent (with google_search) to propose
-                # concrete itinerary items for this slice.
-                final_day_text: str | None = None
-                async for event in day_search_runner.run_async(
-                    user_id=user_id,
-                    session_id=session_id,
-                    new_message=genai_types.Content(
-                        role="user",
-                        parts=[
-                            genai_types.Part(
-                                text=(
-                                    "Given the following JSON payload describing a small slice of the trip "
-                                    "(days, base_city, base_neighborhood, travelers, preferences, and "
-                                    "activity_suggestions), use google_search as needed and respond with a "
-                                    "SINGLE JSON object of the form {\"items\": [...]} as instructed.\n"
-                                    f"{json.dumps(day_itinerary_payload)}"
-                                )
-                            )
-                        ],
-                    ),
-                ):
-                    if event.is_final_response and event.content and getattr(event.content, "parts", None):
-                        for part in event.content.parts:
-                            text = getattr(part, "text", None)
-                            if isinstance(text, str) and text.strip():
-                                final_day_text = text.strip()
-                                break
-
-                if not final_day_text:
-                    print(
-                        "[ACTIVITY-ITINERARY] No final response from day_itinerary_search_agent "
-                        f"for days starting {chunk[0]['date']}; skipping this slice."
+                    activity_model = ActivityOption(
+                        name=name.strip(),
+                        category=raw.get("category"),
+                        location_label=raw.get("location_label"),
+                        neighborhood=raw.get("neighborhood"),
+                        city=raw.get("city"),
+                        country=raw.get("country"),
+                        url=raw.get("url"),
+                        notes=raw.get("notes"),
                     )
-                    continue
-
-                # Some model responses may include JSON inside Markdown code fences.
-                # Strip any leading/trailing ``` blocks before attempting to parse.
-                cleaned_day_text = final_day_text.strip()
-                if cleaned_day_text.startswith("```"):
-                    # Drop the first fence line.
-                    first_nl = cleaned_day_text.find("\n")
-                    if first_nl != -1:
-                        cleaned_day_text = cleaned_day_text[first_nl + 1 :]
-                    # Drop a trailing fence if present.
-                    if cleaned_day_text.rstrip().endswith("```"):
-                        cleaned_day_text = cleaned_day_text.rstrip()[:-3]
-                    cleaned_day_text = cleaned_day_text.strip()
 
-                try:
-                    parsed_day = DaySliceItineraryOutput.model_validate_json(cleaned_day_text)
-                except Exception as e:
-                    # Fallback: some responses return a raw list of items
-                    # instead of an object of the form {"items": [...]}. If
-                    # so, wrap the list into the expected shape.
-                    parsed_day = None
-                    try:
-                        raw_payload = json.loads(cleaned_day_text)
-                        if isinstance(raw_payload, list):
-                            parsed_day = DaySliceItineraryOutput(items=raw_payload)
-                    except Exception:
-                        parsed_day = None
-
-                    if parsed_day is None:
-                        print(
-                            "[ACTIVITY-ITINERARY] Failed to parse JSON from day_itinerary_search_agent "
-                            f"for days starting {chunk[0]['date']}: {e}. "
-                            f"Preview: {cleaned_day_text[:1000]}..."
-                        )
-                        continue
-
-                print(
-                    "[ACTIVITY-ITINERARY] day_itinerary_search_agent produced "
-                    f"{len(parsed_day.items)} item(s) for days starting {chunk[0]['date']}"
-                )
-                # Phase 2: deterministically turn the JSON items into DayItineraryItem
-                # entries, applying simple deduping and neighborhood caps, then append
-                # them to our accumulated itinerary.
-                for raw in parsed_day.items or []:
-                    if not isinstance(raw, dict):
-                        continue
-                    try:
-                        date_str = raw.get("date")
-                        slot_raw = raw.get("slot")
-                        name = raw.get("name") or raw.get("title") or raw.get("label")
+                    item = DayItineraryItem(
+                        date=date_str,
+                        slot=slot_normalized,  # type: ignore[arg-type]
+                        traveler_indexes=traveler_indexes,
+                        task_id=task_id,
+                        activity=activity_model,
+                        notes=raw.get("notes"),
+                    )
+                    if url:
+                        seen_urls.add(url)
+                    elif not is_meal:
+                        seen_name_city.add(name_city_key)
+                    if neighborhood:
+                        neighborhoods_by_date.setdefault(date_str, set()).add(neighborhood)
+                    accumulated_itinerary_items.append(item)
+                except Exception:
+                    # Skip malformed items; others will still be recorded.
+                    continue
 
-                        if not isinstance(date_str, str) or not isinstance(slot_raw, str):
-                            continue
-                        if not isinstance(name, str) or not name.strip():
-                            continue
+    # Persist the accumulated itinerary back into ActivityState for this session.
+    final_session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    # The stored activities blob is already a plain dict, so set day_plan and
+    # overall_summary on a shallow copy of it rather than round-tripping the
+    # whole ActivityState through validation and model_dump. Only the freshly
+    # built DayItineraryItem list needs serializing. get_session returns a
+    # copy, so the result is written through a state_delta event.
+    final_activities_raw = (final_session.state or {}).get("activities")
+    if isinstance(final_activities_raw, dict):
+        final_activities_raw = dict(final_activities_raw)
+    else:
+        final_activities_raw = ActivityState().model_dump()
 
-                        slot_normalized = slot_raw.strip().lower()
-                        if slot_normalized not in ("morning", "afternoon", "evening"):
-                            continue
+    final_activities_raw["day_plan"] = [
+        item.model_dump(mode="json") for item in accumulated_itinerary_items
+    ]
+    if accumulated_itinerary_items:
+        final_activities_raw["overall_summary"] = "\n".join(
+            f"{item.date} {item.slot}: {item.activity.name}"
+            for item in accumulated_itinerary_items
+        )
+    await session_service.append_event(
+        final_session,
+        Event(author="user", actions=EventActions(state_delta={"activities": final_activities_raw})),
+    )
 
-                        task_id = raw.get("task_id") or "*"
+    print(
+        "[STATE] ActivityState after itinerary planning: "
+        f"num_day_plan_items={len(accumulated_itinerary_items)}"
+    )
+    if accumulated_itinerary_items:
+        print("[STATE] Sample itinerary for first few days:")
+        by_date: Dict[str, list[DayItineraryItem]] = {}
+        for item in accumulated_itinerary_items:
+            by_date.setdefault(item.date, []).append(item)
+        for date_str in sorted(by_date.keys())[:3]:
+            print(f"  {date_str}:")
+            for item in sorted(by_date[date_str], key=lambda i: i.slot):
+                print(f"    {item.slot}: {item.activity.name}")
 
-                        traveler_indexes_raw = raw.get("traveler_indexes")
-                        if traveler_indexes_raw:
-                            traveler_indexes = list(traveler_indexes_raw)
-                        else:
-                            traveler_indexes = list(range(len(travelers)))
-
-                        # Deduping: skip exact repeats of the same major attraction
-                        # across the whole trip. We treat items with a URL or a
-                        # non-generic name as candidates for deduping and allow
-                        # generic meal labels like "Hotel breakfast" on multiple days.
-                        name_norm = name.strip().lower()
-                        city_norm = (raw.get("city") or "").strip().lower()
-                        url = raw.get("url")
-
-                        is_meal = any(
-                            token in name_norm
-                            for token in ("breakfast", "lunch", "dinner")
-                        )
 
-                        if url:
-                            if url in seen_keys["by_url"]:
-                                continue
-                        elif not is_meal:
-                            key = f"{name_norm}::{city_norm}"
-                            if key in seen_keys["by_name_city"]:
-                                continue
-
-                        # Simple neighborhood cap per day: avoid visiting more
-                        # than two distinct neighborhoods on the same date so
-                        # the day feels geographically coherent.
-                        neighborhood = (raw.get("neighborhood") or "").strip()
-                        if neighborhood:
-                            used_neighborhoods = neighborhoods_by_date.setdefault(date_str, set())
-                            if neighborhood not in used_neighborhoods and len(used_neighborhoods) >= 2:
-                                continue
-
-                        activity_model = ActivityOption(
-                            name=name.strip(),
-                            category=raw.get("category"),
-                            location_label=raw.get("location_label"),
-                            neighborhood=raw.get("neighborhood"),
-                            city=raw.get("city"),
-                            country=raw.get("country"),
-                            url=raw.get("url"),
-                            notes=raw.get("notes"),
-                        )
+async def run_post_flight_pipelines(
+    session_service: InMemorySessionService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> None:
+    """
+    Run the planning stages that only depend on flights being chosen.
+
+    Flights depend on visa timing, and both accommodation and activity task
+    derivation read the chosen flights, so callers run visa -> flights first.
+    Accommodation and activity searches run concurrently in scratch sessions;
+    every turn on the trip session (task derivation, recording results) runs
+    one pipeline at a time, so its history does not depend on which search
+    finished first. The itinerary needs the chosen accommodation and runs last.
+    """
+    await _derive_accommodation_tasks(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+    await _derive_activity_tasks(
+        session_service=session_service,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
 
-                        item = DayItineraryItem(
-                            date=date_str,
-                            slot=slot_normalized,  # type: ignore[arg-type]
-                            traveler_indexes=traveler_indexes,
-                            task_id=task_id,
-                            activity=activity_model,
-                            notes=raw.get("notes"),
-                        )
-                        if url:
-                            seen_keys["by_url"].add(url)
-                        elif not is_meal:
-                            seen_keys["by_name_city"].add(f"{name_norm}::{city_norm}")
-                        if neighborhood:
-                            neighborhoods_by_date.setdefault(date_str, set()).add(neighborhood)
-                        accumulated_itinerary_items.append(item)
-                    except Exception:
-                        # Skip malformed items; others will still be recorded.
-                        continue
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+    accommodation_search, activity_search = await asyncio.gather(
+        _search_accommodation(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            semaphore=semaphore,
+        ),
+        _search_activities(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            semaphore=semaphore,
+        ),
+    )
 
-        # Persist the accumulated itinerary back into ActivityState for this session.
-        final_session = await session_service.get_session(
+    if accommodation_search is not None:
+        await _record_accommodation_results(
+            session_service=session_service,
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
+            search=accommodation_search,
         )
-        state_obj = final_session.state or {}
-        final_activities_raw = state_obj.get("activities") or {}
-        final_activity_state = ActivityState(**final_activities_raw)
-        final_activity_state.day_plan = accumulated_itinerary_items
-
-        if accumulated_itinerary_items:
-            lines: list[str] = []
-            for item in accumulated_itinerary_items:
-                lines.append(f"{item.date} {item.slot}: {item.activity.name}")
-            final_activity_state.overall_summary = "\n".join(lines)
-
-        state_obj["activities"] = final_activity_state.model_dump()
 
-        print(
-            "[STATE] ActivityState after itinerary planning: "
-            f"num_day_plan_items={len(final_activity_state.day_plan)}"
+    if activity_search is not None:
+        await _record_activity_results(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            searched=activity_search,
+        )
+        await run_activity_itinerary_pipeline(
+            session_service=session_service,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
         )
-        if final_activity_state.day_plan:
-            print("[STATE] Sample itinerary for first few days:")
-            by_date: Dict[str, list[DayItineraryItem]] = {}
-            for item in final_activity_state.day_plan:
-                by_date.setdefault(item.date, []).append(item)
-            for date_str in sorted(by_date.keys())[:3]:
-                print(f"  {date_str}:")
-                for item in sorted(by_date[date_str], key=lambda i: i.slot):
-                    print(f"    {item.slot}: {item.activity.name}")
 
 
 async def debug_parallel_planner():
@@ -2636,14 +3435,14 @@ async def debug_parallel_planner():
         user_id=user_id,
         session_id=session_id,
     )
-    visa_raw = (session.state or {}).get("visa") or {}
+    visa_raw = _state_section(session.state, "visa")
     visa_state = VisaState(**visa_raw)
 
     if not visa_state.search_tasks and not visa_state.search_results:
-        visa_runner = Runner(
+        visa_runner = _get_runner(
             session_service=session_service,
             app_name=app_name,
-            agent=visa_agent,
+            agent=get_visa_agent(),
         )
 
         print("[PLANNER] Running visa_agent to derive visa search prompts...")
@@ -2662,11 +3461,11 @@ async def debug_parallel_planner():
                 ],
             ),
         ):
-            if event.is_final_response and event.content and getattr(
-                event.content, "parts", None
-            ):
+            content = event.content
+            parts = content.parts if content is not None else None
+            if event.is_final_response() and parts:
                 print("[PLANNER] Final reply from visa_agent:")
-                print(event.content.parts[0].text)
+                print(parts[0].text)
 
     # Run the full planner pipelines for this sample session.
     await run_visa_search_pipeline(
@@ -2683,14 +3482,7 @@ async def debug_parallel_planner():
         session_id=session_id,
     )
 
-    await run_accommodation_pipeline(
-        session_service=session_service,
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-    )
-
-    await run_activity_pipeline(
+    await run_post_flight_pipelines(
         session_service=session_service,
         app_name=app_name,
         user_id=user_id,
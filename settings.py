@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from globe_tripper.utils.llm_client import LLMConfig
@@ -24,3 +26,9 @@ class AppSettings(BaseSettings):
             temperature=self.temperature,
             max_tokens=self.max_tokens,
         )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> AppSettings:
+    """Return the process-wide settings, parsing env and .env only once."""
+    return AppSettings()
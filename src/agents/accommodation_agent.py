@@ -1,26 +1,17 @@
-import os
+import functools
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types as genai_types
 
+from src.agents.prompts import static_instruction
 from src.tools.tools import (
     derive_accommodation_search_tasks,
-    apply_accommodation_search_results,
     record_traveler_accommodation_choice,
 )
+from src.utils.llm import build_gemini, build_generate_content_config
+from src.utils.loaders import get_agent_config
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-
-_accommodation_config = agent_configs.get("search", {})
+_accommodation_config = get_agent_config("search")
 
 _accommodation_instructions = (
     "You are an accommodation planning specialist for Globe Tripper.\n\n"
@@ -34,57 +25,18 @@ _accommodation_instructions = (
 )
 
 
-accommodation_agent = Agent(
-    name="accommodation_agent",
-    model=Gemini(model=f"{_accommodation_config.get('model', '')}"),
-    instruction=_accommodation_instructions,
-    tools=[derive_accommodation_search_tasks],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_accommodation_config.get("temperature", 0.0)),
-        max_output_tokens=int(_accommodation_config.get("max_tokens", 1000)),
-    ),
-)
-
-
-_accommodation_apply_instructions = (
-    "You help finalize accommodation planning state once search results are available.\n\n"
-    "When called, you should:\n"
-    "- Call apply_accommodation_search_results exactly once to update AccommodationState.overall_summary "
-    "  and per-traveler accommodation choices.\n\n"
-    "In your final answer, briefly confirm that you applied accommodation search results and mention "
-    "how many tasks/results were processed if that information is available from the tool.\n"
-)
-
-
-accommodation_apply_agent = Agent(
-    name="accommodation_apply_agent",
-    model=Gemini(model=f"{_accommodation_config.get('model', '')}"),
-    instruction=_accommodation_apply_instructions,
-    tools=[apply_accommodation_search_results],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_accommodation_config.get("temperature", 0.0)),
-        max_output_tokens=int(_accommodation_config.get("max_tokens", 600)),
-    ),
-)
-
-_accommodation_apply_tool_instructions = (
-    "You are a tool-only assistant for applying accommodation search results.\n\n"
-    "When called, you must call `apply_accommodation_search_results` exactly once "
-    "using the current tool context. Do not generate any additional natural-"
-    "language text or summaries; the caller will inspect state and tool logs."
-)
-
-
-accommodation_apply_tool_agent = Agent(
-    name="accommodation_apply_tool_agent",
-    model=Gemini(model=f"{_accommodation_config.get('model', '')}"),
-    instruction=_accommodation_apply_tool_instructions,
-    tools=[apply_accommodation_search_results],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_accommodation_config.get("temperature", 0.0)),
-        max_output_tokens=100,
-    ),
-)
+@functools.cache
+def get_accommodation_agent() -> Agent:
+    return Agent(
+        name="accommodation_agent",
+        model=build_gemini(_accommodation_config),
+        instruction=static_instruction(_accommodation_instructions),
+        tools=[derive_accommodation_search_tasks],
+        generate_content_config=build_generate_content_config(
+            _accommodation_config,
+            _accommodation_config.max_tokens,
+        ),
+    )
 
 
 _accommodation_choice_instructions = (
@@ -100,13 +52,29 @@ _accommodation_choice_instructions = (
 )
 
 
-accommodation_choice_agent = Agent(
-    name="accommodation_choice_agent",
-    model=Gemini(model=f"{_accommodation_config.get('model', '')}"),
-    instruction=_accommodation_choice_instructions,
-    tools=[record_traveler_accommodation_choice],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_accommodation_config.get("temperature", 0.0)),
-        max_output_tokens=int(_accommodation_config.get("max_tokens", 400)),
-    ),
-)
+@functools.cache
+def get_accommodation_choice_agent() -> Agent:
+    return Agent(
+        name="accommodation_choice_agent",
+        model=build_gemini(_accommodation_config),
+        instruction=static_instruction(_accommodation_choice_instructions),
+        tools=[record_traveler_accommodation_choice],
+        generate_content_config=build_generate_content_config(
+            _accommodation_config,
+            _accommodation_config.tool_only_max_tokens,
+        ),
+    )
+
+
+# Module attribute access (PEP 562) for the lazily built agents above.
+_AGENT_FACTORIES = {
+    "accommodation_agent": get_accommodation_agent,
+    "accommodation_choice_agent": get_accommodation_choice_agent,
+}
+
+
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
@@ -1,26 +1,20 @@
-import os
+import functools
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types as genai_types
 
+from src.agents.prompts import static_instruction
 from src.tools.tools import (
     searchapi_airbnb_properties,
     searchapi_google_hotels_properties,
+    searchapi_accommodation_batch,
     record_accommodation_search_result,
 )
+from src.utils.aio import run_in_thread
+from src.utils.llm import build_gemini, build_generate_content_config
+from src.utils.loaders import get_agent_config
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-
-_search_config = agent_configs.get("search", {})
+_search_config = get_agent_config("search")
 
 _accommodation_tool_instructions = (
     "You are a tool-only assistant for accommodation planning.\n\n"
@@ -50,18 +44,51 @@ _accommodation_tool_instructions = (
 )
 
 
-accommodation_search_tool_agent = Agent(
-    name="accommodation_search_tool_agent",
-    model=Gemini(model=f"{_search_config.get('model', '')}"),
-    instruction=_accommodation_tool_instructions,
-    tools=[searchapi_airbnb_properties, searchapi_google_hotels_properties],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_search_config.get("temperature", 0.0)),
-        max_output_tokens=int(_search_config.get("max_tokens", 800)),
-    ),
+@functools.cache
+def get_accommodation_search_tool_agent() -> Agent:
+    return Agent(
+        name="accommodation_search_tool_agent",
+        model=build_gemini(_search_config),
+        instruction=static_instruction(_accommodation_tool_instructions),
+        tools=[
+            run_in_thread(searchapi_airbnb_properties),
+            run_in_thread(searchapi_google_hotels_properties),
+        ],
+        generate_content_config=build_generate_content_config(
+            _search_config,
+            _search_config.tool_only_max_tokens,
+        ),
+    )
+
+
+_accommodation_batch_tool_instructions = (
+    "You are a tool-only assistant for accommodation planning.\n\n"
+    "You will receive SEVERAL accommodation search tasks in the user message as a JSON payload of the "
+    "form {\"tasks\": [{\"task_id\": ..., \"search_context\": {...}}, ...]}. Each search_context has the "
+    "same fields as in single-task mode (location, check_in_date, check_out_date, adults, children, "
+    "preferred_types, room_configuration, neighborhood preferences).\n\n"
+    "Call `searchapi_accommodation_batch` exactly ONCE with a `searches` array holding one entry per task:\n"
+    "  - task_id: copied from the task\n"
+    "  - engine: 'google_hotels' for hotel-style stays, 'airbnb' for apartments / homes / private stays\n"
+    "  - location_query, check_in_date, check_out_date, adults, children: from search_context\n\n"
+    "Pick the engine per task using the same guidance as single-task mode. Do not call any other tool and "
+    "do not generate natural-language text; the caller will use the tool response directly.\n"
 )
 
 
+@functools.cache
+def get_accommodation_search_batch_tool_agent() -> Agent:
+    return Agent(
+        name="accommodation_search_batch_tool_agent",
+        model=build_gemini(_search_config),
+        instruction=static_instruction(_accommodation_batch_tool_instructions),
+        tools=[run_in_thread(searchapi_accommodation_batch)],
+        generate_content_config=build_generate_content_config(
+            _search_config,
+            _search_config.max_tokens,
+        ),
+    )
+
 _accommodation_search_instructions = (
     "You are a focused research assistant for accommodation planning AND state writing.\n\n"
     "You will receive a single JSON payload describing an accommodation search task and a list of canonical options.\n"
@@ -94,44 +121,30 @@ _accommodation_search_instructions = (
 )
 
 
-accommodation_search_agent = Agent(
-    name="accommodation_search_agent",
-    model=Gemini(model=f"{_search_config.get('model', '')}"),
-    instruction=_accommodation_search_instructions,
-    tools=[record_accommodation_search_result],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_search_config.get("temperature", 0.0)),
-        max_output_tokens=int(_search_config.get("max_tokens", 1000)),
-    ),
-)
-
-
-_accommodation_writer_instructions = (
-    "You help persist accommodation search results into the accommodation state.\n\n"
-    "When the user provides a JSON object describing an accommodation search result, you MUST call the\n"
-    "`record_accommodation_search_result` tool with the corresponding fields:\n"
-    "- task_id (string)\n"
-    "- summary (string)\n"
-    "- options (array of option objects, may be empty)\n"
-    "- best_price_hint (string or null)\n"
-    "- best_location_hint (string or null)\n"
-    "- family_friendly_hint (string or null)\n"
-    "- neighborhood_hint (string or null)\n"
-    "- recommended_option_label (string or null)\n"
-    "- notes (string or null)\n"
-    "- chosen_option_type (string or null, one of 'cheapest', 'best_location', 'family_friendly', 'balanced', 'luxury')\n"
-    "- selection_reason (string or null)\n\n"
-    "Do not call any other tools. In your final answer, briefly confirm the task_id you recorded."
-)
-
-
-accommodation_result_writer_agent = Agent(
-    name="accommodation_result_writer_agent",
-    model=Gemini(model=f"{_search_config.get('model', '')}"),
-    instruction=_accommodation_writer_instructions,
-    tools=[record_accommodation_search_result],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_search_config.get("temperature", 0.0)),
-        max_output_tokens=int(_search_config.get("max_tokens", 500)),
-    ),
-)
+@functools.cache
+def get_accommodation_search_agent() -> Agent:
+    return Agent(
+        name="accommodation_search_agent",
+        model=build_gemini(_search_config),
+        instruction=static_instruction(_accommodation_search_instructions),
+        tools=[record_accommodation_search_result],
+        generate_content_config=build_generate_content_config(
+            _search_config,
+            _search_config.max_tokens,
+        ),
+    )
+
+
+# Module attribute access (PEP 562) for the lazily built agents above.
+_AGENT_FACTORIES = {
+    "accommodation_search_tool_agent": get_accommodation_search_tool_agent,
+    "accommodation_search_batch_tool_agent": get_accommodation_search_batch_tool_agent,
+    "accommodation_search_agent": get_accommodation_search_agent,
+}
+
+
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
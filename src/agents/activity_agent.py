@@ -1,28 +1,20 @@
-import os
+import functools
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import google_search
-from google.genai import types as genai_types
 
+from src.agents.prompts import JSON_OBJECT_RULES, JSON_ONLY_FOOTER, static_instruction
 from src.tools.tools import (
     derive_activity_search_tasks,
-    record_activity_search_result,
+    record_current_activity_search_result,
     apply_activity_search_results,
     record_day_itinerary,
 )
+from src.utils.llm import build_gemini, build_generate_content_config
+from src.utils.loaders import get_agent_config
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-
-_activity_config = agent_configs.get("search", {})
+_activity_config = get_agent_config("search")
 
 _activity_planner_instructions = (
     "You are an activity and itinerary planning specialist for Globe Tripper.\n\n"
@@ -36,16 +28,18 @@ _activity_planner_instructions = (
 )
 
 
-activity_agent = Agent(
-    name="activity_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_activity_planner_instructions,
-    tools=[derive_activity_search_tasks],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-        max_output_tokens=int(_activity_config.get("max_tokens", 2500)),
-    ),
-)
+@functools.cache
+def get_activity_agent() -> Agent:
+    return Agent(
+        name="activity_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_activity_planner_instructions),
+        tools=[derive_activity_search_tasks],
+        generate_content_config=build_generate_content_config(
+            _activity_config,
+            _activity_config.max_tokens,
+        ),
+    )
 
 
 _activity_search_instructions = (
@@ -57,10 +51,9 @@ _activity_search_instructions = (
     "Your job is to:\n"
     "1. Use the google_search tool with one or more well-constructed queries based on the search_context "
     "   to find activities, attractions, and experiences that match the travelers' interests and constraints.\n"
-    "2. Read and synthesize the results into a SINGLE JSON object with the following keys. The JSON MUST be "
-    "   strictly valid and self-contained (no trailing text, no extra JSON objects) and MUST appear as one "
-    "   compact line (no pretty-printing or extra newlines):\n"
-    '   - \"task_id\": string (echo the task_id you were given)\n'
+    "2. Read and synthesize the results into a SINGLE JSON object with the following keys. "
+    + JSON_OBJECT_RULES
+    + '   - \"task_id\": string (echo the task_id you were given)\n'
     '   - \"summary\": string (concise natural-language summary of the types of activities discovered)\n'
     '   - \"options\": array of at most 3 objects, each approximating an ActivityOption with keys like '
     '\"name\", \"category\", \"location_label\", \"neighborhood\", \"city\", \"country\", '
@@ -71,47 +64,42 @@ _activity_search_instructions = (
     '   - \"family_friendly_hint\": string or null (how suitable the set is for families / children)\n'
     '   - \"neighborhood_hint\": string or null (neighborhoods or areas that stand out)\n'
     '   - \"query\": string (the main google_search query you used)\n\n'
-    "Keep the summary reasonably short. Respond with JSON ONLY, no additional commentary or markdown. "
-    "Do NOT include code fences, explanations, or multiple JSON objects.\n"
+    "Keep the summary reasonably short.\n"
+    + JSON_ONLY_FOOTER
 )
 
 
-activity_search_agent = Agent(
-    name="activity_search_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_activity_search_instructions,
-    tools=[google_search],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-    ),
-)
+@functools.cache
+def get_activity_search_agent() -> Agent:
+    return Agent(
+        name="activity_search_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_activity_search_instructions),
+        tools=[google_search],
+        generate_content_config=build_generate_content_config(_activity_config),
+    )
 
 
 _activity_writer_instructions = (
     "You help persist activity search results into the activity state.\n\n"
-    "When the user provides a JSON object describing an activity search result, you MUST call the\n"
-    "`record_activity_search_result` tool with the corresponding fields:\n"
-    "- task_id (string)\n"
-    "- summary (string)\n"
-    "- options (array of option objects, may be empty)\n"
-    "- budget_hint (string or null)\n"
-    "- family_friendly_hint (string or null)\n"
-    "- neighborhood_hint (string or null)\n"
-    "- query (string or null)\n\n"
+    "The parsed search result has already been staged in session state. When asked to record it, "
+    "you MUST call the `record_current_activity_search_result` tool exactly once; it takes no arguments.\n\n"
     "Do not call any other tools. In your final answer, briefly confirm the task_id you recorded."
 )
 
 
-activity_result_writer_agent = Agent(
-    name="activity_result_writer_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_activity_writer_instructions,
-    tools=[record_activity_search_result],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-        max_output_tokens=int(_activity_config.get("max_tokens", 2500)),
-    ),
-)
+@functools.cache
+def get_activity_result_writer_agent() -> Agent:
+    return Agent(
+        name="activity_result_writer_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_activity_writer_instructions),
+        tools=[record_current_activity_search_result],
+        generate_content_config=build_generate_content_config(
+            _activity_config,
+            _activity_config.max_tokens,
+        ),
+    )
 
 
 _activity_apply_instructions = (
@@ -123,16 +111,18 @@ _activity_apply_instructions = (
 )
 
 
-activity_apply_agent = Agent(
-    name="activity_apply_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_activity_apply_instructions,
-    tools=[apply_activity_search_results],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-        max_output_tokens=int(_activity_config.get("max_tokens", 2500)),
-    ),
-)
+@functools.cache
+def get_activity_apply_agent() -> Agent:
+    return Agent(
+        name="activity_apply_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_activity_apply_instructions),
+        tools=[apply_activity_search_results],
+        generate_content_config=build_generate_content_config(
+            _activity_config,
+            _activity_config.apply_max_tokens,
+        ),
+    )
 
 
 _day_itinerary_search_instructions = (
@@ -169,9 +159,9 @@ _day_itinerary_search_instructions = (
     "YOUR JOB:\n"
     "1. Use base_city, base_neighborhood, travelers, preferences, and activity_suggestions to construct a realistic plan just for the given days.\n"
     "2. When helpful, use the google_search tool to look up concrete activities, parks, or family-friendly restaurants that fit the context.\n"
-    "3. Return a SINGLE JSON object with the following structure. The JSON MUST be strictly valid and self-contained "
-    "(no trailing text, no extra JSON objects) and MUST appear as one compact line (no pretty-printing or extra newlines):\n"
-    '   - \"items\": array of objects, each with:\n'
+    "3. Return a SINGLE JSON object with the following structure. "
+    + JSON_OBJECT_RULES
+    + '   - \"items\": array of objects, each with:\n'
     '       - \"date\": ISO date string (one of the dates in the days array)\n'
     '       - \"slot\": \"morning\" | \"afternoon\" | \"evening\"\n'
     '       - \"name\": short display name of the activity OR meal (e.g. \"Science Museum\", \"Hotel breakfast\", \"Dinner near South Kensington\")\n'
@@ -181,21 +171,22 @@ _day_itinerary_search_instructions = (
     '       - \"city\": optional city string\n'
     '       - \"url\": optional URL string\n'
     '       - \"traveler_indexes\": optional array of traveler indexes; if omitted, assume all travelers\n\n'
-    "When planning, you MUST keep the overall day realistic for a vacationing family: limited activities, time to travel to/from places, and space for rest.\n"
-    "Respond with JSON ONLY as described above. Do NOT include code fences, explanations, or multiple JSON objects."
+    + JSON_ONLY_FOOTER
 )
 
 
-day_itinerary_search_agent = Agent(
-    name="day_itinerary_search_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_day_itinerary_search_instructions,
-    tools=[google_search],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-        max_output_tokens=int(_activity_config.get("max_tokens", 2500)),
-    ),
-)
+@functools.cache
+def get_day_itinerary_search_agent() -> Agent:
+    return Agent(
+        name="day_itinerary_search_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_day_itinerary_search_instructions),
+        tools=[google_search],
+        generate_content_config=build_generate_content_config(
+            _activity_config,
+            _activity_config.max_tokens,
+        ),
+    )
 
 
 _activity_itinerary_instructions = (
@@ -221,13 +212,35 @@ _activity_itinerary_instructions = (
 )
 
 
-activity_itinerary_agent = Agent(
-    name="activity_itinerary_agent",
-    model=Gemini(model=f"{_activity_config.get('model', '')}"),
-    instruction=_activity_itinerary_instructions,
-    tools=[record_day_itinerary],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_activity_config.get("temperature", 0.0)),
-        max_output_tokens=int(_activity_config.get("max_tokens", 2500)),
-    ),
-)
+@functools.cache
+def get_activity_itinerary_agent() -> Agent:
+    return Agent(
+        name="activity_itinerary_agent",
+        model=build_gemini(_activity_config),
+        instruction=static_instruction(_activity_itinerary_instructions),
+        tools=[record_day_itinerary],
+        generate_content_config=build_generate_content_config(
+            _activity_config,
+            _activity_config.max_tokens,
+        ),
+    )
+
+
+# Agents are built on first use rather than at import time. Module-level access
+# such as ``from src.agents.activity_agent import activity_agent`` still works via
+# PEP 562 and returns the cached instance.
+_AGENT_FACTORIES = {
+    "activity_agent": get_activity_agent,
+    "activity_search_agent": get_activity_search_agent,
+    "activity_result_writer_agent": get_activity_result_writer_agent,
+    "activity_apply_agent": get_activity_apply_agent,
+    "day_itinerary_search_agent": get_day_itinerary_search_agent,
+    "activity_itinerary_agent": get_activity_itinerary_agent,
+}
+
+
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
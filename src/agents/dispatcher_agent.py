@@ -1,33 +1,33 @@
-import os
 from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
+from src.agents.prompts import static_instruction
 from src.tools.tools import update_trip_plan, resolve_airports
 from src.tools.planning_tools import mark_ready_for_planning
-import yaml
-from google.genai import types as genai_types
+from src.utils.llm import build_generate_content_config, build_lite_llm, warm_up_model
+from src.utils.loaders import get_agent_config, load_instruction
 
-agent_config_path = os.path.join(os.path.dirname(__file__), '../config/agents.yaml')
-agent_instructions_path = os.path.join(os.path.dirname(__file__), '../artifacts/dispatcher/instruction.md')
+_instructions = load_instruction("dispatcher")
 
-# read the configs
-with open(agent_config_path, 'r') as f:
-    agent_configs = yaml.safe_load(f)
-
-# read the instructions
-with open(agent_instructions_path, 'r') as f:
-    _instructions = f.read()
-
-_agent_config = agent_configs.get('dispatcher', {})
+_agent_config = get_agent_config("dispatcher")
 
 
 # The DispatcherAgent (intake agent)
 dispatcher_agent = Agent(
     name="dispatcher_agent",
-    model=LiteLlm(model=f"{_agent_config.get('provider', '')}/{_agent_config.get('model', '')}"),
-    instruction=_instructions,
+    model=build_lite_llm(_agent_config),
+    instruction=static_instruction(_instructions),
     tools=[update_trip_plan, resolve_airports, mark_ready_for_planning],
-    generate_content_config=genai_types.GenerateContentConfig(
-    temperature=float(_agent_config.get("temperature", 0.2)),
-    max_output_tokens=int(_agent_config.get("max_tokens", 1000)),
+    generate_content_config=build_generate_content_config(
+        _agent_config,
+        _agent_config.max_tokens,
+        with_http_options=False,
     ),
 )
+
+
+async def warmup_dispatcher() -> None:
+    """
+    Prime the dispatcher's LLM client while the user is still typing their
+    first message. Call this once when a session opens.
+    """
+    get_agent_config("dispatcher")
+    await warm_up_model(dispatcher_agent.model)
@@ -1,23 +1,15 @@
-import os
+import functools
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types as genai_types
 
-from src.tools.tools import derive_flight_search_tasks, apply_flight_search_results
+from src.tools.tools import derive_flight_search_tasks
+from src.utils.llm import build_agent
+from src.utils.loaders import get_agent_config
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
+_flight_config = get_agent_config("flight")
 
 
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-
-_flight_config = agent_configs.get("flight", {})
-
 _flight_instructions = (
     "You are a flight planning specialist for Globe Tripper.\n\n"
     "When called, you should:\n"
@@ -31,56 +23,25 @@ _flight_instructions = (
 )
 
 
-flight_agent = Agent(
-    name="flight_agent",
-    model=Gemini(model=f"{_flight_config.get('model', '')}"),
-    instruction=_flight_instructions,
-    tools=[derive_flight_search_tasks],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_flight_config.get("temperature", 0.0)),
-        max_output_tokens=int(_flight_config.get("max_tokens", 1000)),
-    ),
-)
-
-
-_flight_apply_instructions = (
-    "You help finalize flight planning state once search results are available.\n\n"
-    "When called, you should:\n"
-    "- Call apply_flight_search_results exactly once to update FlightState.overall_summary "
-    "  and per-traveler flight choices.\n"
-    "- Do NOT call derive_flight_search_tasks.\n\n"
-    "In your final answer, briefly confirm that you applied flight search results and mention "
-    "how many tasks/results were processed if that information is available from the tool.\n"
-)
+@functools.cache
+def get_flight_agent() -> Agent:
+    return build_agent(
+        _flight_config,
+        "flight_agent",
+        _flight_instructions,
+        [derive_flight_search_tasks],
+        _flight_config.max_tokens,
+    )
 
 
-flight_apply_agent = Agent(
-    name="flight_apply_agent",
-    model=Gemini(model=f"{_flight_config.get('model', '')}"),
-    instruction=_flight_apply_instructions,
-    tools=[apply_flight_search_results],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_flight_config.get("temperature", 0.0)),
-        max_output_tokens=int(_flight_config.get("max_tokens", 600)),
-    ),
-)
+# Module attribute access (PEP 562) for the lazily built agents above.
+_AGENT_FACTORIES = {
+    "flight_agent": get_flight_agent,
+}
 
 
-_flight_apply_tool_instructions = (
-    "You are a tool-only assistant for applying flight search results.\n\n"
-    "When called, you must call `apply_flight_search_results` exactly once "
-    "using the current tool context. Do not generate any additional natural-"
-    "language text or summaries; the caller will inspect state and tool logs."
-)
-
-
-flight_apply_tool_agent = Agent(
-    name="flight_apply_tool_agent",
-    model=Gemini(model=f"{_flight_config.get('model', '')}"),
-    instruction=_flight_apply_tool_instructions,
-    tools=[apply_flight_search_results],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_flight_config.get("temperature", 0.0)),
-        max_output_tokens=100,
-    ),
-)
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
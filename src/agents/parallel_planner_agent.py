@@ -1,56 +1,62 @@
-import os
+import functools
 
 from google.adk.agents import Agent, ParallelAgent
-from google.adk.models.lite_llm import LiteLlm
-from google.genai import types as genai_types
 from google.adk.tools import AgentTool
 
-from src.agents.visa_agent import visa_agent
-from src.agents.flight_agent import flight_agent
+from src.agents.prompts import static_instruction
+from src.agents.visa_agent import get_visa_agent
+from src.agents.flight_agent import get_flight_agent
+from src.utils.llm import build_generate_content_config, build_lite_llm
+from src.utils.loaders import get_agent_config, load_instruction
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-planner_instructions_path = os.path.join(
-    os.path.dirname(__file__), "../artifacts/planner/instruction.md"
-)
+_planner_instructions = load_instruction("planner")
 
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-with open(planner_instructions_path, "r") as f:
-    _planner_instructions = f.read()
-
-_planner_config = agent_configs.get("planner", {})
+_planner_config = get_agent_config("planner")
 
 
 # Parallel planner: runs its sub‑agents (currently only visa_agent)
 # concurrently. More domain agents (itinerary, flights, transport, costs)
 # can be appended to this list over time.
-parallel_planner_agent = ParallelAgent(
-    name="parallel_planner_agent",
-    sub_agents=[visa_agent, flight_agent],
-)
+@functools.cache
+def get_parallel_planner_agent() -> ParallelAgent:
+    return ParallelAgent(
+        name="parallel_planner_agent",
+        sub_agents=[get_visa_agent(), get_flight_agent()],
+    )
 
 
 # Coordinator/root planner agent: orchestrates planning by calling
 # sub‑agents (including the visa_agent) as tools. This is what you
 # would typically attach to a Runner for high‑level planning flows.
-planner_root_agent = Agent(
-    name="planner_root_agent",
-    model=LiteLlm(
-        model=f"{_planner_config.get('provider', '')}/{_planner_config.get('model', '')}"
-    ),
-    instruction=_planner_instructions,
-    tools=[
-        AgentTool(visa_agent),
-        AgentTool(parallel_planner_agent),
-        AgentTool(flight_agent),
-    ],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_planner_config.get("temperature", 0.2)),
-        max_output_tokens=int(_planner_config.get("max_tokens", 1000)),
-    ),
-)
+@functools.cache
+def get_planner_root_agent() -> Agent:
+    return Agent(
+        name="planner_root_agent",
+        model=build_lite_llm(_planner_config),
+        instruction=static_instruction(_planner_instructions),
+        tools=[
+            AgentTool(get_visa_agent()),
+            AgentTool(get_parallel_planner_agent()),
+            AgentTool(get_flight_agent()),
+        ],
+        generate_content_config=build_generate_content_config(
+            _planner_config,
+            _planner_config.max_tokens,
+            with_http_options=False,
+        ),
+    )
+
+
+# Module attribute access (PEP 562) for the lazily built agents above.
+_AGENT_FACTORIES = {
+    "parallel_planner_agent": get_parallel_planner_agent,
+    "planner_root_agent": get_planner_root_agent,
+}
+
+
+def __getattr__(name: str):
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
@@ -0,0 +1,41 @@
+"""
+Instruction fragments shared by the search agents, plus the wrapper every
+agent uses to hand its instruction to ADK.
+
+Keeping these as single constants means every agent sends byte-identical
+wording for the same rules, and each instruction stays static so Gemini's
+prefix caching can reuse it across calls.
+"""
+
+import sys
+
+from google.adk.agents.llm_agent import InstructionProvider
+from google.adk.agents.readonly_context import ReadonlyContext
+
+# Appended after "Return a SINGLE JSON object with the following keys." style sentences.
+JSON_OBJECT_RULES = (
+    "The JSON MUST be strictly valid and self-contained (no trailing text, no extra JSON objects) "
+    "and MUST appear as one compact line (no pretty-printing or extra newlines):\n"
+)
+
+JSON_ONLY_FOOTER = (
+    "Respond with JSON ONLY. Do NOT include code fences, markdown, explanations, "
+    "or multiple JSON objects.\n"
+)
+
+
+def static_instruction(text: str) -> InstructionProvider:
+    """
+    Wrap a fixed instruction string for ``Agent(instruction=...)``.
+
+    ADK re-scans plain string instructions for ``{state_key}`` placeholders on
+    every model call. None of our instructions use placeholders, and an
+    instruction provider skips that pass, so the interned string is returned
+    as-is for each request.
+    """
+    text = sys.intern(text)
+
+    def _provider(_context: ReadonlyContext) -> str:
+        return text
+
+    return _provider
@@ -1,24 +1,17 @@
-import os
+import functools
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import google_search
-from google.genai import types as genai_types
 
-from src.tools.tools import record_visa_search_result
+from src.agents.prompts import JSON_OBJECT_RULES, JSON_ONLY_FOOTER
+from src.tools.tools import record_current_visa_search_result
+from src.utils.llm import build_agent
+from src.utils.loaders import get_agent_config
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
+_search_config = get_agent_config("search")
 
 
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-
-_search_config = agent_configs.get("search", {})
-
 _search_instructions = (
     "You are a focused research assistant for visa planning.\n\n"
     "You will receive ONE visa search task at a time in the user message. "
@@ -29,8 +22,8 @@ _search_instructions = (
     "2. Read and synthesize the results, focusing ONLY on official government and approved visa "
     "application centre websites.\n"
     "3. Return your findings as a SINGLE JSON object with the following keys. "
-    "The JSON MUST be strictly valid and self-contained (no trailing text, no extra JSON objects):\n"
-    '   - "task_id": string (echo the task_id you were given)\n'
+    + JSON_OBJECT_RULES
+    + '   - "task_id": string (echo the task_id you were given)\n'
     '   - "summary": string (concise natural-language summary of visa requirements, documents, fees, timelines, '
     'and any health-related entry conditions). In this summary, explicitly state whether a visa is required using '
     'phrases like "Visa required: yes" or "Visa required: no", and where applicable clearly name the primary visa '
@@ -47,44 +40,50 @@ _search_instructions = (
     'URL to the official page (e.g. "Apply for a UK Standard Visitor Visa – https://www.gov.uk/standard-visitor"). '
     "Prefer including at least one direct official application link where available. Avoid extremely long tracking "
     'or redirect URLs; use the clean canonical page URL instead.\n\n'
-    "Keep the summary reasonably short (a few sentences). "
-    "Respond with JSON ONLY, no additional commentary or markdown."
+    "Keep the summary reasonably short (a few sentences).\n"
+    + JSON_ONLY_FOOTER
 )
 
 
-search_agent = Agent(
-    name="search_agent",
-    model=Gemini(model=f"{_search_config.get('model', '')}"),
-    instruction=_search_instructions,
-    tools=[google_search],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_search_config.get("temperature", 0.0)),
-        max_output_tokens=int(_search_config.get("max_tokens", 1000)),
-    ),
-)
+@functools.cache
+def get_search_agent() -> Agent:
+    return build_agent(
+        _search_config,
+        "search_agent",
+        _search_instructions,
+        [google_search],
+        _search_config.max_tokens,
+    )
 
 
 _writer_instructions = (
     "You help persist visa search results into the visa state.\n\n"
-    "When the user provides a JSON object describing a visa search result, you MUST call the\n"
-    "`record_visa_search_result` tool with the corresponding fields:\n"
-    "- task_id (string)\n"
-    "- summary (string)\n"
-    "- processing_time_hint (string or null)\n"
-    "- fee_hint (string or null)\n"
-    "- notes (string or null)\n"
-    "- sources (array of strings, URLs or human-readable source names)\n\n"
+    "The parsed search result has already been staged in session state. When asked to record it, "
+    "you MUST call the `record_current_visa_search_result` tool exactly once; it takes no arguments.\n\n"
     "Do not call any other tools. In your final answer, briefly confirm the task_id you recorded."
 )
 
 
-visa_result_writer_agent = Agent(
-    name="visa_result_writer_agent",
-    model=Gemini(model=f"{_search_config.get('model', '')}"),
-    instruction=_writer_instructions,
-    tools=[record_visa_search_result],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_search_config.get("temperature", 0.0)),
-        max_output_tokens=int(_search_config.get("max_tokens", 500)),
-    ),
-)
+@functools.cache
+def get_visa_result_writer_agent() -> Agent:
+    return build_agent(
+        _search_config,
+        "visa_result_writer_agent",
+        _writer_instructions,
+        [record_current_visa_search_result],
+        _search_config.max_tokens,
+    )
+
+
+# Module attribute access (PEP 562) for the lazily built agents above.
+_AGENT_FACTORIES = {
+    "search_agent": get_search_agent,
+    "visa_result_writer_agent": get_visa_result_writer_agent,
+}
+
+
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
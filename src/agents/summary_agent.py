@@ -1,130 +1,63 @@
-import os
+import functools
+from typing import List
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types as genai_types
+from pydantic import BaseModel, Field
 
-
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
+from src.agents.prompts import static_instruction
+from src.utils.llm import build_gemini, build_generate_content_config
+from src.utils.loaders import get_agent_config, load_instruction
 
 
 # Reuse the same config block as other planning/search agents.
-_summary_config = agent_configs.get("search", {})
-
-
-_trip_summary_instructions = (
-    "You are a trip summary assistant for Globe Tripper.\n\n"
-    "You will receive a single JSON payload with compact planner, visa, flight, "
-    "accommodation, and activity state. The payload has these top-level keys:\n"
-    "  - planner_state: object (trip_details, demographics, preferences, traveler_origins, luggage)\n"
-    "  - visa_state: object (earliest_safe_departure_date, overall_summary, counts, details_by_traveler, sources)\n"
-    "  - flight_state: object (overall_summary, num_tasks, num_results, "
-    "num_traveler_flights, has_booked_flights)\n"
-    "  - accommodation_state: object (chosen accommodation summary, counts)\n"
-    "  - activity_state: object (overall_summary, counts, sample_days)\n"
-    "  - cost_state: object (total_flight_cost_low/high, total_accommodation_cost_low/high, "
-    "total_estimated_cost_low/high, stated_budget, currency hints)\n\n"
-    "Your job is to produce a detailed, user-friendly written summary of the trip plan. "
-    "The summary should feel like a clear brief the family could follow day by day. "
-    "Use clear sections and short paragraphs or bullet points. Focus on:\n"
-    "1) Trip Overview: destination, who is travelling, budget/pace, and the trip dates. "
-    "Call out both the originally requested trip dates and any adjusted window implied by visa timing "
-    "or flights. Do not present the original dates as the actual travel window if the earliest_safe_departure_date "
-    "is later; instead, clearly distinguish between 'requested' dates and 'visa-aware dates used for planning'. "
-    "Also briefly note if travelers are departing from different origins (e.g. some from Lagos, some from Houston).\n"
-    "2) Visa & Timing: key visa constraints and the earliest_safe_departure_date. If this forces the trip to "
-    "start later than the requested start_date, explain that clearly so the user understands how their calendar "
-    "will shift. Where details_by_traveler is available, summarize visa status by nationality/origin group "
-    "(who needs a visa, what type, typical processing and fees, and any explicit health/vaccine requirements). "
-    "Mention official sources or application links from visa_state.sources in a short, readable way.\n"
-    "3) Flights / Getting There: how travellers are getting to and from the destination at a high "
-    "level. If has_booked_flights is true or num_traveler_flights > 0, clearly state that flights "
-    "have already been selected/confirmed and summarize the high-level pattern (rough departure "
-    "and arrival timing, number of stops, typical airlines) using the overall_summary. Only say "
-    "that flights are still being decided or finalized if there are search tasks/results but "
-    "num_traveler_flights is 0.\n"
-    "4) Where You’re Staying: neighborhood and why it suits the preferences (family-friendliness, "
-    "safety, access to parks/transport, etc.). If the state includes a representative chosen property "
-    "(for example, a hotel or vacation rental in a specific area), present it as the recommended base "
-    "for the stay, mentioning its name, rough location, and style. If the state includes a single "
-    "representative 'chosen' accommodation, you MUST name that property explicitly in the 'Where You’re "
-    "Staying' section (for example: 'Your recommended base is …'), and you MUST NOT say that no "
-    "accommodation has been found or applied in that case. Make it clear if this is a proposed/recommended "
-    "option rather than a confirmed booking. Only say that no concrete accommodation options are available "
-    "if there truly are none in the provided state; in that situation, describe what kind of property and "
-    "neighbourhood the user should look for instead of pretending a booking exists.\n"
-    "5) Itinerary Highlights: what the first few days look like (from sample_days) with specific "
-    "dates and key activities. If sample_days contains more than three days, describe at least the "
-    "first 5–7 calendar days in some detail, then summarize the themes for the rest of the trip.\n"
-    "6) Next Steps / Things To Double‑Check: open decisions (e.g. local transport specifics, "
-    "restaurant reservations, tickets that still need booking) plus a short, practical preparedness "
-    "checklist.\n\n"
-    "Next Steps / Preparedness Checklist:\n"
-    "- Always include 5–10 concise bullet points covering practical checks that are still relevant "
-    "given the current state. In addition to any unresolved bookings, adapt this list to the trip "
-    "context using destination, dates, travelers, and visa hints. Examples of items you should "
-    "consider:\n"
-    "  - Driving & transport: If the user might rent a car or use a private driver, remind them to "
-    "check that their driver's licence is valid in the destination (including IDP requirements), "
-    "understand child‑seat rules, and confirm how they'll get from the airport to their "
-    "accommodation.\n"
-    "  - Weather & packing: Use the month and destination to give a common‑sense packing hint "
-    "(e.g. London in December is typically cold and damp, so suggest warm layers, waterproof "
-    "outerwear, and comfortable walking shoes; for hot destinations, suggest light clothing, sun "
-    "protection, and hydration).\n"
-    "  - Health & vaccines: Based on visa_state.overall_summary and the destination, remind the "
-    "user to review any recommended vaccines or health precautions (such as routine immunisations, "
-    "travel vaccines, or bringing necessary medications and prescriptions). If vaccines or health "
-    "requirements were clearly mentioned in visa_state.overall_summary, briefly reinforce them "
-    "instead of inventing new ones.\n"
-    "  - Money & payments: Suggest checking card acceptance, carrying a small amount of local "
-    "currency if appropriate, and notifying banks of international travel.\n"
-    "  - Phones & connectivity: Suggest verifying roaming plans, eSIM or local SIM options, and "
-    "downloading offline maps and key apps (e.g. for local transport).\n"
-    "  - Family & safety: For trips with children, mention basics like packing any required "
-    "medications, comfort items, and understanding emergency numbers or nearby medical facilities. "
-    "If luggage or traveler_origins indicate multiple long-haul flights or heavy bags, offer a short, "
-    "practical note on managing luggage across legs (e.g. checking bags through, using trolleys or porters, "
-    "and keeping essentials in carry-ons).\n"
-    "  - Travel insurance: Suggest confirming that travel/medical insurance is in place and covers "
-    "the destination and planned activities.\n\n"
-    "Guidelines:\n"
-    "- Never invent new dates or contradict obvious constraints; always use the ISO date strings "
-    "provided in planner_state, visa_state, flight_state, and activity_state. If there is a conflict, "
-    "explain it and clearly label which dates are actually used for planning (typically the visa-aware "
-    "flight dates).\n"
-    "- If dates or timings appear inconsistent (for example, trip_details.start_date is earlier "
-    "than visa_state.earliest_safe_departure_date), do NOT hide this. Explain the situation "
-    "clearly instead of presenting a single misleading range or ambiguous bullet.\n"
-    "- Do NOT mention any numeric prices, totals, nightly rates, per-person costs, or explicit currency amounts "
-    "in your summary. A separate component will handle all Budget & Costs calculations and presentation based "
-    "on cost_state. You may still qualitatively describe options as cheaper, more expensive, premium, or budget "
-    "friendly, but never include concrete numbers or currency symbols.\n"
-    "- Accommodation grounding: When you name specific properties (hotels, apartments, hostels), only refer to "
-    "places that are present in the JSON payload (for example in accommodation_state.chosen or in related "
-    "summaries). Do NOT invent or recommend hotel brands or properties that are not mentioned in the data.\n"
-    "- Do NOT echo the raw JSON or field names back to the user.\n"
-    "- Keep the tone practical, friendly, and confident.\n"
-    "- Provide enough detail that the user can see how flights, accommodation, and daily "
-    "activities hang together, without listing every tiny action.\n"
-    "- If some parts of the state are missing (e.g. no flights recorded and has_booked_flights is "
-    "false), acknowledge that briefly and move on.\n"
-)
-
-
-trip_summary_agent = Agent(
-    name="trip_summary_agent",
-    model=Gemini(model=f"{_summary_config.get('model', '')}"),
-    instruction=_trip_summary_instructions,
-    tools=[],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_summary_config.get("temperature", 0.2)),
-        max_output_tokens=int(_summary_config.get("max_tokens", 2000)),
-    ),
-)
+_summary_config = get_agent_config("search")
+
+
+_trip_summary_instructions = load_instruction("summary")
+
+
+class TripSummaryOutput(BaseModel):
+    """
+    Structured trip summary. Gemini decodes against this schema and run.py
+    renders the sections to Markdown.
+    """
+
+    overview: str = Field(description="Trip Overview section.")
+    visa_timing: str = Field(description="Visa & Timing section.")
+    flights: str = Field(description="Flights / Getting There section.")
+    accommodation: str = Field(description="Where You're Staying section.")
+    itinerary_highlights: List[str] = Field(
+        description="Itinerary Highlights, one entry per day or theme."
+    )
+    next_steps: List[str] = Field(
+        description="Next Steps / Preparedness Checklist, one entry per bullet."
+    )
+
+
+@functools.cache
+def get_trip_summary_agent() -> Agent:
+    return Agent(
+        name="trip_summary_agent",
+        model=build_gemini(_summary_config),
+        instruction=static_instruction(_trip_summary_instructions),
+        tools=[],
+        output_schema=TripSummaryOutput,
+        generate_content_config=build_generate_content_config(
+            _summary_config,
+            _summary_config.max_tokens,
+        ),
+    )
+
+
+# Built on first use rather than at import time; ``trip_summary_agent`` is still
+# importable via PEP 562 and returns the cached instance.
+_AGENT_FACTORIES = {
+    "trip_summary_agent": get_trip_summary_agent,
+}
+
+
+def __getattr__(name: str) -> Agent:
+    factory = _AGENT_FACTORIES.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
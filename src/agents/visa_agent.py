@@ -1,28 +1,18 @@
-import os
+import functools
+from typing import Any, Dict, Optional, Tuple
 
 from google.adk.agents import Agent
-from google.adk.models.google_llm import Gemini
-from google.genai import types as genai_types
 
+from src.agents.prompts import static_instruction
 from src.tools.tools import build_visa_search_prompt, apply_visa_search_results
 from src.state.state_utils import get_planner_state, get_visa_state
+from src.utils.llm import build_gemini, build_generate_content_config
+from src.utils.loaders import get_agent_config, load_instruction
 
 
-agent_config_path = os.path.join(os.path.dirname(__file__), "../config/agents.yaml")
-visa_instructions_path = os.path.join(
-    os.path.dirname(__file__), "../artifacts/visa/instruction.md"
-)
+_visa_instructions = load_instruction("visa")
 
-
-with open(agent_config_path, "r") as f:
-    import yaml
-
-    agent_configs = yaml.safe_load(f)
-
-with open(visa_instructions_path, "r") as f:
-    _visa_instructions = f.read()
-
-_visa_config = agent_configs.get("visa", {})
+_visa_config = get_agent_config("visa")
 
 
 def _visa_state_reader(tool_context):
@@ -33,44 +23,61 @@ def _visa_state_reader(tool_context):
     It returns:
       - destination: overall trip destination (country / city).
       - start_date, end_date: trip dates if available.
-      - travelers: a list of travelers with index, role, nationality, origin.
+      - traveler_groups: travelers grouped by (nationality, origin), each with
+        nationality, origin, member_indexes and the matching roles.
     """
     planner_state = get_planner_state(tool_context)
 
     destination = planner_state.trip_details.destination
     start_date = planner_state.trip_details.start_date
     end_date = planner_state.trip_details.end_date
+    default_origin = planner_state.trip_details.origin
 
-    travelers = []
+    # Travelers who share nationality and origin get the same visa answer, so
+    # the agent only needs one search prompt per group.
+    groups: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
     for idx, traveler in enumerate(planner_state.demographics.travelers or []):
-        travelers.append(
+        origin = traveler.origin or default_origin
+        group = groups.setdefault(
+            (traveler.nationality, origin),
             {
-                "index": idx,
-                "role": traveler.role,
                 "nationality": traveler.nationality,
-                "origin": traveler.origin or planner_state.trip_details.origin,
-            }
+                "origin": origin,
+                "member_indexes": [],
+                "roles": [],
+            },
         )
+        group["member_indexes"].append(idx)
+        group["roles"].append(traveler.role)
 
     return {
         "destination": destination,
         "start_date": start_date,
         "end_date": end_date,
-        "travelers": travelers,
+        "traveler_groups": list(groups.values()),
     }
 
 
-visa_agent = Agent(
-    name="visa_agent",
-    model=Gemini(model=f"{_visa_config.get('model', '')}"),
-    instruction=_visa_instructions,
-    tools=[
-        _visa_state_reader,
-        build_visa_search_prompt,
-        apply_visa_search_results,
-    ],
-    generate_content_config=genai_types.GenerateContentConfig(
-        temperature=float(_visa_config.get("temperature", 0.2)),
-        max_output_tokens=int(_visa_config.get("max_tokens", 1000)),
-    ),
-)
+@functools.cache
+def get_visa_agent() -> Agent:
+    return Agent(
+        name="visa_agent",
+        model=build_gemini(_visa_config),
+        instruction=static_instruction(_visa_instructions),
+        tools=[
+            _visa_state_reader,
+            build_visa_search_prompt,
+            apply_visa_search_results,
+        ],
+        generate_content_config=build_generate_content_config(
+            _visa_config,
+            _visa_config.max_tokens,
+        ),
+    )
+
+
+def __getattr__(name: str) -> Agent:
+    # Module attribute access (PEP 562) so the agent is built on first use.
+    if name == "visa_agent":
+        return get_visa_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
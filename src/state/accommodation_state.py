@@ -1,6 +1,38 @@
-from typing import List, Optional, Literal
+from enum import Enum
+from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+
+
+class OptionType(str, Enum):
+    """
+    Canonical accommodation buckets. Members compare equal to their plain
+    string values, and validation is a hash lookup on the member table.
+    """
+
+    CHEAPEST = "cheapest"
+    BEST_LOCATION = "best_location"
+    FAMILY_FRIENDLY = "family_friendly"
+    BALANCED = "balanced"
+    LUXURY = "luxury"
+
+    # Render as the bare value in f-strings and prompts, not "OptionType.X".
+    __str__ = str.__str__
+
+
+class StayType(str, Enum):
+    """
+    Kind of property behind an accommodation option.
+    """
+
+    HOTEL = "hotel"
+    VACATION_RENTAL = "vacation_rental"
+    BNB = "bnb"
+    HOSTEL = "hostel"
+    APARTMENT = "apartment"
+    OTHER = "other"
+
+    __str__ = str.__str__
 
 
 class AccommodationOption(BaseModel):
@@ -9,25 +41,18 @@ class AccommodationOption(BaseModel):
     (hotel, vacation rental, hostel, etc.) for a given search task.
     """
 
-    option_type: Literal[
-        "cheapest",
-        "best_location",
-        "family_friendly",
-        "balanced",
-        "luxury",
-    ] = Field(
+    # Options are built from SearchAPI / LLM payloads that may carry extra keys;
+    # those are dropped rather than rejecting the whole option. Frozen because
+    # the same instance is shared between a result's options and the
+    # per-traveler chosen/other options.
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    option_type: OptionType = Field(
         ...,
         description="Canonical bucket for this option.",
     )
 
-    stay_type: Literal[
-        "hotel",
-        "vacation_rental",
-        "bnb",
-        "hostel",
-        "apartment",
-        "other",
-    ] = Field(
+    stay_type: StayType = Field(
         ...,
         description="Type of accommodation (e.g. hotel vs vacation rental).",
     )
@@ -136,6 +161,8 @@ class AccommodationSearchTask(BaseModel):
     or more travelers.
     """
 
+    model_config = ConfigDict(extra="forbid")
+
     task_id: str = Field(
         ...,
         description="Unique identifier for this accommodation search task within the session.",
@@ -200,6 +227,8 @@ class AccommodationSearchResult(BaseModel):
     Normalized result of an accommodation search for one AccommodationSearchTask.
     """
 
+    model_config = ConfigDict(extra="forbid")
+
     task_id: str = Field(
         ...,
         description="ID of the AccommodationSearchTask this result corresponds to.",
@@ -244,9 +273,7 @@ class AccommodationSearchResult(BaseModel):
         description="Additional notes or caveats relevant for these accommodations.",
     )
 
-    chosen_option_type: Optional[
-        Literal["cheapest", "best_location", "family_friendly", "balanced", "luxury"]
-    ] = Field(
+    chosen_option_type: Optional[OptionType] = Field(
         default=None,
         description="Which canonical option type was ultimately selected for this task, if any.",
     )
@@ -262,6 +289,8 @@ class TravelerAccommodationChoice(BaseModel):
     from AccommodationSearchResult entries.
     """
 
+    model_config = ConfigDict(extra="forbid")
+
     traveler_index: int = Field(
         ...,
         description="Index into PlannerState.demographics.travelers.",
@@ -301,9 +330,7 @@ class TravelerAccommodationChoice(BaseModel):
         description="Additional caveats or remarks for this traveler's accommodations.",
     )
 
-    chosen_option_type: Optional[
-        Literal["cheapest", "best_location", "family_friendly", "balanced", "luxury"]
-    ] = Field(
+    chosen_option_type: Optional[OptionType] = Field(
         default=None,
         description="Which canonical option type was ultimately selected.",
     )
@@ -327,6 +354,8 @@ class AccommodationState(BaseModel):
     Container for all accommodation planning outputs for a given session.
     """
 
+    model_config = ConfigDict(extra="forbid")
+
     search_tasks: List[AccommodationSearchTask] = Field(
         default_factory=list,
         description="Pending or completed accommodation search tasks to be run by a search agent.",
@@ -344,3 +373,7 @@ class AccommodationState(BaseModel):
         description="Per‑traveler or per‑group view of chosen accommodations and alternatives.",
     )
 
+
+# Validates a whole list of option payloads in a single call instead of
+# constructing AccommodationOption objects one at a time.
+ACCOMMODATION_OPTIONS_ADAPTER = TypeAdapter(List[AccommodationOption])
@@ -1,6 +1,12 @@
-from typing import List, Optional, Literal
+import sys
+from typing import Any, List, Optional, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+
+
+def _intern(value: Any) -> Any:
+    """Intern short, low-cardinality strings so parsed models share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 class ActivityOption(BaseModel):
@@ -9,6 +15,10 @@ class ActivityOption(BaseModel):
     that could be added to an itinerary.
     """
 
+    # Frozen so one instance can back both a search result and the itinerary
+    # items built from it.
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Display name of the activity or place.")
     category: Optional[str] = Field(
         default=None,
@@ -117,6 +127,10 @@ class ActivityOption(BaseModel):
         description="Additional caveats or highlights for this activity.",
     )
 
+    _intern_labels = field_validator(
+        "category", "city", "country", "currency", mode="before"
+    )(_intern)
+
 
 class ActivitySearchTask(BaseModel):
     """
@@ -263,3 +277,7 @@ class ActivityState(BaseModel):
         description="High-level summary of the planned itinerary and key themes.",
     )
 
+
+# Validates a whole list of option payloads in a single call instead of
+# constructing ActivityOption objects one at a time.
+ACTIVITY_OPTIONS_ADAPTER = TypeAdapter(List[ActivityOption])
@@ -1,6 +1,27 @@
-from typing import List, Optional, Literal
+import sys
+from enum import Enum
+from typing import Any, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+
+
+def _intern(value: Any) -> Any:
+    """Intern short, low-cardinality strings so parsed models share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class FlightOptionType(str, Enum):
+    """
+    Canonical flight buckets. Members compare equal to their plain string
+    values, and every option shares the same member objects.
+    """
+
+    CHEAPEST = "cheapest"
+    FASTEST = "fastest"
+    BALANCED = "balanced"
+
+    # Render as the bare value in f-strings and prompts, not "FlightOptionType.X".
+    __str__ = str.__str__
 
 
 class FlightOption(BaseModel):
@@ -9,7 +30,11 @@ class FlightOption(BaseModel):
     (e.g. cheapest, fastest, or balanced) for a given search task.
     """
 
-    option_type: Literal["cheapest", "fastest", "balanced"] = Field(
+    # Frozen because the same instance is shared between a result's options
+    # and the per-traveler chosen/other options.
+    model_config = ConfigDict(frozen=True)
+
+    option_type: FlightOptionType = Field(
         ...,
         description="Canonical bucket for this option.",
     )
@@ -90,6 +115,15 @@ class FlightOption(BaseModel):
         description="Free-form notes (e.g. baggage caveats, typical hubs).",
     )
 
+    _intern_currency = field_validator("currency", mode="before")(_intern)
+
+    @field_validator("airlines", mode="before")
+    @classmethod
+    def _intern_airlines(cls, value: Any) -> Any:
+        if isinstance(value, list):
+            return [_intern(airline) for airline in value]
+        return value
+
 
 class FlightSearchTask(BaseModel):
     """
@@ -157,6 +191,10 @@ class FlightSearchTask(BaseModel):
         description="Short machine-readable label for this search (e.g. 'flight_options_lookup').",
     )
 
+    _intern_labels = field_validator(
+        "origin_city", "destination_city", "cabin_preference", "budget_mode", mode="before"
+    )(_intern)
+
 
 class FlightSearchResult(BaseModel):
     """
@@ -199,7 +237,7 @@ class FlightSearchResult(BaseModel):
         default=None,
         description="Additional notes or caveats relevant for these flights.",
     )
-    chosen_option_type: Optional[Literal["cheapest", "fastest", "balanced"]] = Field(
+    chosen_option_type: Optional[FlightOptionType] = Field(
         default=None,
         description="Which canonical option type was ultimately selected for this task, if any.",
     )
@@ -249,7 +287,7 @@ class TravelerFlightChoice(BaseModel):
         description="Additional caveats or remarks for this traveler's flights.",
     )
 
-    chosen_option_type: Optional[Literal["cheapest", "fastest", "balanced"]] = Field(
+    chosen_option_type: Optional[FlightOptionType] = Field(
         default=None,
         description="Which canonical option type was ultimately selected for this traveler.",
     )
@@ -289,3 +327,8 @@ class FlightState(BaseModel):
         default_factory=list,
         description="Per-traveler view of chosen flights and alternatives.",
     )
+
+
+# Validates a whole list of option payloads in a single call instead of
+# constructing FlightOption objects one at a time.
+FLIGHT_OPTIONS_ADAPTER = TypeAdapter(List[FlightOption])
@@ -1,5 +1,5 @@
 from typing import Optional, List, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # Target Schema
@@ -15,6 +15,10 @@ class TripDetails(BaseModel):
 
 
 class Traveler(BaseModel):
+    # Frozen: update_trip_plan merges travelers by building new instances, so
+    # existing ones can be shared safely.
+    model_config = ConfigDict(frozen=True)
+
     role: Literal["adult", "child", "senior"]
     age: Optional[int] = None
     nationality: Optional[str] = None
@@ -6,6 +6,11 @@ from src.state.accommodation_state import AccommodationState
 from src.state.activity_state import ActivityState
 
 
+# Session-state keys owned by PlannerState, resolved once at import rather
+# than re-reading model_fields (a metaclass property) on every tool call.
+_PLANNER_STATE_KEYS = tuple(PlannerState.model_fields)
+
+
 def get_planner_state(tool_context: ToolContext) -> PlannerState:
     """
     Load PlannerState from ADK's session state.
@@ -23,14 +28,14 @@ def get_planner_state(tool_context: ToolContext) -> PlannerState:
     if state_obj is None:
         return PlannerState()
 
-    # `State` exposes a `to_dict()` that merges base + delta.
-    try:
-        state_dict = state_obj.to_dict()  # type: ignore[attr-defined]
-    except AttributeError:
-        try:
-            state_dict = dict(state_obj)
-        except Exception:
-            state_dict = {}
+    # Pull only PlannerState's own keys. `State.get()` already checks the
+    # pending delta first, and `to_dict()` would copy every other section
+    # (visa, flights, accommodation, activities) just to discard it.
+    state_dict = {}
+    for key in _PLANNER_STATE_KEYS:
+        value = state_obj.get(key)
+        if value is not None:
+            state_dict[key] = value
 
     try:
         return PlannerState.model_validate(state_dict)
@@ -43,7 +48,8 @@ def save_planner_state(tool_context: ToolContext, state: PlannerState) -> None:
     Persist PlannerState into ADK's per-session state.
 
     ADK tracks deltas via `tool_context.state[...] = ...`, so we update
-    the specific keys we own rather than replacing the whole dict.
+    the specific keys we own rather than replacing the whole dict, and
+    only the ones whose value actually changed.
 
     Args:
         tool_context (ToolContext): The context of the tool call, including session state.
@@ -56,10 +62,38 @@ def save_planner_state(tool_context: ToolContext, state: PlannerState) -> None:
     if state_obj is None:
         return
 
-    state_obj["trip_details"] = state.trip_details.model_dump()
-    state_obj["demographics"] = state.demographics.model_dump()
-    state_obj["preferences"] = state.preferences.model_dump()
-    state_obj["status"] = state.status
+    # Most intake turns touch a single section; skipping unchanged keys keeps
+    # the others out of the event's state_delta.
+    sections = (
+        ("trip_details", state.trip_details.model_dump()),
+        ("demographics", state.demographics.model_dump()),
+        ("preferences", state.preferences.model_dump()),
+        ("status", state.status),
+    )
+    for key, value in sections:
+        if state_obj.get(key) != value:
+            state_obj[key] = value
+
+
+def save_planner_status(tool_context: ToolContext, status: str) -> None:
+    """
+    Persist only PlannerState.status into ADK's per-session state.
+
+    Used for status transitions, where re-dumping trip_details,
+    demographics and preferences would only confirm they are unchanged.
+
+    Args:
+        tool_context (ToolContext): The context of the tool call, including session state.
+        status (str): The new PlannerState.status value.
+
+    Returns:
+        None
+    """
+    state_obj = getattr(tool_context, "state", None)
+    if state_obj is None:
+        return
+
+    state_obj["status"] = status
 
 
 def get_visa_state(tool_context: ToolContext) -> VisaState:
@@ -200,40 +234,35 @@ def is_intake_complete(state: PlannerState) -> bool:
     """
     td, demo, pref = state.trip_details, state.demographics, state.preferences
 
-    # Origin can be provided either at the trip level or per traveler,
-    # using either city names or airport codes.
-    has_trip_origin = bool(td.origin) or bool(td.origin_airport_code)
-    has_per_traveler_origin = bool(demo.travelers) and all(
-        (t.origin or t.origin_airport_code) for t in demo.travelers
-    )
-    has_origin_info = has_trip_origin or has_per_traveler_origin
-
-    # Basic trip + budget info must be present.
-    basic_ok = all(
-        [
-            td.destination,
-            td.start_date,
-            td.end_date,
-            pref.budget_mode is not None,
-            has_origin_info,
-        ]
-    )
+    # Cheap scalar checks first so an early-intake state (no destination or
+    # dates yet) is rejected without walking the travelers list.
+    if not (td.destination and td.start_date and td.end_date):
+        return False
+    if pref.budget_mode is None:
+        return False
 
     # Headcount must be specified.
-    has_counts = demo.adults is not None and demo.children is not None
-
-    # Nationalities must be known either in aggregate or per traveler.
-    has_aggregate_nationality = demo.nationality not in (None, [])
+    if demo.adults is None or demo.children is None:
+        return False
 
     total_expected = (demo.adults or 0) + (demo.children or 0) + (demo.seniors or 0)
-    has_travelers_list = total_expected == 0 or len(demo.travelers) >= total_expected
-    per_traveler_nat_ok = all(t.nationality for t in demo.travelers)
-
-    return all(
-        [
-            basic_ok,
-            has_counts,
-            has_aggregate_nationality or per_traveler_nat_ok,
-            has_travelers_list,
-        ]
-    )
+    if total_expected and len(demo.travelers) < total_expected:
+        return False
+
+    # Origin can be provided either at the trip level or per traveler,
+    # using either city names or airport codes. Nationalities must be known
+    # either in aggregate or per traveler.
+    need_origin = not (td.origin or td.origin_airport_code)
+    need_nationality = demo.nationality in (None, [])
+    if need_origin and not demo.travelers:
+        return False
+
+    # One pass over the travelers covers whichever per-traveler fallbacks
+    # are still needed.
+    if need_origin or need_nationality:
+        for t in demo.travelers:
+            if need_origin and not (t.origin or t.origin_airport_code):
+                return False
+            if need_nationality and not t.nationality:
+                return False
+    return True
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class VisaRequirement(BaseModel):
@@ -75,6 +75,10 @@ class VisaSearchTask(BaseModel):
     Typically groups one or more travelers who share nationality/destination.
     """
 
+    # Tasks and results are write-once records; VisaRequirement stays mutable
+    # because apply_visa_search_results fills it in field by field.
+    model_config = ConfigDict(frozen=True)
+
     task_id: str = Field(
         ...,
         description="Unique identifier for this search task within the session.",
@@ -114,6 +118,8 @@ class VisaSearchResult(BaseModel):
     Normalized result of a visa search for one VisaSearchTask.
     """
 
+    model_config = ConfigDict(frozen=True)
+
     task_id: str = Field(
         ...,
         description="ID of the VisaSearchTask this result corresponds to.",
@@ -0,0 +1,137 @@
+"""
+Exact-match response cache for expensive search calls.
+
+Entries are keyed by a blake2b hash of the normalised request (prompt text or
+query parameters), stored as JSON in a small SQLite file, and expire after a
+per-namespace TTL. Repeated trips that ask the same question (for example the
+same visa route or the same flight search) skip the external call entirely.
+Trip summaries are cached on their full JSON payload, so re-summarising an
+unchanged plan skips the summary model call.
+
+The cache is opt-in: nothing is written to disk unless a path is configured.
+
+Environment:
+  - GLOBE_RESPONSE_CACHE_PATH: SQLite file to use (for example
+    "~/.cache/globe_tripper/responses.sqlite3"); set to ":memory:" for a
+    per-process cache. Unset or empty disables caching.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+VISA_SEARCH_TTL_SECONDS = 7 * 24 * 60 * 60
+FLIGHT_SEARCH_TTL_SECONDS = 24 * 60 * 60
+TRIP_SUMMARY_TTL_SECONDS = 24 * 60 * 60
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def cache_key(material: Any) -> str:
+    """
+    Hash a prompt string or a JSON-serialisable mapping into a cache key.
+
+    Strings are case-folded and whitespace-collapsed; mappings are serialised
+    with sorted keys so argument order does not matter.
+    """
+    if isinstance(material, str):
+        text = _WHITESPACE_RE.sub(" ", material).strip().casefold()
+    else:
+        text = json.dumps(material, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    A TTL'd key/value store for one namespace (e.g. "visa" or "flight").
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, path: Optional[str] = None) -> None:
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+
+        path = self._path
+        if path is None:
+            path = os.getenv("GLOBE_RESPONSE_CACHE_PATH", "")
+        if not path:
+            return None
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # Tools can run on worker threads; access is serialised by self._lock.
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._conn = conn
+        return conn
+
+    def get(self, material: Any) -> Optional[Any]:
+        key = cache_key(material)
+        try:
+            with self._lock:
+                conn = self._connect()
+                if conn is None:
+                    return None
+                row = conn.execute(
+                    "SELECT payload, expires_at FROM responses WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Response cache read failed: %s", exc)
+            return None
+
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, material: Any, value: Any) -> None:
+        key = cache_key(material)
+        try:
+            payload = json.dumps(value, default=str)
+            with self._lock:
+                conn = self._connect()
+                if conn is None:
+                    return
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO responses (namespace, key, expires_at, payload) "
+                        "VALUES (?, ?, ?, ?)",
+                        (self.namespace, key, time.time() + self.ttl_seconds, payload),
+                    )
+        except (sqlite3.Error, TypeError, ValueError) as exc:
+            logger.warning("Response cache write failed: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            with conn:
+                conn.execute("DELETE FROM responses WHERE namespace = ?", (self.namespace,))
+
+
+visa_search_cache = ResponseCache("visa", VISA_SEARCH_TTL_SECONDS)
+flight_search_cache = ResponseCache("flight", FLIGHT_SEARCH_TTL_SECONDS)
+trip_summary_cache = ResponseCache("summary", TRIP_SUMMARY_TTL_SECONDS)
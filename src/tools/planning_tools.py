@@ -3,7 +3,7 @@ from typing import Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
 from src.state.planner_state import PlannerState
-from src.state.state_utils import get_planner_state, save_planner_state, is_intake_complete
+from src.state.state_utils import get_planner_state, save_planner_status, is_intake_complete
 
 
 def mark_ready_for_planning(tool_context: ToolContext) -> Dict[str, Any]:
@@ -32,11 +32,11 @@ def mark_ready_for_planning(tool_context: ToolContext) -> Dict[str, Any]:
             "reason": "intake_incomplete",
         }
 
-    state.status = "planning"
-    save_planner_state(tool_context, state)
+    # Only the status changes, so write that key alone.
+    save_planner_status(tool_context, "planning")
 
     return {
         "status": "success",
-        "new_status": state.status,
+        "new_status": "planning",
     }
 
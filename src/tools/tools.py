@@ -1,10 +1,12 @@
-from typing import Optional, List, Dict, Any, Tuple, Literal
+from typing import Optional, List, Dict, Any, Tuple, Literal, Type
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 
 import requests
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from google.adk.tools.tool_context import ToolContext
 from src.state.planner_state import Traveler
 from src.state.state_utils import (
@@ -32,6 +34,7 @@ from src.state.flight_state import (
     FlightSearchResult,
     FlightOption,
     TravelerFlightChoice,
+    FLIGHT_OPTIONS_ADAPTER,
 )
 from src.state.accommodation_state import (
     AccommodationState,
@@ -39,6 +42,7 @@ from src.state.accommodation_state import (
     AccommodationSearchResult,
     AccommodationOption,
     TravelerAccommodationChoice,
+    ACCOMMODATION_OPTIONS_ADAPTER,
 )
 from src.state.activity_state import (
     ActivityState,
@@ -46,12 +50,91 @@ from src.state.activity_state import (
     ActivitySearchResult,
     ActivityOption,
     DayItineraryItem,
+    ACTIVITY_OPTIONS_ADAPTER,
 )
+from src.tools.cache import flight_search_cache
 from src.utils.costs import compute_cost_summary_from_state
 
 
 logger = logging.getLogger(__name__)
 
+# Session-state key used to hand a validated search result to a writer agent
+# without embedding it as JSON in the user message.
+CURRENT_TASK_KEY = "current_task"
+
+
+def _parse_options(
+    adapter: TypeAdapter,
+    model: Type[BaseModel],
+    kind: str,
+    options: List[Any],
+    task_id: Optional[str],
+) -> List[Any]:
+    """
+    Validate a batch of option payloads in one pass.
+
+    If any option is invalid, falls back to parsing them one by one so the
+    valid options are kept and the invalid ones are logged and dropped.
+    """
+    if not options:
+        return []
+    try:
+        return adapter.validate_python(options)
+    except ValidationError:
+        pass
+
+    option_models: List[Any] = []
+    for opt in options:
+        try:
+            option_models.append(model.model_validate(opt))
+        except Exception as exc:
+            logger.warning(
+                f"[Tool] could not parse {kind} option",
+                extra={"task_id": task_id, "option": opt, "error": str(exc)},
+            )
+    return option_models
+
+
+def parse_accommodation_options(
+    options: Optional[List[Dict[str, Any]]],
+    task_id: Optional[str] = None,
+) -> List[AccommodationOption]:
+    """Batch-validate accommodation option payloads (see _parse_options)."""
+    return _parse_options(
+        ACCOMMODATION_OPTIONS_ADAPTER, AccommodationOption, "accommodation", options or [], task_id
+    )
+
+
+def parse_flight_options(
+    options: Optional[List[Any]],
+    task_id: Optional[str] = None,
+) -> List[FlightOption]:
+    """
+    Batch-validate flight option payloads (see _parse_options). ADK may hand
+    over dicts or already-built models; FlightOption interns its own strings.
+    """
+    return _parse_options(FLIGHT_OPTIONS_ADAPTER, FlightOption, "flight", options or [], task_id)
+
+
+def parse_activity_options(
+    options: Optional[List[Any]],
+    task_id: Optional[str] = None,
+) -> List[ActivityOption]:
+    """Batch-validate activity option payloads, skipping non-dict entries."""
+    payload = [opt for opt in options or [] if isinstance(opt, dict)]
+    return _parse_options(ACTIVITY_OPTIONS_ADAPTER, ActivityOption, "activity", payload, task_id)
+
+
+def _pop_current_task(tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+    state_obj = getattr(tool_context, "state", None)
+    if state_obj is None:
+        return None
+    payload = state_obj.get(CURRENT_TASK_KEY)
+    if not isinstance(payload, dict):
+        return None
+    state_obj[CURRENT_TASK_KEY] = None
+    return payload
+
 
 def update_trip_plan(
     tool_context: ToolContext,
@@ -743,6 +826,28 @@ def record_visa_search_result(
     }
 
 
+def record_current_visa_search_result(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Persist the visa search result staged in session state under
+    "current_task" and clear it.
+
+    The pipeline stages the already-parsed search output there, so the writer
+    agent only has to trigger this tool instead of re-emitting every field.
+    """
+    payload = _pop_current_task(tool_context)
+    if payload is None:
+        return {"status": "error", "reason": "missing_current_task"}
+    return record_visa_search_result(
+        tool_context,
+        task_id=payload.get("task_id") or "",
+        summary=payload.get("summary") or "",
+        processing_time_hint=payload.get("processing_time_hint"),
+        fee_hint=payload.get("fee_hint"),
+        notes=payload.get("notes"),
+        sources=payload.get("sources"),
+    )
+
+
 def apply_visa_search_results(tool_context: ToolContext) -> Dict[str, Any]:
     """
     Apply the normalized VisaSearchResult entries back onto VisaRequirement
@@ -918,13 +1023,13 @@ def record_flight_search_result(
     tool_context: ToolContext,
     task_id: str,
     summary: str,
-    options: Optional[List[Dict[str, Any]]] = None,
+    options: Optional[List[FlightOption]] = None,
     best_price_hint: Optional[str] = None,
     best_time_hint: Optional[str] = None,
     cheap_but_long_hint: Optional[str] = None,
     recommended_option_label: Optional[str] = None,
     notes: Optional[str] = None,
-    chosen_option_type: Optional[str] = None,
+    chosen_option_type: Optional[Literal["cheapest", "fastest", "balanced"]] = None,
     selection_reason: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
@@ -933,6 +1038,18 @@ def record_flight_search_result(
     This tool does NOT call external services. It relies on the agent
     to pass in a concise summary and extracted hints based on prior
     flight search calls.
+
+    Args:
+      task_id: The task_id of the FlightSearchTask being summarized.
+      summary: Short summary of routes, durations and airlines covering the cheapest, fastest and balanced options.
+      options: Up to three canonical options (cheapest, fastest, balanced); use null for unknown fields.
+      best_price_hint: Typical lowest reasonable price range per traveler.
+      best_time_hint: Fastest or most time-efficient option (duration and stops).
+      cheap_but_long_hint: Cheapest but significantly longer options.
+      recommended_option_label: Short label for the recommended balanced option.
+      notes: Additional caveats.
+      chosen_option_type: The canonical option type you recommend.
+      selection_reason: Why you chose that option type.
     """
     flight_state = get_flight_state(tool_context)
 
@@ -946,15 +1063,7 @@ def record_flight_search_result(
 
     query = matching_task.prompt
 
-    option_models: List[FlightOption] = []
-    for opt in options or []:
-        try:
-            option_models.append(FlightOption(**opt))
-        except Exception as exc:
-            logger.warning(
-                "[Tool] record_flight_search_result could not parse option",
-                extra={"task_id": task_id, "option": opt, "error": str(exc)},
-            )
+    option_models = parse_flight_options(options, task_id)
 
     result = FlightSearchResult(
         task_id=task_id,
@@ -1263,7 +1372,9 @@ def apply_flight_search_results(tool_context: ToolContext) -> Dict[str, Any]:
                 other_options = list(result.options[1:])
 
             traveler_flights.append(
-                TravelerFlightChoice(
+                # Every field is copied from an already-validated result, so
+                # skip re-validation.
+                TravelerFlightChoice.model_construct(
                     traveler_index=traveler_index,
                     task_id=task.task_id,
                     summary=result.summary,
@@ -1338,15 +1449,7 @@ def record_accommodation_search_result(
 
     query = matching_task.prompt
 
-    option_models: List[AccommodationOption] = []
-    for opt in options or []:
-        try:
-            option_models.append(AccommodationOption(**opt))
-        except Exception as exc:
-            logger.warning(
-                "[Tool] record_accommodation_search_result could not parse option",
-                extra={"task_id": task_id, "option": opt, "error": str(exc)},
-            )
+    option_models = parse_accommodation_options(options, task_id)
 
     result = AccommodationSearchResult(
         task_id=task_id,
@@ -1450,7 +1553,9 @@ def apply_accommodation_search_results(tool_context: ToolContext) -> Dict[str, A
                 other_options = list(result.options[1:])
 
             traveler_accommodations.append(
-                TravelerAccommodationChoice(
+                # Every field is copied from an already-validated result, so
+                # skip re-validation.
+                TravelerAccommodationChoice.model_construct(
                     traveler_index=traveler_index,
                     task_id=task.task_id,
                     summary=result.summary,
@@ -1865,6 +1970,16 @@ def searchapi_google_flights(
     if currency:
         params["currency"] = currency
 
+    # Identical searches within the TTL reuse the stored response.
+    cache_params = dict(params)
+    cached = flight_search_cache.get(cache_params)
+    if cached is not None:
+        logger.info(
+            "[Tool] searchapi_google_flights cache hit",
+            extra={"departure_id": departure_id, "arrival_id": arrival_id},
+        )
+        return cached
+
     # Prefer query-param auth (ApiKeyQuery) to avoid header confusion.
     params["api_key"] = api_key
 
@@ -2010,7 +2125,7 @@ def searchapi_google_flights(
         },
     )
 
-    return {
+    result = {
         "status": "success",
         "departure_id": departure_id,
         "arrival_id": arrival_id,
@@ -2025,6 +2140,8 @@ def searchapi_google_flights(
         "options": options,
         "raw": raw_json,
     }
+    flight_search_cache.set(cache_params, result)
+    return result
 
 
 def searchapi_google_flights_calendar(
@@ -2351,17 +2468,7 @@ def record_activity_search_result(
         )
         return {"status": "error", "reason": "unknown_task_id", "task_id": task_id}
 
-    option_models: List[ActivityOption] = []
-    for opt in options or []:
-        if not isinstance(opt, dict):
-            continue
-        try:
-            option_models.append(ActivityOption(**opt))
-        except Exception as exc:
-            logger.warning(
-                "[Tool] record_activity_search_result could not parse option",
-                extra={"task_id": task_id, "option": opt, "error": str(exc)},
-            )
+    option_models = parse_activity_options(options, task_id)
 
     result = ActivitySearchResult(
         task_id=task_id,
@@ -2393,6 +2500,26 @@ def record_activity_search_result(
     }
 
 
+def record_current_activity_search_result(tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Persist the activity search result staged in session state under
+    "current_task" and clear it.
+    """
+    payload = _pop_current_task(tool_context)
+    if payload is None:
+        return {"status": "error", "reason": "missing_current_task"}
+    return record_activity_search_result(
+        tool_context,
+        task_id=payload.get("task_id") or "",
+        summary=payload.get("summary") or "",
+        options=payload.get("options"),
+        budget_hint=payload.get("budget_hint"),
+        family_friendly_hint=payload.get("family_friendly_hint"),
+        neighborhood_hint=payload.get("neighborhood_hint"),
+        query=payload.get("query"),
+    )
+
+
 def apply_activity_search_results(tool_context: ToolContext) -> Dict[str, Any]:
     """
     Apply ActivitySearchResult entries back into ActivityState by deriving
@@ -2461,10 +2588,11 @@ def apply_activity_search_results(tool_context: ToolContext) -> Dict[str, Any]:
             opt = all_options[opt_index]
             opt_index += 1
 
+            # day, slot and opt come from validated state and the fixed slot list.
             items.append(
-                DayItineraryItem(
+                DayItineraryItem.model_construct(
                     date=day,
-                    slot=slot,  # type: ignore[arg-type]
+                    slot=slot,
                     traveler_indexes=traveler_indexes,
                     task_id="*",
                     activity=opt,
@@ -3115,6 +3243,85 @@ def searchapi_google_hotels_properties(
     }
 
 
+# Upper bound on SearchAPI.io requests a single batch call issues at once.
+_ACCOMMODATION_BATCH_MAX_WORKERS = 4
+
+
+def searchapi_accommodation_batch(
+    tool_context: ToolContext,
+    searches: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Run several accommodation searches in one tool call.
+
+    Each entry in ``searches`` describes one AccommodationSearchTask:
+      - task_id: string (required)
+      - engine: "airbnb" or "google_hotels"
+      - location_query, check_in_date, check_out_date, adults, children
+
+    The underlying SearchAPI.io requests are issued concurrently. Each entry is
+    isolated: a failing search is reported under its own task_id without
+    affecting the others.
+
+    Args:
+        tool_context: ToolContext provided by ADK (passed through to each engine).
+        searches: One search description per AccommodationSearchTask.
+
+    Returns:
+        Dict with status, num_searches, and results mapping each task_id to
+        the response of the engine it used.
+    """
+    engines = {
+        "airbnb": searchapi_airbnb_properties,
+        "google_hotels": searchapi_google_hotels_properties,
+    }
+
+    def _run_one(search: Dict[str, Any]) -> Dict[str, Any]:
+        engine = engines.get(str(search.get("engine") or "google_hotels"))
+        if engine is None:
+            return {"status": "error", "reason": "unknown_engine", "engine": search.get("engine")}
+        location_query = search.get("location_query")
+        if not location_query:
+            return {"status": "error", "reason": "missing_location_query"}
+        try:
+            return engine(
+                tool_context,
+                location_query=location_query,
+                check_in_date=search.get("check_in_date"),
+                check_out_date=search.get("check_out_date"),
+                adults=int(search.get("adults") or 1),
+                children=int(search.get("children") or 0),
+            )
+        except Exception as exc:
+            logger.warning(
+                "[Tool] searchapi_accommodation_batch entry failed",
+                extra={"task_id": search.get("task_id"), "error": str(exc)},
+            )
+            return {"status": "error", "reason": "request_failed", "detail": str(exc)}
+
+    valid_searches = [s for s in searches or [] if isinstance(s, dict) and s.get("task_id")]
+    if not valid_searches:
+        return {"status": "error", "reason": "no_searches"}
+
+    with ThreadPoolExecutor(
+        max_workers=min(_ACCOMMODATION_BATCH_MAX_WORKERS, len(valid_searches))
+    ) as pool:
+        outputs = list(pool.map(_run_one, valid_searches))
+
+    results = {str(s["task_id"]): out for s, out in zip(valid_searches, outputs)}
+
+    logger.info(
+        "[Tool] searchapi_accommodation_batch completed",
+        extra={"num_searches": len(results)},
+    )
+
+    return {
+        "status": "success",
+        "num_searches": len(results),
+        "results": results,
+    }
+
+
 def skyscanner_search_flights(
     tool_context: ToolContext,
     origin: str,
@@ -3266,8 +3473,8 @@ def skyscanner_search_flights(
 
 def build_visa_search_prompt(
     tool_context: ToolContext,
-    traveler_index: int,
-    role: str,
+    traveler_indexes: List[int],
+    roles: Optional[List[str]] = None,
     nationality: Optional[str] = None,
     origin: Optional[str] = None,
     destination: Optional[str] = None,
@@ -3275,7 +3482,8 @@ def build_visa_search_prompt(
 ) -> Dict[str, Any]:
     """
     Construct a clear, templated prompt describing what we intend to
-    search for later for a single traveler.
+    search for later for one group of travelers who share nationality
+    and origin.
 
     This does not call any external services. It is purely about
     building and logging a well-structured prompt that a future
@@ -3283,10 +3491,11 @@ def build_visa_search_prompt(
 
     Args:
         tool_context: ToolContext provided by ADK.
-        traveler_index: Index of the traveler in PlannerState.demographics.travelers.
-        role: Role of the traveler (e.g. "adult", "child").
-        nationality: Nationality of the traveler (e.g. "Nigerian").
-        origin: Origin country of the traveler (e.g. "Nigeria").
+        traveler_indexes: Indexes of the travelers in PlannerState.demographics.travelers
+            covered by this group (member_indexes from _visa_state_reader).
+        roles: Roles of those travelers (e.g. ["adult", "child"]).
+        nationality: Nationality shared by the group (e.g. "Nigerian").
+        origin: Origin country shared by the group (e.g. "Nigeria").
         destination: Destination country of the trip (e.g. "UK").
         purpose: Short free-text description of the purpose of the visa search.
 
@@ -3297,13 +3506,19 @@ def build_visa_search_prompt(
     app_name = getattr(invocation_ctx, "app_name", None)
     user_id = getattr(tool_context, "user_id", None)
 
+    traveler_indexes = sorted(set(traveler_indexes or []))
+    roles = list(roles or [])
     nationality_display = nationality or "UNKNOWN"
     origin_display = origin or "UNKNOWN ORIGIN"
     destination_display = destination or "UNKNOWN DESTINATION"
 
+    # The prompt is the visa response-cache key, so it only carries route-level
+    # facts (nationality, origin, destination, purpose). Group size and roles
+    # stay on the task and in the logs; the search already covers how
+    # requirements differ for children and seniors.
     if not purpose:
         purpose = (
-            f"visa_requirements_lookup for {nationality_display} traveler "
+            f"visa_requirements_lookup for {nationality_display} travelers "
             f"going from {origin_display} to {destination_display}"
         )
 
@@ -3313,17 +3528,15 @@ def build_visa_search_prompt(
         "or recommended vaccinations or medical tests). Only use official government or "
         "approved visa application centre websites so that guidance is up to date.\n\n"
         f"Traveler context:\n"
-        f"- Traveler index: {traveler_index}\n"
-        f"- Role: {role}\n"
         f"- Nationality: {nationality_display}\n"
         f"- Origin: {origin_display}\n"
         f"- Destination: {destination_display}\n"
         f"- Visa purpose: {purpose}\n\n"
         "Later, another agent will use this prompt to search for:\n"
-        "- Whether a visa is required for this traveler.\n"
+        "- Whether a visa is required for these travelers.\n"
         "- Recommended visa type.\n"
         "- Typical processing time and approximate fees.\n"
-        "- Key supporting documents.\n"
+        "- Key supporting documents, noting any that differ for children or seniors.\n"
         "- Any health-related entry requirements (e.g. mandatory or recommended vaccines, "
         "medical tests, or health insurance conditions).\n"
         "- Where and how to apply."
@@ -3334,8 +3547,8 @@ def build_visa_search_prompt(
         extra={
             "app_name": app_name,
             "user_id": user_id,
-            "traveler_index": traveler_index,
-            "role": role,
+            "traveler_indexes": traveler_indexes,
+            "roles": roles,
             "nationality": nationality,
             "origin": origin,
             "destination": destination,
@@ -3346,10 +3559,10 @@ def build_visa_search_prompt(
     # Persist as a VisaSearchTask so that downstream agents can operate
     # over a structured list of tasks.
     visa_state = get_visa_state(tool_context)
-    task_id = f"traveler_{traveler_index}_{destination_display}"
+    task_id = f"travelers_{'_'.join(map(str, traveler_indexes))}_{destination_display}"
     task = VisaSearchTask(
         task_id=task_id,
-        traveler_indexes=[traveler_index],
+        traveler_indexes=traveler_indexes,
         origin_country=origin,
         destination_country=destination,
         nationality=nationality,
@@ -3364,7 +3577,7 @@ def build_visa_search_prompt(
         "[Tool] build_visa_search_prompt stored VisaSearchTask",
         extra={
             "task_id": task_id,
-            "traveler_index": traveler_index,
+            "traveler_indexes": traveler_indexes,
             "destination": destination,
             "num_search_tasks": len(visa_state.search_tasks),
         },
@@ -3372,14 +3585,14 @@ def build_visa_search_prompt(
 
     print(
         f"[Visa Prompt Tool] Stored VisaSearchTask #{len(visa_state.search_tasks)} for "
-        f"traveler_index={traveler_index}, role={role}, "
+        f"traveler_indexes={traveler_indexes}, roles={roles}, "
         f"nationality={nationality_display}, origin={origin_display}, "
         f"destination={destination_display}"
     )
 
     return {
-        "traveler_index": traveler_index,
-        "role": role,
+        "traveler_indexes": traveler_indexes,
+        "roles": roles,
         "nationality": nationality,
         "origin": origin,
         "destination": destination,
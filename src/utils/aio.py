@@ -0,0 +1,25 @@
+"""Helpers for keeping blocking work off the asyncio event loop."""
+
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def run_in_thread(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Wrap a blocking tool (e.g. one that makes a synchronous HTTP request) as
+    a coroutine that runs it in the default thread pool.
+
+    ADK awaits async tools but calls sync ones inline on the event loop, so an
+    unwrapped ``requests.get`` stalls every concurrent pipeline and in-flight
+    model call. functools.wraps keeps the name, docstring and signature that
+    ADK uses to build the function declaration.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
@@ -26,6 +26,24 @@ def _get_currency_bucket(
     return currency_totals[code]
 
 
+def chosen_accommodation_option(
+    result: AccommodationSearchResult,
+) -> Optional[AccommodationOption]:
+    """
+    Return the option matching result.chosen_option_type, falling back to the
+    first option. Stops at the first match instead of scanning every option.
+    """
+    options = result.options
+    if not options:
+        return None
+    chosen_type = result.chosen_option_type
+    if chosen_type:
+        for opt in options:
+            if opt.option_type == chosen_type:
+                return opt
+    return options[0]
+
+
 def _aggregate_flight_costs(
     flight_state: FlightState,
     currency_totals: Dict[str, Dict[str, float]],
@@ -86,14 +104,7 @@ def _aggregate_accommodation_costs(
         if not task:
             continue
 
-        chosen_type = result.chosen_option_type
-        chosen_opt: Optional[AccommodationOption] = None
-
-        for opt in result.options or []:
-            if chosen_type and opt.option_type == chosen_type and chosen_opt is None:
-                chosen_opt = opt
-        if chosen_opt is None and result.options:
-            chosen_opt = result.options[0]
+        chosen_opt = chosen_accommodation_option(result)
         if chosen_opt is None:
             continue
 
@@ -0,0 +1,75 @@
+"""
+Local pre-LLM heuristics for the intake (dispatcher) turn.
+
+Simple intake turns such as "change the dates to 2025-07-05 to 2025-07-10"
+only need a single update_trip_plan call. Classifying them locally lets the
+CLI apply the update directly instead of paying a dispatcher round-trip.
+"""
+
+import re
+from collections import Counter
+from datetime import date
+from typing import Optional, Tuple
+
+INTAKE_SIMPLE = "simple"
+INTAKE_MODERATE = "moderate"
+
+# Per-process counters so we can see how many intake turns skip the LLM.
+INTAKE_COUNTERS: Counter = Counter()
+
+_ISO_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Words that may surround a date range without adding anything the
+# dispatcher would need to reason about.
+_FILLER_WORDS = frozenset(
+    {
+        "actually", "and", "are", "change", "confirm", "date", "dates", "from",
+        "in", "is", "it", "let", "make", "my", "now", "ok", "okay", "our",
+        "please", "s", "set", "the", "through", "thru", "to", "travel", "trip",
+        "until", "update", "us", "we", "will", "yes",
+    }
+)
+
+
+def extract_date_range(message: str) -> Optional[Tuple[str, str]]:
+    """
+    Return (start_date, end_date) when the message contains exactly two valid
+    ISO dates in chronological order, otherwise None.
+    """
+    dates = _ISO_DATE_RE.findall(message)
+    if len(dates) != 2:
+        return None
+    # The regex also matches impossible dates such as 2025-02-30; those are
+    # left to the dispatcher, which can ask the user to correct them.
+    try:
+        start, end = date.fromisoformat(dates[0]), date.fromisoformat(dates[1])
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    return dates[0], dates[1]
+
+
+def classify_intake_complexity(
+    message: str,
+    known_destination: Optional[str] = None,
+) -> str:
+    """
+    Classify a user intake message as SIMPLE or MODERATE.
+
+    A message is SIMPLE when it is just a date range, optionally naming the
+    destination we already have on file. Anything else (new travelers,
+    preferences, questions, a different city) goes to the dispatcher.
+    """
+    if extract_date_range(message) is None:
+        return INTAKE_MODERATE
+
+    remainder = _ISO_DATE_RE.sub(" ", message.lower())
+    if known_destination:
+        remainder = remainder.replace(known_destination.lower(), " ")
+
+    for word in _WORD_RE.findall(remainder):
+        if word not in _FILLER_WORDS:
+            return INTAKE_MODERATE
+    return INTAKE_SIMPLE
@@ -0,0 +1,172 @@
+"""Helpers for building the model wrappers used by the agent modules."""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+from google.adk.agents import Agent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.lite_llm import LiteLlm
+from google.genai import types as genai_types
+
+from src.agents.prompts import static_instruction
+from src.utils.loaders import ResolvedAgentConfig
+
+logger = logging.getLogger(__name__)
+
+# Per-agent token counters: prompt tokens sent, and how many of them Gemini
+# served from its context cache (implicit caching on 2.5 models reuses a
+# repeated prefix such as a long static instruction).
+PROMPT_CACHE_STATS: Dict[str, Counter] = defaultdict(Counter)
+
+
+def build_http_options(config: ResolvedAgentConfig) -> genai_types.HttpOptions:
+    """
+    Per-request HTTP options for Gemini calls; google-genai expects the
+    timeout in milliseconds.
+    """
+    return genai_types.HttpOptions(timeout=int(config.request_timeout * 1000))
+
+
+@lru_cache(maxsize=None)
+def _base_generate_content_config(
+    config: ResolvedAgentConfig, with_http_options: bool
+) -> genai_types.GenerateContentConfig:
+    if with_http_options:
+        return genai_types.GenerateContentConfig(
+            temperature=config.temperature,
+            http_options=build_http_options(config),
+        )
+    return genai_types.GenerateContentConfig(temperature=config.temperature)
+
+
+def build_generate_content_config(
+    config: ResolvedAgentConfig,
+    max_output_tokens: Optional[int] = None,
+    *,
+    with_http_options: bool = True,
+) -> genai_types.GenerateContentConfig:
+    """
+    Generation config for an agent built from an agents.yaml section.
+
+    The validated base config is built once per section and each agent gets a
+    shallow copy that only overrides max_output_tokens. LiteLlm agents pass
+    with_http_options=False since the timeout is handled by litellm.
+    """
+    base = _base_generate_content_config(config, with_http_options)
+    if max_output_tokens is None:
+        return base.model_copy()
+    return base.model_copy(update={"max_output_tokens": max_output_tokens})
+
+
+@lru_cache(maxsize=None)
+def _shared_gemini(model: str, max_retries: int) -> Gemini:
+    return Gemini(
+        model=model,
+        retry_options=genai_types.HttpRetryOptions(attempts=max_retries + 1),
+    )
+
+
+def build_gemini(config: ResolvedAgentConfig) -> Gemini:
+    """
+    Build a Gemini wrapper for an agents.yaml section, retrying transient
+    failures up to max_retries times.
+
+    Wrappers are pooled by (model, max_retries) rather than by section, so the
+    visa, flight and search agents all share one client and connection pool.
+    The per-section timeout travels in the generate-content config instead.
+    """
+    return _shared_gemini(config.model, config.max_retries)
+
+
+def build_agent(
+    config: ResolvedAgentConfig,
+    name: str,
+    instruction: str,
+    tools: list,
+    max_output_tokens: int,
+) -> Agent:
+    """
+    Build a Gemini-backed Agent for an agents.yaml section with a static
+    instruction. build_gemini is cached, so every agent built from the same
+    section shares one model wrapper.
+    """
+    return Agent(
+        name=name,
+        model=build_gemini(config),
+        instruction=static_instruction(instruction),
+        tools=tools,
+        generate_content_config=build_generate_content_config(config, max_output_tokens),
+    )
+
+
+@lru_cache(maxsize=None)
+def _shared_lite_llm(model: str, timeout: float, max_retries: int) -> LiteLlm:
+    return LiteLlm(model=model, timeout=timeout, num_retries=max_retries)
+
+
+def build_lite_llm(config: ResolvedAgentConfig) -> LiteLlm:
+    """
+    Build a LiteLlm wrapper for an agents.yaml section. LiteLlm forwards extra
+    keyword arguments to litellm, which handles the timeout and retries, so
+    sections share a wrapper only when all three settings match.
+    """
+    return _shared_lite_llm(
+        config.litellm_model,
+        config.request_timeout,
+        config.max_retries,
+    )
+
+
+async def warm_up_model(model: BaseLlm) -> None:
+    """
+    Issue a one-token request so the client's TLS/auth handshake and
+    connection pool are set up before the first real user turn.
+
+    Failures are logged and swallowed; warmup must never block intake.
+    """
+    request = LlmRequest(
+        model=model.model,
+        contents=[genai_types.Content(role="user", parts=[genai_types.Part(text="ping")])],
+        config=genai_types.GenerateContentConfig(max_output_tokens=1),
+    )
+    try:
+        async for _ in model.generate_content_async(request):
+            pass
+    except Exception as e:
+        logger.warning("Model warmup for %s failed: %s", model.model, e)
+
+
+async def warm_up_models(models: Iterable[BaseLlm]) -> None:
+    """
+    Warm every distinct wrapper in ``models`` concurrently. Sections that share
+    a pooled wrapper (see build_gemini) are only pinged once.
+    """
+    unique = {id(model): model for model in models}
+    await asyncio.gather(*(warm_up_model(model) for model in unique.values()))
+
+
+def record_prompt_cache_usage(event: Any) -> None:
+    """
+    Add an ADK event's usage metadata to PROMPT_CACHE_STATS under its author.
+    Events without usage metadata (tool responses, user turns) are ignored.
+    """
+    usage = getattr(event, "usage_metadata", None)
+    if usage is None:
+        return
+    stats = PROMPT_CACHE_STATS[event.author]
+    stats["calls"] += 1
+    stats["prompt_tokens"] += usage.prompt_token_count or 0
+    stats["cached_tokens"] += usage.cached_content_token_count or 0
+
+
+def prompt_cache_hit_rate(author: str) -> Optional[float]:
+    """Fraction of an agent's prompt tokens served from cache, or None if unseen."""
+    stats = PROMPT_CACHE_STATS.get(author)
+    if not stats or not stats["prompt_tokens"]:
+        return None
+    return stats["cached_tokens"] / stats["prompt_tokens"]
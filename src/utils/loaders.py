@@ -0,0 +1,161 @@
+"""Shared loaders for on-disk configuration used across the agent modules."""
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from importlib.resources import files
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+from pydantic_core import from_json
+
+try:
+    # libyaml-backed loader; several times faster than the pure-Python parser.
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _YamlLoader = yaml.SafeLoader  # type: ignore[misc]
+    logging.getLogger(__name__).warning(
+        "PyYAML was built without libyaml; falling back to the pure-Python loader."
+    )
+
+
+# GLOBE_AGENT_CONFIG may point at a JSON export of agents.yaml (see
+# compile_agent_config) to skip YAML parsing entirely at startup.
+# The packaged default is located through importlib.resources rather than a
+# "dirname(__file__)/.." walk, so it resolves the same way from an installed wheel.
+AGENT_CONFIG_PATH = os.environ.get("GLOBE_AGENT_CONFIG") or str(
+    files("src.config").joinpath("agents.yaml")
+)
+
+_config_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedAgentConfig:
+    """
+    One agents.yaml section with every value already cast to its final type.
+    """
+
+    section: str
+    provider: str
+    model: str
+    temperature: float = 0.2
+    max_tokens: int = 1000
+    tool_only_max_tokens: int = 128
+    apply_max_tokens: int = 96
+    request_timeout: float = 60.0
+    max_retries: int = 2
+
+    @property
+    def litellm_model(self) -> str:
+        return f"{self.provider}/{self.model}"
+
+
+# Keys an agents.yaml section may set; anything else is almost certainly a typo
+# that would otherwise silently fall back to the default.
+_AGENT_CONFIG_KEYS = frozenset(f.name for f in fields(ResolvedAgentConfig)) - {"section"}
+
+_AGENT_CONFIG_DEFAULTS = ResolvedAgentConfig(section="", provider="", model="")
+
+
+def _stat_key(path: str) -> Tuple[str, int, int, int]:
+    # Key on the absolute path so "a/../config/agents.yaml", a relative
+    # "config/agents.yaml" and the packaged absolute path share a cache entry.
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size, st.st_ino
+
+
+@lru_cache(maxsize=1)
+def _load_config_file(path: str, mtime_ns: int, size: int, inode: int) -> Dict[str, Any]:
+    # The stat fields are only part of the cache key so that edits to the file
+    # invalidate the cached parse.
+    with open(path, "rb") as f:
+        if path.endswith(".json"):
+            return from_json(f.read()) or {}
+        # Hand libyaml raw bytes so it decodes in C rather than through a
+        # Python text wrapper.
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+@lru_cache(maxsize=None)
+def _resolve_agent_config(
+    section: str, path: str, mtime_ns: int, size: int, inode: int
+) -> ResolvedAgentConfig:
+    raw = _load_config_file(path, mtime_ns, size, inode).get(section) or {}
+    model = raw.get("model")
+    if not model:
+        raise ValueError(f"agents.yaml section {section!r} must define a model")
+    unknown = raw.keys() - _AGENT_CONFIG_KEYS
+    if unknown:
+        raise ValueError(
+            f"agents.yaml section {section!r} has unknown keys: {', '.join(sorted(unknown))}"
+        )
+
+    defaults = _AGENT_CONFIG_DEFAULTS
+    return ResolvedAgentConfig(
+        section=section,
+        provider=str(raw.get("provider", "")),
+        model=str(model),
+        temperature=float(raw.get("temperature", defaults.temperature)),
+        max_tokens=int(raw.get("max_tokens", defaults.max_tokens)),
+        tool_only_max_tokens=int(raw.get("tool_only_max_tokens", defaults.tool_only_max_tokens)),
+        apply_max_tokens=int(raw.get("apply_max_tokens", defaults.apply_max_tokens)),
+        request_timeout=float(raw.get("request_timeout", defaults.request_timeout)),
+        max_retries=int(raw.get("max_retries", defaults.max_retries)),
+    )
+
+
+def get_agent_configs(path: str = AGENT_CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Return the parsed agents.yaml, shared by every agent module.
+
+    The file is parsed once per process and re-read only when its mtime, size,
+    or inode changes. Callers should treat the returned dict as read-only.
+    """
+    with _config_lock:
+        return _load_config_file(*_stat_key(path))
+
+
+def get_agent_config(section: str, path: str = AGENT_CONFIG_PATH) -> ResolvedAgentConfig:
+    """
+    Return the typed config for one agents.yaml section, resolved once per
+    file version.
+    """
+    with _config_lock:
+        return _resolve_agent_config(section, *_stat_key(path))
+
+
+@lru_cache(maxsize=None)
+def load_instruction(agent: str) -> str:
+    """
+    Return the packaged src/artifacts/<agent>/instruction.md prompt.
+    """
+    return (
+        files("src.artifacts")
+        .joinpath(agent)
+        .joinpath("instruction.md")
+        .read_text(encoding="utf-8")
+    )
+
+
+def compile_agent_config(
+    source: str = AGENT_CONFIG_PATH,
+    dest: Optional[str] = None,
+) -> str:
+    """
+    Write a JSON copy of agents.yaml next to it (or to dest) and return the
+    path. Point GLOBE_AGENT_CONFIG at the result to load config without YAML.
+    """
+    dest = dest or os.path.splitext(source)[0] + ".json"
+    with open(dest, "w") as f:
+        json.dump(get_agent_configs(source), f, indent=2)
+        f.write("\n")
+    return dest
+
+
+if __name__ == "__main__":
+    print(compile_agent_config())
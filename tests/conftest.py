@@ -1,7 +1,13 @@
+import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Never let tests read or write a persistent response cache, even when .env
+# configures one for local runs.
+os.environ["GLOBE_RESPONSE_CACHE_PATH"] = ""
+
 
 # from pathlib import Path
 
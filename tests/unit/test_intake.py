@@ -0,0 +1,31 @@
+from src.utils.intake import (
+    INTAKE_MODERATE,
+    INTAKE_SIMPLE,
+    classify_intake_complexity,
+    extract_date_range,
+)
+
+
+def test_plain_date_range_is_simple():
+    message = "Change the dates to 2025-07-05 to 2025-07-10 please"
+
+    assert classify_intake_complexity(message) == INTAKE_SIMPLE
+    assert extract_date_range(message) == ("2025-07-05", "2025-07-10")
+
+
+def test_known_destination_is_allowed_but_new_details_are_not():
+    message = "Confirm my trip is Rome 2025-07-05 to 2025-07-10"
+
+    assert classify_intake_complexity(message, known_destination="Rome") == INTAKE_SIMPLE
+    assert classify_intake_complexity(message, known_destination="Paris") == INTAKE_MODERATE
+    assert (
+        classify_intake_complexity("2025-07-05 to 2025-07-10 with my two kids")
+        == INTAKE_MODERATE
+    )
+
+
+def test_missing_or_reversed_dates_are_moderate():
+    assert classify_intake_complexity("Rome in July") == INTAKE_MODERATE
+    assert classify_intake_complexity("2025-07-10 to 2025-07-05") == INTAKE_MODERATE
+    assert classify_intake_complexity("2025-02-30 to 2025-13-45") == INTAKE_MODERATE
+    assert extract_date_range("2025-02-30 to 2025-13-45") is None
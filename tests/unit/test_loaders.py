@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from src.utils.loaders import compile_agent_config, get_agent_config, get_agent_configs, load_instruction
+
+
+def test_agent_config_sections_are_resolved_and_cached():
+    search = get_agent_config("search")
+
+    assert search.model == get_agent_configs()["search"]["model"]
+    assert isinstance(search.temperature, float)
+    assert isinstance(search.max_tokens, int)
+    assert get_agent_config("search") is search
+
+
+def test_agent_config_reloads_after_file_change(tmp_path):
+    path = tmp_path / "agents.yaml"
+    path.write_text("search:\n  provider: gemini\n  model: first\n")
+    assert get_agent_config("search", str(path)).model == "first"
+
+    path.write_text("search:\n  provider: gemini\n  model: second-model\n")
+    assert get_agent_config("search", str(path)).model == "second-model"
+
+
+def test_agent_config_without_model_raises():
+    with pytest.raises(ValueError):
+        get_agent_config("intake_constraints")
+
+
+def test_agent_config_loads_from_compiled_json(tmp_path):
+    source = tmp_path / "agents.yaml"
+    source.write_text("search:\n  provider: gemini\n  model: compiled\n  max_tokens: 42\n")
+
+    dest = compile_agent_config(str(source))
+    config = get_agent_config("search", dest)
+
+    assert dest.endswith(".json")
+    assert config.model == "compiled"
+    assert config.max_tokens == 42
+
+
+def test_load_instruction_reads_packaged_artifact():
+    text = load_instruction("planner")
+
+    assert text.strip()
+    assert load_instruction("planner") is text
+
+
+def test_agent_config_rejects_misspelled_keys(tmp_path):
+    path = tmp_path / "agents.yaml"
+    path.write_text("search:\n  provider: gemini\n  model: m\n  max_token: 10\n")
+
+    with pytest.raises(ValueError, match="max_token"):
+        get_agent_config("search", str(path))
+
+
+def test_agent_config_relative_and_absolute_paths_share_cache(tmp_path, monkeypatch):
+    path = tmp_path / "agents.yaml"
+    path.write_text("search:\n  provider: gemini\n  model: m\n")
+    monkeypatch.chdir(tmp_path)
+
+    assert get_agent_config("search", "agents.yaml") is get_agent_config("search", str(path))
+
+
+@pytest.mark.parametrize("agent", ["dispatcher", "planner", "summary", "visa"])
+def test_instructions_have_no_session_placeholders(agent):
+    # Instructions are sent verbatim (see prompts.static_instruction); per-session
+    # values belong at the end of the user message, not in the cached prefix.
+    assert not re.search(r"\{[^{}]*\}", load_instruction(agent))
@@ -0,0 +1,126 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict, Optional
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+import run
+from src.state.accommodation_state import AccommodationSearchTask, AccommodationState
+from src.state.activity_state import ActivitySearchTask, ActivityState
+from src.state.planner_state import Demographics, PlannerState, Traveler, TripDetails
+
+
+APP_NAME = "globe-tripper-tests"
+USER_ID = "test-user"
+SESSION_ID = "trip"
+
+
+class FakeAgent(BaseAgent):
+    """
+    Agent that answers after a fixed delay, either with a tool response (like
+    the tool-only search agents) or with plain text.
+    """
+
+    reply: str = ""
+    tool_response: Optional[Dict[str, Any]] = None
+    delay: float = 0.0
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.delay)
+        if self.tool_response is not None:
+            part = genai_types.Part(
+                function_response=genai_types.FunctionResponse(
+                    name="search", response=self.tool_response
+                )
+            )
+        else:
+            part = genai_types.Part(text=self.reply)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            content=genai_types.Content(role="model", parts=[part]),
+        )
+
+
+def _install_fake_agents(
+    monkeypatch: pytest.MonkeyPatch, accommodation_delay: float, activity_delay: float
+) -> None:
+    accommodation_search = FakeAgent(
+        name="accommodation_search_tool_agent",
+        tool_response={"status": "success", "options": []},
+        delay=accommodation_delay,
+    )
+    activity_search = FakeAgent(
+        name="activity_search_agent",
+        reply='{"task_id": "act-1", "summary": "Parks and museums."}',
+        delay=activity_delay,
+    )
+    activity_writer = FakeAgent(name="activity_result_writer_agent", reply="Recorded.")
+
+    monkeypatch.setattr(run, "get_accommodation_search_tool_agent", lambda: accommodation_search)
+    monkeypatch.setattr(run, "get_activity_search_agent", lambda: activity_search)
+    monkeypatch.setattr(run, "get_activity_result_writer_agent", lambda: activity_writer)
+
+    async def _skip_itinerary(**_kwargs: Any) -> None:
+        return None
+
+    monkeypatch.setattr(run, "run_activity_itinerary_pipeline", _skip_itinerary)
+
+
+async def _trip_history(accommodation_delay: float, activity_delay: float, monkeypatch):
+    _install_fake_agents(monkeypatch, accommodation_delay, activity_delay)
+
+    state = PlannerState(
+        trip_details=TripDetails(destination="London", start_date="2030-06-01", end_date="2030-06-05"),
+        demographics=Demographics(adults=1, travelers=[Traveler(role="adult", age=30)]),
+    ).model_dump()
+    state["accommodation"] = AccommodationState(
+        search_tasks=[AccommodationSearchTask(task_id="acc-1", traveler_indexes=[0], location="London")]
+    ).model_dump()
+    state["activities"] = ActivityState(
+        search_tasks=[ActivitySearchTask(task_id="act-1", traveler_indexes=[0], location="London")]
+    ).model_dump()
+
+    session_service = InMemorySessionService()
+    await session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID, state=state
+    )
+    await run.run_post_flight_pipelines(
+        session_service=session_service,
+        app_name=APP_NAME,
+        user_id=USER_ID,
+        session_id=SESSION_ID,
+    )
+
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+    )
+    return [
+        (
+            event.author,
+            tuple(part.text for part in (event.content.parts if event.content else [])),
+            tuple(sorted(event.actions.state_delta)),
+        )
+        for event in session.events
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_leave_a_deterministic_trip_history(monkeypatch):
+    accommodation_last = await _trip_history(0.05, 0.0, monkeypatch)
+    activity_last = await _trip_history(0.0, 0.05, monkeypatch)
+
+    assert accommodation_last == activity_last
+
+    authors = [author for author, _, _ in accommodation_last]
+    assert "accommodation_search_tool_agent" not in authors
+    assert "activity_search_agent" not in authors
+    # Accommodation results are recorded before the activity writer runs.
+    delta_keys = [keys for _, _, keys in accommodation_last if keys]
+    assert delta_keys.index(("accommodation",)) < delta_keys.index((run.CURRENT_TASK_KEY,))
@@ -0,0 +1,33 @@
+from src.tools.cache import ResponseCache, cache_key
+
+
+def test_cache_round_trip_normalises_prompts():
+    cache = ResponseCache("visa", ttl_seconds=60, path=":memory:")
+    cache.set("Visa requirements for  a Nigerian traveler", {"summary": "Visa required: yes"})
+
+    assert cache.get("visa requirements for a nigerian traveler") == {"summary": "Visa required: yes"}
+    assert cache.get("visa requirements for a Ghanaian traveler") is None
+
+
+def test_cache_keys_ignore_mapping_order_and_expire():
+    assert cache_key({"a": 1, "b": 2}) == cache_key({"b": 2, "a": 1})
+
+    cache = ResponseCache("flight", ttl_seconds=-1, path=":memory:")
+    cache.set({"departure_id": "LOS", "arrival_id": "LHR"}, {"status": "success"})
+
+    assert cache.get({"departure_id": "LOS", "arrival_id": "LHR"}) is None
+
+
+def test_empty_path_disables_cache():
+    cache = ResponseCache("visa", ttl_seconds=60, path="")
+    cache.set("prompt", {"summary": "x"})
+
+    assert cache.get("prompt") is None
+
+
+def test_cache_is_disabled_unless_a_path_is_configured(monkeypatch):
+    monkeypatch.delenv("GLOBE_RESPONSE_CACHE_PATH", raising=False)
+    cache = ResponseCache("visa", ttl_seconds=60)
+    cache.set("prompt", {"summary": "x"})
+
+    assert cache.get("prompt") is None